@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""BM25 lexical index over legal units.
+
+Layout of an index directory:
+
+    index.json      manifest (count, k1, b, average document length, vocabulary)
+    postings.npz    term x document CSR matrix of precomputed BM25 weights
+    records.jsonl   one {"id", "metadata"} line per document, in column order
+
+Weights are computed at build time, so scoring a batch of queries is a single
+sparse product of the query term counts with the postings matrix; no model or
+network call is involved.
+"""
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from pipeline.emit_artifacts import serialize_legal_unit
+from pipeline.schemas import LegalUnit
+from pipeline.vector_index import SearchHit
+
+
+INDEX_VERSION = 1
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+# Words joined by dots/hyphens stay together ("25.1", "h-c"), and trailing
+# parenthesised clauses stay attached to their section ("179(b)", "r205(a)(i)").
+TOKEN_RE = re.compile(r"\w+(?:[.\-]\w+)*(?:\(\w{1,6}\))*")
+CLAUSE_RE = re.compile(r"\(\w{1,6}\)")
+# Shorthand section references: A40 (IRPA s. 40), R205 (IRPR s. 205).
+INSTRUMENT_REF_RE = re.compile(r"^[ar](\d+(?:\.\d+)?(?:\(\w{1,6}\))*)$")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from has have in is it its of on or that the
+    this to was were which with
+    au aux ce ces dans de des du en est et la le les ou par pour qui sur un une
+    """.split()
+)
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def legal_tokenize(text: str) -> list[str]:
+    """Lowercased, accent-folded tokens that keep clause references intact.
+
+    `179(b)` is emitted as itself and as its section `179`; `A40`/`R205(a)`
+    additionally yield the bare section so they match "section 40" text.
+    """
+    tokens: list[str] = []
+    for match in TOKEN_RE.finditer(_fold(text)):
+        token = match.group(0).strip("_")
+        if not token or token in STOPWORDS:
+            continue
+        tokens.append(token)
+        ref = INSTRUMENT_REF_RE.match(token)
+        if ref:
+            token = ref.group(1)
+            tokens.append(token)
+        base = CLAUSE_RE.split(token, maxsplit=1)[0]
+        if base != token:
+            tokens.append(base)
+    return tokens
+
+
+def _document_record(doc: LegalUnit | Mapping[str, Any]) -> tuple[str, str, dict[str, Any]]:
+    metadata = serialize_legal_unit(doc) if isinstance(doc, LegalUnit) else dict(doc)
+    doc_id = str(metadata.get("unit_id") or metadata.get("id"))
+    text = str(metadata.get("embed_text") or metadata.get("text") or "")
+    return doc_id, text, metadata
+
+
+class BM25Index:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        manifest = json.loads((self.path / "index.json").read_text(encoding="utf-8"))
+        if manifest.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {manifest.get('version')}")
+        self.count = int(manifest["count"])
+        self.k1 = float(manifest["k1"])
+        self.b = float(manifest["b"])
+        self.avgdl = float(manifest["avgdl"])
+        self.terms: list[str] = manifest["terms"]
+        self.vocab = {term: i for i, term in enumerate(self.terms)}
+        self.postings = sparse.load_npz(self.path / "postings.npz").tocsr()
+
+        with (self.path / "records.jsonl").open("r", encoding="utf-8") as handle:
+            records = [json.loads(line) for line in handle if line.strip()]
+        self.ids = [r["id"] for r in records]
+        self.metadata = [r.get("metadata") or {} for r in records]
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        documents: Iterable[LegalUnit | Mapping[str, Any]],
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        store_metadata: bool = True,
+    ) -> "BM25Index":
+        """Write an index from legal units, `emit_legal_units` rows or `{"id", "text"}` records."""
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+
+        vocab: dict[str, int] = {}
+        rows: list[int] = []
+        cols: list[int] = []
+        freqs: list[int] = []
+        lengths: list[int] = []
+        records: list[dict[str, Any]] = []
+        for column, doc in enumerate(documents):
+            doc_id, text, metadata = _document_record(doc)
+            tokens = legal_tokenize(text)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                rows.append(vocab.setdefault(term, len(vocab)))
+                cols.append(column)
+                freqs.append(tf)
+            records.append({"id": doc_id, "metadata": metadata if store_metadata else {}})
+
+        count = len(records)
+        doc_len = np.asarray(lengths, dtype=np.float32)
+        avgdl = float(doc_len.mean()) if count and doc_len.sum() else 1.0
+        tf = np.asarray(freqs, dtype=np.float32)
+        rows_arr = np.asarray(rows, dtype=np.int64)
+        cols_arr = np.asarray(cols, dtype=np.int64)
+
+        df = np.bincount(rows_arr, minlength=len(vocab)).astype(np.float32)
+        idf = np.log1p((count - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * doc_len[cols_arr] / avgdl) if len(tf) else tf
+        weights = idf[rows_arr] * tf * (k1 + 1.0) / (tf + norm)
+        postings = sparse.csr_matrix(
+            (weights.astype(np.float32), (rows_arr, cols_arr)),
+            shape=(len(vocab), count),
+        )
+        postings.sort_indices()
+        sparse.save_npz(out / "postings.npz", postings)
+
+        with (out / "records.jsonl").open("w", encoding="utf-8") as handle:
+            for r in records:
+                handle.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+
+        manifest = {
+            "version": INDEX_VERSION,
+            "count": count,
+            "k1": k1,
+            "b": b,
+            "avgdl": avgdl,
+            "terms": sorted(vocab, key=vocab.__getitem__),
+        }
+        (out / "index.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+        return cls(out)
+
+    @classmethod
+    def from_legal_units(
+        cls,
+        path: str | Path,
+        units: Sequence[LegalUnit | Mapping[str, Any]],
+        **kwargs: Any,
+    ) -> "BM25Index":
+        return cls.build(path, units, **kwargs)
+
+    def query_matrix(self, queries: Sequence[str]) -> sparse.csr_matrix:
+        """Term counts for each query over the index vocabulary; unknown terms are dropped."""
+        indptr = [0]
+        indices: list[int] = []
+        data: list[float] = []
+        for query in queries:
+            counts = Counter(t for t in legal_tokenize(query) if t in self.vocab)
+            for term, tf in counts.items():
+                indices.append(self.vocab[term])
+                data.append(float(tf))
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(queries), len(self.terms)),
+        )
+
+    def score(self, queries: str | Sequence[str]) -> sparse.csr_matrix:
+        """BM25 scores as a query x document sparse matrix (zero where no term matches)."""
+        if isinstance(queries, str):
+            queries = [queries]
+        return (self.query_matrix(queries) @ self.postings).tocsr()
+
+    def search(self, queries: str | Sequence[str], top_k: int = 10) -> list[list[SearchHit]]:
+        """Return the top_k documents for each query, best first; ties keep index order."""
+        if isinstance(queries, str):
+            queries = [queries]
+        scores = self.score(queries)
+        results: list[list[SearchHit]] = []
+        for i in range(len(queries)):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            docs = scores.indices[start:end]
+            values = scores.data[start:end]
+            if top_k <= 0 or not len(docs):
+                results.append([])
+                continue
+            if len(docs) > top_k:
+                # Keep every document tied with the k-th score so the cut is by index order.
+                kth = np.partition(values, len(values) - top_k)[len(values) - top_k]
+                keep = values >= kth
+                docs, values = docs[keep], values[keep]
+            order = np.lexsort((docs, -values))[:top_k]
+            results.append([
+                SearchHit(id=self.ids[docs[j]], score=float(values[j]), metadata=self.metadata[docs[j]])
+                for j in order
+            ])
+        return results
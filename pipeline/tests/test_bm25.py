@@ -0,0 +1,89 @@
+import math
+
+import pytest
+
+from pipeline.bm25 import BM25Index, legal_tokenize
+from pipeline.schemas import LegalUnit
+
+
+def make_unit(unit_id: str, text: str) -> LegalUnit:
+    return LegalUnit(
+        unit_id=unit_id,
+        embed_text=text,
+        display_text=text,
+        language="en",
+        authority_level="policy",
+        instrument="ENF",
+        doc_type="policy",
+        filename="test.pdf",
+        page_start=1,
+        page_end=1,
+    )
+
+
+@pytest.fixture
+def units():
+    return [
+        make_unit("u0", "A foreign national is inadmissible for misrepresentation under A40."),
+        make_unit("u1", "Dual intent is permitted; see paragraph 179(b) of the Regulations."),
+        make_unit("u2", "Section 179 sets out conditions for issuing a temporary resident visa."),
+        make_unit("u3", "Officers assess study permit applications."),
+        make_unit("u4", "Misrepresentation findings carry a five year bar."),
+    ]
+
+
+class TestTokenizer:
+    def test_keeps_clause_tokens_intact(self):
+        tokens = legal_tokenize("See paragraph 179(b)(ii) and s. 25.1 of IRPA")
+        assert "179(b)(ii)" in tokens
+        assert "179" in tokens
+        assert "25.1" in tokens
+        assert "irpa" in tokens
+        assert "of" not in tokens
+
+    def test_instrument_shorthand_yields_bare_section(self):
+        assert legal_tokenize("A40") == ["a40", "40"]
+        assert legal_tokenize("R205(a)") == ["r205(a)", "205(a)", "205"]
+
+    def test_folds_case_and_accents(self):
+        assert legal_tokenize("Règlement ÉTÉ") == ["reglement", "ete"]
+
+
+class TestSearch:
+    def test_clause_query_prefers_exact_clause(self, tmp_path, units):
+        index = BM25Index.from_legal_units(tmp_path, units)
+        hits = index.search("179(b)", top_k=5)[0]
+        assert [h.id for h in hits] == ["u1", "u2"]
+        assert hits[0].score > hits[1].score
+
+    def test_batch_queries(self, tmp_path, units):
+        index = BM25Index.from_legal_units(tmp_path, units)
+        results = index.search(["misrepresentation A40", "dual intent", "unknownterm"], top_k=2)
+        assert [h.id for h in results[0]] == ["u0", "u4"]
+        assert [h.id for h in results[1]] == ["u1"]
+        assert results[2] == []
+
+    def test_scores_match_reference_formula(self, tmp_path, units):
+        index = BM25Index.from_legal_units(tmp_path, units, k1=1.5, b=0.5)
+        docs = [legal_tokenize(u.embed_text) for u in units]
+        avgdl = sum(len(d) for d in docs) / len(docs)
+        df = sum("misrepresentation" in d for d in docs)
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        hits = {h.id: h.score for h in index.search("misrepresentation", top_k=5)[0]}
+        for i in (0, 4):
+            tf = docs[i].count("misrepresentation")
+            expected = idf * tf * 2.5 / (tf + 1.5 * (0.5 + 0.5 * len(docs[i]) / avgdl))
+            assert hits[f"u{i}"] == pytest.approx(expected, rel=1e-5)
+
+    def test_ties_break_by_index_order(self, tmp_path):
+        docs = [{"id": f"d{i}", "text": "visitor record"} for i in range(6)]
+        index = BM25Index.build(tmp_path, docs)
+        assert [h.id for h in index.search("visitor", top_k=3)[0]] == ["d0", "d1", "d2"]
+
+    def test_reopens_from_disk(self, tmp_path, units):
+        BM25Index.from_legal_units(tmp_path, units)
+        index = BM25Index(tmp_path)
+        assert len(index) == 5
+        hit = index.search("study permit", top_k=1)[0][0]
+        assert hit.id == "u3"
+        assert hit.metadata["display_text"] == units[3].display_text
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from pipeline.schemas import LegalUnit
+from pipeline.vector_index import LocalVectorIndex, unit_vector_records
+
+
+def make_unit(unit_id: str, instrument: str, authority_level: str, language: str = "en", scope: str = "default") -> LegalUnit:
+    return LegalUnit(
+        unit_id=unit_id,
+        canonical_key=f"{instrument}:{unit_id}" if authority_level == "act" else None,
+        embed_text=f"Text {unit_id}",
+        display_text=f"Text {unit_id}",
+        language=language,
+        authority_level=authority_level,
+        instrument=instrument,
+        doc_type="legislation" if authority_level == "act" else "policy",
+        filename="test.pdf",
+        page_start=1,
+        page_end=1,
+        scope=scope,
+    )
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(3)
+    units = []
+    for i in range(60):
+        instrument = ["IRPA", "IRPR", "ENF"][i % 3]
+        authority = "act" if instrument != "ENF" else "policy"
+        units.append(make_unit(f"u{i}", instrument, authority, language="fr" if i % 5 == 0 else "en", scope="toc" if i % 7 == 0 else "default"))
+    embeddings = rng.normal(size=(len(units), 16)).astype(np.float32)
+    return units, embeddings
+
+
+def brute_force(embeddings: np.ndarray, query: np.ndarray, allowed: list[int], top_k: int) -> list[int]:
+    norm = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = norm[allowed] @ (query / np.linalg.norm(query))
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [allowed[i] for i in order]
+
+
+class TestExactSearch:
+    def test_matches_brute_force_in_batches(self, tmp_path, corpus):
+        units, embeddings = corpus
+        index = LocalVectorIndex.from_legal_units(tmp_path, units, embeddings, dtype="float32")
+        queries = embeddings[:4] + 0.01
+        results = index.search(queries, top_k=5, block_rows=7)
+        for query, hits in zip(queries, results):
+            expected = brute_force(embeddings, query, list(range(len(units))), 5)
+            assert [h.id for h in hits] == [f"u{i}" for i in expected]
+
+    def test_float16_reopens_from_disk(self, tmp_path, corpus):
+        units, embeddings = corpus
+        LocalVectorIndex.from_legal_units(tmp_path, units, embeddings)
+        index = LocalVectorIndex(tmp_path)
+        assert len(index) == 60
+        assert index.matrix.dtype == np.float16
+        hit = index.search(embeddings[10], top_k=1)[0][0]
+        assert hit.id == "u10"
+        assert hit.score == pytest.approx(1.0, abs=1e-3)
+        assert hit.metadata["display_text"] == "Text u10"
+
+    def test_empty_index_returns_no_hits(self, tmp_path):
+        index = LocalVectorIndex.build(tmp_path, [])
+        assert index.search([[1.0, 0.0], [0.0, 1.0]], top_k=3) == [[], []]
+
+
+class TestFilters:
+    def test_prefilters_on_unit_fields(self, tmp_path, corpus):
+        units, embeddings = corpus
+        index = LocalVectorIndex.from_legal_units(tmp_path, units, embeddings)
+        flt = {"instrument": {"$in": ["IRPA", "IRPR"]}, "scope": "default", "language": {"$ne": "fr"}}
+        hits = index.search(embeddings[0], top_k=60, filter=flt)[0]
+        assert hits
+        for hit in hits:
+            assert hit.metadata["instrument"] in ("IRPA", "IRPR")
+            assert hit.metadata["scope"] == "default"
+            assert hit.metadata["language"] == "en"
+
+    def test_binding_gate_filter(self, tmp_path, corpus):
+        units, embeddings = corpus
+        index = LocalVectorIndex.from_legal_units(tmp_path, units, embeddings)
+        hits = index.search(embeddings[0], top_k=60, filter={"$or": [{"authority_level_num": {"$eq": 4}}]})[0]
+        assert {h.metadata["instrument"] for h in hits} == {"IRPA", "IRPR"}
+        assert index.search(embeddings[0], filter={"instrument": "UNKNOWN"}) == [[]]
+
+    def test_retrieval_scope_filter_keeps_missing_scope(self, tmp_path):
+        vectors = [
+            {"id": "a", "values": [1.0, 0.0], "metadata": {"scope": "default", "authority_level": "manual"}},
+            {"id": "b", "values": [0.9, 0.1], "metadata": {}},
+            {"id": "c", "values": [0.8, 0.2], "metadata": {"scope": "toc"}},
+        ]
+        index = LocalVectorIndex.build(tmp_path, vectors)
+        # buildScopeFilter() in server/rag/grounding.js for the default scope intent.
+        flt = {"$or": [{"scope": {"$eq": "default"}}, {"scope": {"$exists": False}}]}
+        assert [h.id for h in index.search([1.0, 0.0], top_k=5, filter=flt)[0]] == ["a", "b"]
+        hits = index.search([1.0, 0.0], top_k=5, filter={"authority_level_num": {"$exists": True}})[0]
+        assert [h.id for h in hits] == ["a"]
+
+    def test_rejects_unindexed_fields(self, tmp_path, corpus):
+        units, embeddings = corpus
+        index = LocalVectorIndex.from_legal_units(tmp_path, units, embeddings)
+        with pytest.raises(ValueError):
+            index.search(embeddings[0], filter={"filename": "test.pdf"})
+
+    def test_ingester_vectors_derive_authority_tier(self, tmp_path):
+        vectors = [
+            {"id": "pdf|a|c0", "values": [1.0, 0.0], "metadata": {"instrument": "WORK", "authority_level": "manual"}},
+            {"id": "pdf|b|c0", "values": [0.9, 0.1], "metadata": {"instrument": "WORK", "authority_level": "statute"}},
+        ]
+        index = LocalVectorIndex.build(tmp_path, vectors)
+        hits = index.search([1.0, 0.0], top_k=5, filter={"authority_level_num": {"$gte": 3}})[0]
+        assert [h.id for h in hits] == ["pdf|b|c0"]
+
+
+class TestIvf:
+    def test_probing_every_list_is_exact(self, tmp_path, corpus):
+        units, embeddings = corpus
+        index = LocalVectorIndex.from_legal_units(tmp_path, units, embeddings, dtype="float32", ivf_lists=4)
+        assert index.centroids.shape == (4, 16)
+        approx = index.search(embeddings[:3], top_k=5, nprobe=4, filter={"language": "en"})
+        exact = index.search(embeddings[:3], top_k=5, exact=True, filter={"language": "en"})
+        assert [[h.id for h in r] for r in approx] == [[h.id for h in r] for r in exact]
+
+    def test_single_probe_finds_own_vector(self, tmp_path, corpus):
+        units, embeddings = corpus
+        index = LocalVectorIndex.from_legal_units(tmp_path, units, embeddings, ivf_lists=6)
+        hits = index.search(embeddings[:8], top_k=1, nprobe=1)
+        assert [h[0].id for h in hits] == [f"u{i}" for i in range(8)]
+
+
+def test_records_accept_emitted_rows_keyed_embeddings():
+    row = {"id": "u1", "unit_id": "u1", "instrument": "ENF", "scope": "default"}
+    records = unit_vector_records([row], {"u1": [0.5, 0.5]})
+    assert records == [{"id": "u1", "values": [0.5, 0.5], "metadata": row}]
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""Local memory-mapped vector index over legal units or ingester vectors.
+
+Layout of an index directory:
+
+    index.json      manifest (count, dimension, dtype, filter vocabularies, IVF settings)
+    vectors.bin     row-major unit-normalized embeddings (float16 or float32), memory-mapped
+    records.jsonl   one {"id", "metadata"} line per row, in row order
+    columns.npz     filter columns as integer codes for instrument/scope/language
+                    plus authority_level_num (-1 where missing)
+    ivf.npz         optional coarse quantizer: centroids and list offsets; rows are
+                    stored grouped by list so each list is a contiguous slice
+
+Scores are cosine similarities. Filters use the Pinecone filter syntax that
+retrieval already sends (`$eq`, `$ne`, `$in`, `$nin`, `$gt`, `$gte`, `$lt`,
+`$lte`, `$exists`, `$and`, `$or`) and are restricted to the pre-filter columns;
+a value is missing for `$exists` where its column code is -1.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from pipeline.emit_artifacts import serialize_legal_unit
+from pipeline.schemas import AUTHORITY_LEVEL_NUM_MAP, LegalUnit
+
+
+INDEX_VERSION = 1
+CATEGORICAL_FIELDS = ("instrument", "scope", "language")
+FILTER_FIELDS = (*CATEGORICAL_FIELDS, "authority_level_num")
+DEFAULT_BLOCK_ROWS = 65_536
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 256
+
+
+@dataclass
+class SearchHit:
+    id: str
+    score: float
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+def _authority_level_num(metadata: Mapping[str, Any]) -> int:
+    value = metadata.get("authority_level_num")
+    if value is not None:
+        return int(value)
+    level = metadata.get("authority_level")
+    if not level:
+        return -1
+    # Same fallback LegalUnit applies when the numeric tier is not set.
+    return AUTHORITY_LEVEL_NUM_MAP.get(str(level).lower(), 1)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def unit_vector_records(
+    units: Sequence[LegalUnit | Mapping[str, Any]],
+    embeddings: np.ndarray | Sequence[Sequence[float]] | Mapping[str, Sequence[float]],
+) -> list[dict[str, Any]]:
+    """Pair legal units (models or `emit_legal_units` rows) with their embeddings.
+
+    `embeddings` is either aligned with `units` or keyed by unit_id.
+    """
+    records: list[dict[str, Any]] = []
+    for position, unit in enumerate(units):
+        metadata = serialize_legal_unit(unit) if isinstance(unit, LegalUnit) else dict(unit)
+        unit_id = str(metadata.get("unit_id") or metadata.get("id"))
+        if isinstance(embeddings, Mapping):
+            values = embeddings[unit_id]
+        else:
+            values = embeddings[position]
+        records.append({"id": unit_id, "values": values, "metadata": metadata})
+    return records
+
+
+def _kmeans(rows: np.ndarray, lists: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(rows), lists * KMEANS_SAMPLE_PER_LIST)
+    sample = rows[np.sort(rng.choice(len(rows), size=sample_size, replace=False))]
+    centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for k in range(lists):
+            members = sample[assignment == k]
+            if len(members):
+                centroids[k] = members.mean(axis=0)
+        centroids = _normalize_rows(centroids)
+    return centroids
+
+
+class LocalVectorIndex:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        manifest = json.loads((self.path / "index.json").read_text(encoding="utf-8"))
+        if manifest.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {manifest.get('version')}")
+        self.count = int(manifest["count"])
+        self.dimension = int(manifest["dimension"])
+        self.dtype = np.dtype(manifest["dtype"])
+        self.vocab: dict[str, list[str]] = manifest["vocab"]
+        self.matrix = np.memmap(
+            self.path / "vectors.bin",
+            dtype=self.dtype,
+            mode="r",
+            shape=(self.count, self.dimension),
+        ) if self.count else np.zeros((0, self.dimension), dtype=self.dtype)
+
+        with (self.path / "records.jsonl").open("r", encoding="utf-8") as handle:
+            records = [json.loads(line) for line in handle if line.strip()]
+        self.ids = [r["id"] for r in records]
+        self.metadata = [r.get("metadata") or {} for r in records]
+
+        columns = np.load(self.path / "columns.npz")
+        self.columns = {name: columns[name] for name in FILTER_FIELDS}
+
+        self.centroids: np.ndarray | None = None
+        self.list_offsets: np.ndarray | None = None
+        if manifest.get("ivf_lists"):
+            ivf = np.load(self.path / "ivf.npz")
+            self.centroids = ivf["centroids"]
+            self.list_offsets = ivf["offsets"]
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        records: Iterable[Mapping[str, Any]],
+        dtype: str = "float16",
+        ivf_lists: int = 0,
+        seed: int = 0,
+    ) -> "LocalVectorIndex":
+        """Write an index from `{"id", "values", "metadata"}` records (the ingesters' upsert format)."""
+        if dtype not in ("float16", "float32"):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        records = list(records)
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+
+        rows = _normalize_rows(np.array([r["values"] for r in records], dtype=np.float32)) if records else None
+        dimension = int(rows.shape[1]) if rows is not None else 0
+
+        lists = min(ivf_lists, len(records)) if ivf_lists > 0 else 0
+        if lists:
+            centroids = _kmeans(rows, lists, seed)
+            assignment = np.concatenate([
+                np.argmax(rows[start:start + DEFAULT_BLOCK_ROWS] @ centroids.T, axis=1)
+                for start in range(0, len(rows), DEFAULT_BLOCK_ROWS)
+            ])
+            order = np.argsort(assignment, kind="stable")
+            offsets = np.searchsorted(assignment[order], np.arange(lists + 1)).astype(np.int64)
+            rows = rows[order]
+            records = [records[i] for i in order]
+            np.savez(out / "ivf.npz", centroids=centroids, offsets=offsets)
+
+        if rows is not None:
+            rows.astype(dtype).tofile(out / "vectors.bin")
+        else:
+            (out / "vectors.bin").write_bytes(b"")
+
+        with (out / "records.jsonl").open("w", encoding="utf-8") as handle:
+            for r in records:
+                handle.write(json.dumps({"id": r["id"], "metadata": r.get("metadata") or {}}, ensure_ascii=False) + "\n")
+
+        vocab: dict[str, list[str]] = {}
+        columns: dict[str, np.ndarray] = {}
+        for name in CATEGORICAL_FIELDS:
+            values = [(r.get("metadata") or {}).get(name) for r in records]
+            vocab[name] = sorted({str(v) for v in values if v not in (None, "")})
+            lookup = {v: i for i, v in enumerate(vocab[name])}
+            columns[name] = np.array(
+                [lookup[str(v)] if v not in (None, "") else -1 for v in values],
+                dtype=np.int32,
+            )
+        columns["authority_level_num"] = np.array(
+            [_authority_level_num(r.get("metadata") or {}) for r in records],
+            dtype=np.int32,
+        )
+        np.savez(out / "columns.npz", **columns)
+
+        manifest = {
+            "version": INDEX_VERSION,
+            "count": len(records),
+            "dimension": dimension,
+            "dtype": dtype,
+            "metric": "cosine",
+            "vocab": vocab,
+            "ivf_lists": lists,
+        }
+        (out / "index.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        return cls(out)
+
+    @classmethod
+    def from_legal_units(
+        cls,
+        path: str | Path,
+        units: Sequence[LegalUnit | Mapping[str, Any]],
+        embeddings: np.ndarray | Sequence[Sequence[float]] | Mapping[str, Sequence[float]],
+        **kwargs: Any,
+    ) -> "LocalVectorIndex":
+        return cls.build(path, unit_vector_records(units, embeddings), **kwargs)
+
+    def _condition_mask(self, name: str, cond: Any) -> np.ndarray:
+        if name not in self.columns:
+            raise ValueError(f"Unsupported filter field: {name} (supported: {', '.join(FILTER_FIELDS)})")
+        column = self.columns[name]
+        ops = cond if isinstance(cond, dict) else {"$eq": cond}
+        mask = np.ones(self.count, dtype=bool)
+        for op, operand in ops.items():
+            present = column >= 0
+            if op == "$exists":
+                mask &= present if operand else ~present
+                continue
+            if name in CATEGORICAL_FIELDS:
+                lookup = {v: i for i, v in enumerate(self.vocab[name])}
+                if op in ("$in", "$nin"):
+                    operand = [lookup.get(str(v), -2) for v in operand]
+                elif op in ("$eq", "$ne"):
+                    operand = lookup.get(str(operand), -2)
+                else:
+                    raise ValueError(f"Operator {op} is not supported on {name}")
+            if op == "$eq":
+                mask &= column == operand
+            elif op == "$ne":
+                mask &= column != operand
+            elif op == "$in":
+                mask &= np.isin(column, operand)
+            elif op == "$nin":
+                mask &= ~np.isin(column, operand)
+            elif op == "$gt":
+                mask &= present & (column > operand)
+            elif op == "$gte":
+                mask &= present & (column >= operand)
+            elif op == "$lt":
+                mask &= present & (column < operand)
+            elif op == "$lte":
+                mask &= present & (column <= operand)
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+    def filter_mask(self, flt: Mapping[str, Any] | None) -> np.ndarray:
+        if not flt:
+            return np.ones(self.count, dtype=bool)
+        mask = np.ones(self.count, dtype=bool)
+        for key, cond in flt.items():
+            if key == "$and":
+                for sub in cond:
+                    mask &= self.filter_mask(sub)
+            elif key == "$or":
+                any_mask = np.zeros(self.count, dtype=bool)
+                for sub in cond:
+                    any_mask |= self.filter_mask(sub)
+                mask &= any_mask
+            else:
+                mask &= self._condition_mask(key, cond)
+        return mask
+
+    def _prepare_queries(self, queries: np.ndarray | Sequence[Sequence[float]]) -> np.ndarray:
+        q = np.asarray(queries, dtype=np.float32)
+        if q.ndim == 1:
+            q = q[None, :]
+        # An empty index has no dimension to check against.
+        if self.count and q.shape[1] != self.dimension:
+            raise ValueError(f"Query dimension {q.shape[1]} does not match index dimension {self.dimension}")
+        return _normalize_rows(q)
+
+    @staticmethod
+    def _merge(
+        best_scores: np.ndarray,
+        best_rows: np.ndarray,
+        scores: np.ndarray,
+        rows: np.ndarray,
+        top_k: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_rows = np.concatenate([best_rows, np.broadcast_to(rows, scores.shape)], axis=1)
+        if merged_scores.shape[1] > top_k:
+            keep = np.argpartition(-merged_scores, top_k - 1, axis=1)[:, :top_k]
+            merged_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            merged_rows = np.take_along_axis(merged_rows, keep, axis=1)
+        return merged_scores, merged_rows
+
+    def _exact(self, mask: np.ndarray, q: np.ndarray, top_k: int, block_rows: int) -> tuple[np.ndarray, np.ndarray]:
+        """Top-k over every row passing `mask`, scanning the matrix in blocks."""
+        best_scores = np.full((len(q), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(q), 0), dtype=np.int64)
+        for start in range(0, self.count, block_rows):
+            block_mask = mask[start:start + block_rows]
+            if not block_mask.any():
+                continue
+            block = np.asarray(self.matrix[start:start + block_rows], dtype=np.float32)
+            rows = np.arange(start, start + len(block))
+            if not block_mask.all():
+                block, rows = block[block_mask], rows[block_mask]
+            best_scores, best_rows = self._merge(best_scores, best_rows, q @ block.T, rows, top_k)
+        return best_scores, best_rows
+
+    def _probed(self, mask: np.ndarray, q: np.ndarray, top_k: int, nprobe: int) -> tuple[np.ndarray, np.ndarray]:
+        """Top-k over the `nprobe` nearest IVF lists of each query, batching queries per list."""
+        probes = min(nprobe, len(self.centroids))
+        nearest = np.argsort(-(q @ self.centroids.T), axis=1, kind="stable")[:, :probes]
+        best_scores = np.full((len(q), top_k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(q), top_k), -1, dtype=np.int64)
+        for k in np.unique(nearest):
+            start, end = int(self.list_offsets[k]), int(self.list_offsets[k + 1])
+            list_mask = mask[start:end]
+            if not list_mask.any():
+                continue
+            block = np.asarray(self.matrix[start:end], dtype=np.float32)[list_mask]
+            rows = np.arange(start, end)[list_mask]
+            queries = np.flatnonzero((nearest == k).any(axis=1))
+            scores, found = self._merge(best_scores[queries], best_rows[queries], q[queries] @ block.T, rows, top_k)
+            best_scores[queries], best_rows[queries] = scores, found
+        return best_scores, best_rows
+
+    def _hits(self, scores: np.ndarray, rows: np.ndarray) -> list[SearchHit]:
+        # Highest score first, row order breaks ties so results are deterministic.
+        order = np.lexsort((rows, -scores))
+        return [
+            SearchHit(id=self.ids[rows[i]], score=float(scores[i]), metadata=self.metadata[rows[i]])
+            for i in order
+            if np.isfinite(scores[i])
+        ]
+
+    def search(
+        self,
+        queries: np.ndarray | Sequence[Sequence[float]] | Sequence[float],
+        top_k: int = 10,
+        filter: Mapping[str, Any] | None = None,
+        nprobe: int | None = None,
+        exact: bool = False,
+        block_rows: int = DEFAULT_BLOCK_ROWS,
+    ) -> list[list[SearchHit]]:
+        """Return the top_k hits for each query row.
+
+        Uses the IVF quantizer when the index has one (probing `nprobe` lists,
+        default 8) unless `exact` is set; otherwise scans every row that passes
+        the filter with blocked matrix products.
+        """
+        q = self._prepare_queries(queries)
+        if self.count == 0 or top_k <= 0:
+            return [[] for _ in range(len(q))]
+
+        mask = self.filter_mask(filter)
+        if self.centroids is None or exact:
+            scores, found = self._exact(mask, q, top_k, block_rows)
+        else:
+            scores, found = self._probed(mask, q, top_k, nprobe or 8)
+        return [self._hits(scores[i], found[i]) for i in range(len(q))]
@@ -0,0 +1,143 @@
+import json
+import threading
+
+import pytest
+
+from batching import EmbeddingBatcher, pack_batches, send_batches, vector_payload_size
+
+
+def _vec(i: int, text_len: int) -> dict:
+    return {'id': f'v{i}', 'values': [0.5] * 8, 'metadata': {'text': 'x' * text_len}}
+
+
+class RecordingIndex:
+    def __init__(self, fail_on: set[int] | None = None):
+        self.calls = []
+        self.fail_on = fail_on or set()
+        self.lock = threading.Lock()
+
+    def upsert(self, vectors, namespace):
+        with self.lock:
+            self.calls.append((namespace, [v['id'] for v in vectors]))
+        if vectors[0]['id'] in {f'v{i}' for i in self.fail_on}:
+            raise RuntimeError('boom')
+
+
+def test_batches_never_exceed_byte_limit_with_mixed_sizes():
+    vectors = [_vec(i, 50 if i % 5 else 4000) for i in range(200)]
+    batches = pack_batches(vectors, max_count=100, max_bytes=10_000)
+
+    assert [v['id'] for b in batches for v in b] == [v['id'] for v in vectors]
+    for batch in batches:
+        assert len(json.dumps(batch).encode('utf-8')) <= 10_000
+        assert len(batch) <= 100
+
+
+def test_batches_respect_count_limit():
+    batches = pack_batches([_vec(i, 10) for i in range(250)], max_count=100)
+    assert [len(b) for b in batches] == [100, 100, 50]
+
+
+def test_packing_is_tight():
+    vectors = [_vec(i, 100) for i in range(10)]
+    size = vector_payload_size(vectors[0])
+    # Exactly three vectors fit: brackets plus two ', ' separators.
+    batches = pack_batches(vectors, max_bytes=2 + 3 * size + 4)
+    assert [len(b) for b in batches] == [3, 3, 3, 1]
+
+
+def test_oversized_vector_goes_alone():
+    vectors = [_vec(0, 10), _vec(1, 5000), _vec(2, 10)]
+    batches = pack_batches(vectors, max_bytes=1000)
+    assert [[v['id'] for v in b] for b in batches] == [['v0'], ['v1'], ['v2']]
+
+
+def test_send_batches_concurrently_counts_all():
+    index = RecordingIndex()
+    batches = pack_batches([_vec(i, 10) for i in range(95)], max_count=10)
+    total = send_batches(index, 'ns', batches, max_workers=4)
+    assert total == 95
+    assert sorted(i for _ns, ids in index.calls for i in ids) == sorted(f'v{i}' for i in range(95))
+
+
+def test_send_batches_reports_failures_to_handler():
+    index = RecordingIndex(fail_on={10})
+    batches = pack_batches([_vec(i, 10) for i in range(30)], max_count=10)
+    failed = []
+    total = send_batches(index, 'ns', batches, max_workers=3, on_error=lambda n, b, e: failed.append(n))
+    assert total == 20
+    assert failed == [1]
+
+
+def test_send_batches_raises_without_handler():
+    index = RecordingIndex(fail_on={0})
+    batches = pack_batches([_vec(i, 10) for i in range(5)], max_count=2)
+    with pytest.raises(RuntimeError):
+        send_batches(index, 'ns', batches)
+
+
+class FlakyEmbedder:
+    def __init__(self, bad_texts=(), fail_batches=False):
+        self.calls = []
+        self.bad_texts = set(bad_texts)
+        self.fail_batches = fail_batches
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.fail_batches and len(texts) > 1:
+            raise RuntimeError('batch rejected')
+        if self.bad_texts & set(texts):
+            return []
+        return [[float(len(t))] for t in texts]
+
+
+def _file_chunks(name: str, n: int) -> tuple[list[dict], list[str]]:
+    texts = [f'{name}-{i}' for i in range(n)]
+    return [{'id': t, 'metadata': {'text': t}} for t in texts], texts
+
+
+def test_embedding_batches_span_files_and_scatter_back():
+    embed = FlakyEmbedder()
+    batcher = EmbeddingBatcher(embed, max_count=4, max_tokens=10_000)
+    done = []
+    for name, n in (('a', 3), ('b', 3), ('c', 1)):
+        done += batcher.add(name, *_file_chunks(name, n))
+    done += batcher.flush()
+
+    assert [len(c) for c in embed.calls] == [4, 3]
+    assert [key for key, _ in done] == ['a', 'b', 'c']
+    for _, vectors in done:
+        assert all(v['values'] == [float(len(v['id']))] for v in vectors)
+
+
+def test_embedding_batches_respect_token_budget():
+    embed = FlakyEmbedder()
+    batcher = EmbeddingBatcher(embed, max_count=100, max_tokens=50)
+    vectors = [{'id': str(i)} for i in range(5)]
+    batcher.add('f', vectors, ['x' * 80] * 5)
+    batcher.flush()
+    # 20 estimated tokens each: two per request.
+    assert [len(c) for c in embed.calls] == [2, 2, 1]
+
+
+def test_failed_batch_is_retried_per_chunk():
+    embed = FlakyEmbedder(fail_batches=True)
+    batcher = EmbeddingBatcher(embed, max_count=8)
+    batcher.add('a', *_file_chunks('a', 2))
+    done = batcher.add('b', *_file_chunks('b', 2)) + batcher.flush()
+
+    assert [key for key, _ in done] == ['a', 'b']
+    assert batcher.retried_chunks == 4
+    assert [len(c) for c in embed.calls] == [4, 1, 1, 1, 1]
+
+
+def test_file_with_unembeddable_chunk_is_reported_not_returned():
+    failures = []
+    embed = FlakyEmbedder(bad_texts={'b-1'})
+    batcher = EmbeddingBatcher(embed, on_failure=lambda key, vectors, failed: failures.append((key, failed)))
+    batcher.add('a', *_file_chunks('a', 2))
+    batcher.add('b', *_file_chunks('b', 2))
+    done = batcher.flush()
+
+    assert [key for key, _ in done] == ['a']
+    assert failures == [('b', [1])]
@@ -0,0 +1,18 @@
+import math
+
+from fake_embeddings import FakeEmbeddingClient, fake_embedding
+
+
+def test_embeddings_are_deterministic_unit_vectors():
+    first = fake_embedding('R205(a) open work permit', 64)
+    assert first == fake_embedding('R205(a) open work permit', 64)
+    assert first != fake_embedding('R205(b) open work permit', 64)
+    assert math.isclose(math.sqrt(sum(v * v for v in first)), 1.0)
+
+
+def test_client_matches_openai_response_shape():
+    client = FakeEmbeddingClient(dimension=8)
+    response = client.embeddings.create(model='fake', input=['a', 'b'])
+    assert [len(d.embedding) for d in response.data] == [8, 8]
+    assert client.requests == 1
+    assert client.texts == 2
@@ -0,0 +1,43 @@
+import json
+
+from journal import JournaledState, journal_path, load_journaled
+
+SECTIONS = {'sources': dict, 'runs': list}
+
+
+def test_updates_survive_without_close(tmp_path):
+    path = tmp_path / 'manifest.json'
+    store = JournaledState(path, SECTIONS)
+    store.set('sources', 'a', {'status': 'upserted'})
+    store.set('sources', 'b', {'status': 'failed'})
+    store.delete('sources', 'b')
+    store.append('runs', {'n': 1})
+    # Simulated crash: nothing compacted, the journal alone carries the updates.
+    assert not path.exists()
+
+    state = load_journaled(path, SECTIONS)
+    assert state['sources'] == {'a': {'status': 'upserted'}}
+    assert state['runs'] == [{'n': 1}]
+
+    reopened = JournaledState(path, SECTIONS)
+    assert reopened.state['sources'] == state['sources']
+    assert journal_path(path).read_text(encoding='utf-8') == ''
+
+
+def test_compacts_every_n_entries(tmp_path):
+    path = tmp_path / 'manifest.json'
+    store = JournaledState(path, SECTIONS, compact_every=3)
+    for i in range(7):
+        store.set('sources', str(i), i)
+    assert len(json.loads(path.read_text(encoding='utf-8'))['sources']) == 6
+    assert len(journal_path(path).read_text(encoding='utf-8').splitlines()) == 1
+    store.close()
+    assert len(load_journaled(path, SECTIONS)['sources']) == 7
+
+
+def test_unreadable_snapshot_is_kept_aside(tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_text('{"sources": {', encoding='utf-8')
+    store = JournaledState(path, SECTIONS)
+    assert store.state['sources'] == {}
+    assert (tmp_path / 'manifest.json.corrupt').read_text(encoding='utf-8') == '{"sources": {'
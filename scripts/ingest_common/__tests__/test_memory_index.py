@@ -0,0 +1,123 @@
+import pytest
+
+import memory_index
+from memory_index import InjectedFault, MemoryIndex, MemoryIndexError, matches_filter
+
+
+def _vec(i: int, source_id: str, values: list[float] | None = None, **metadata) -> dict:
+    return {
+        'id': f'{source_id}|c{i}',
+        'values': values or [0.1, 0.2],
+        'metadata': {'source_id': source_id, 'text': f'chunk {i}', **metadata},
+    }
+
+
+def test_upsert_fetch_and_stats():
+    index = MemoryIndex()
+    index.upsert(vectors=[_vec(i, 'a') for i in range(3)], namespace='ns')
+    index.upsert(vectors=[_vec(0, 'b')], namespace='other')
+
+    fetched = index.fetch(ids=['a|c0', 'a|c9'], namespace='ns')
+    assert list(fetched.vectors) == ['a|c0']
+    assert fetched.vectors['a|c0'].metadata['source_id'] == 'a'
+    stats = index.describe_index_stats()
+    assert stats.total_vector_count == 4
+    assert stats.namespaces['ns'].vector_count == 3
+    assert index.stats['upsert_requests'] == 2
+    assert index.stats['bytes_upserted'] > 0
+
+
+def test_delete_by_id_and_by_source_filter():
+    index = MemoryIndex()
+    index.upsert(vectors=[_vec(i, 'a') for i in range(3)] + [_vec(0, 'b')], namespace='ns')
+    index.delete(ids=['a|c0'], namespace='ns')
+    index.delete(filter={'source_id': {'$eq': 'a'}}, namespace='ns')
+    assert index.describe_index_stats()['namespaces'] == {'ns': {'vector_count': 1}}
+
+
+def test_query_ranks_by_cosine_within_filter():
+    index = MemoryIndex()
+    index.upsert(vectors=[
+        _vec(0, 'a', [1.0, 0.0], chunk_index=0),
+        _vec(1, 'a', [0.6, 0.8], chunk_index=1),
+        _vec(2, 'b', [1.0, 0.1], chunk_index=0),
+    ], namespace='ns')
+
+    result = index.query(vector=[1.0, 0.0], top_k=5, namespace='ns', filter={'source_id': 'a'}, include_metadata=True)
+    assert [m.id for m in result.matches] == ['a|c0', 'a|c1']
+    assert result.matches[0].score == pytest.approx(1.0)
+    assert result.matches[1].metadata['chunk_index'] == 1
+
+    zero = index.query(vector=[0.0, 0.0], top_k=2, namespace='ns')
+    assert [m.score for m in zero.matches] == [0.0, 0.0]
+
+
+def test_filter_operators():
+    meta = {'instrument': ['WORK', 'STUDY'], 'authority_level_num': 3, 'language': 'en'}
+    assert matches_filter(meta, {'instrument': {'$in': ['WORK']}})
+    assert matches_filter(meta, {'instrument': 'STUDY'})
+    assert not matches_filter(meta, {'instrument': {'$nin': ['STUDY']}})
+    assert matches_filter(meta, {'$and': [{'authority_level_num': {'$gte': 3}}, {'language': {'$ne': 'fr'}}]})
+    assert matches_filter(meta, {'$or': [{'language': 'fr'}, {'authority_level_num': {'$lt': 4}}]})
+    assert matches_filter(meta, {'expiry_date': {'$exists': False}})
+
+
+def test_limits_are_enforced():
+    index = MemoryIndex(dimension=2)
+    with pytest.raises(MemoryIndexError, match='dimension'):
+        index.upsert(vectors=[_vec(0, 'a', [1.0, 0.0, 0.0])], namespace='ns')
+    with pytest.raises(MemoryIndexError, match='metadata size'):
+        index.upsert(vectors=[_vec(0, 'a', text='x' * 41_000)], namespace='ns')
+    with pytest.raises(MemoryIndexError, match='null'):
+        index.upsert(vectors=[_vec(0, 'a', section_id=None)], namespace='ns')
+    with pytest.raises(MemoryIndexError, match='exceeds the limit of 1000'):
+        index.upsert(vectors=[_vec(i, 'a') for i in range(1001)], namespace='ns')
+    with pytest.raises(MemoryIndexError, match='request size'):
+        index.upsert(vectors=[_vec(i, 'a', text='y' * 30_000) for i in range(80)], namespace='ns')
+    with pytest.raises(MemoryIndexError, match='top_k'):
+        index.query(vector=[1.0, 0.0], top_k=2000, namespace='ns', include_metadata=True)
+    assert index.describe_index_stats().total_vector_count == 0
+
+
+def test_fault_injection_is_seeded():
+    def run() -> list[bool]:
+        index = MemoryIndex(fault_rate=0.5, fault_operations={'upsert'}, seed=7)
+        outcomes = []
+        for i in range(20):
+            try:
+                index.upsert(vectors=[_vec(i, 'a')], namespace='ns')
+                outcomes.append(True)
+            except InjectedFault:
+                outcomes.append(False)
+        index.fetch(ids=['a|c0'], namespace='ns')
+        return outcomes
+
+    first = run()
+    assert first == run()
+    assert True in first and False in first
+
+
+def test_env_selects_one_shared_index(monkeypatch):
+    monkeypatch.setattr(memory_index, '_shared_index', None)
+    monkeypatch.delenv('PINECONE_BACKEND', raising=False)
+    assert memory_index.memory_index_from_env() is None
+
+    monkeypatch.setenv('PINECONE_BACKEND', 'memory')
+    monkeypatch.setenv('MEMORY_INDEX_LATENCY_MS', '5')
+    first = memory_index.memory_index_from_env()
+    assert first is memory_index.memory_index_from_env()
+    assert first.latency_seconds == pytest.approx(0.005)
+
+
+def test_list_pages_ids_by_prefix():
+    index = MemoryIndex()
+    index.upsert(vectors=[_vec(i, 'a') for i in range(5)] + [_vec(0, 'b')], namespace='ns')
+
+    first = index.list_paginated(prefix='a|', limit=2, namespace='ns')
+    assert [v.id for v in first.vectors] == ['a|c0', 'a|c1']
+    second = index.list_paginated(prefix='a|', limit=2, pagination_token=first.pagination.next, namespace='ns')
+    assert [v.id for v in second.vectors] == ['a|c2', 'a|c3']
+    assert list(index.list(prefix='a|', limit=2, namespace='ns')) == [['a|c0', 'a|c1'], ['a|c2', 'a|c3'], ['a|c4']]
+    assert index.list_paginated(prefix='b|', namespace='ns').pagination is None
+    with pytest.raises(MemoryIndexError):
+        index.list_paginated(limit=101, namespace='ns')
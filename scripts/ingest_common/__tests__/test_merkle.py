@@ -0,0 +1,44 @@
+from merkle import ChecksumTree, source_of
+
+
+def _tree(sources: dict[str, int], namespace: str = 'ns') -> ChecksumTree:
+    tree = ChecksumTree(namespace)
+    for sid, count in sources.items():
+        for i in range(count):
+            tree.add(f'md|{sid}|{i}', f'h-{sid}-{i}')
+    return tree
+
+
+def test_root_is_independent_of_insertion_order():
+    a = _tree({'aa1': 3, 'ab2': 2, 'ff0': 1})
+    b = ChecksumTree('ns')
+    for sid, i in [('ff0', 0), ('ab2', 1), ('aa1', 2), ('aa1', 0), ('ab2', 0), ('aa1', 1)]:
+        b.add(f'md|{sid}|{i}', f'h-{sid}-{i}')
+    assert a.root == b.root
+    assert a.diff(b) == {}
+    assert source_of('pdf|aa1|c4') == 'aa1'
+
+
+def test_diff_names_missing_extra_and_changed_chunks():
+    local = _tree({'aa1': 3, 'ab2': 2, 'ff0': 1})
+    remote = _tree({'aa1': 3, 'ab2': 2, 'cc9': 1})
+    remote.add('md|aa1|1', 'edited')
+    remote.add('md|ab2|2', 'h-ab2-2')
+
+    assert local.bucket_hashes['ff'] != remote.bucket_hashes.get('ff')
+    assert local.diff(remote) == {
+        'aa1': {'missing': [], 'extra': [], 'changed': ['md|aa1|1']},
+        'ab2': {'missing': [], 'extra': ['md|ab2|2'], 'changed': []},
+        'cc9': {'missing': [], 'extra': ['md|cc9|0'], 'changed': []},
+        'ff0': {'missing': ['md|ff0|0'], 'extra': [], 'changed': []},
+    }
+
+
+def test_save_and_load_round_trip(tmp_path):
+    tree = _tree({'aa1': 2, 'b07': 4})
+    path = tmp_path / 'tree.json'
+    tree.save(path)
+    loaded = ChecksumTree.load(path)
+    assert loaded.root == tree.root
+    assert loaded.namespace == 'ns'
+    assert loaded.chunk_count == 6
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from stages import Stage, StepTimer, run_stages
+
+
+def test_items_flow_through_all_stages_in_order():
+    seen = []
+    report = run_stages(
+        range(5),
+        [
+            Stage('double', lambda x: x * 2),
+            Stage('skip_four', lambda x: None if x == 4 else x),
+            Stage('sink', seen.append),
+        ],
+    )
+    assert seen == [0, 2, 6, 8]
+    names = [s['name'] for s in report['stages']]
+    assert names == ['double', 'skip_four', 'sink']
+    assert report['stages'][0]['items_out'] == 5
+    assert report['stages'][1]['items_out'] == 4
+
+
+def test_stages_overlap_across_items():
+    def slow(x):
+        time.sleep(0.05)
+        return x
+
+    started = time.perf_counter()
+    run_stages(range(6), [Stage('a', slow), Stage('b', slow), Stage('c', slow)])
+    elapsed = time.perf_counter() - started
+    # Back-to-back would take 6 * 3 * 0.05 = 0.9s; pipelined is ~(6 + 2) * 0.05.
+    assert elapsed < 0.7
+
+
+def test_bounded_queue_applies_backpressure():
+    produced = []
+    in_flight = []
+    release = threading.Event()
+
+    def produce(x):
+        produced.append(x)
+        return x
+
+    def blocked_sink(x):
+        release.wait(timeout=2)
+
+    def feeder():
+        time.sleep(0.3)
+        in_flight.append(len(produced))
+        release.set()
+
+    threading.Thread(target=feeder).start()
+    run_stages(range(20), [Stage('produce', produce), Stage('sink', blocked_sink)], queue_size=1)
+    # One item in the sink, one queued, one waiting to be queued.
+    assert in_flight == [3]
+    assert len(produced) == 20
+
+
+def test_on_error_drops_item_and_continues():
+    errors = []
+    out = []
+
+    def boom(x):
+        if x == 2:
+            raise ValueError('bad item')
+        return x
+
+    report = run_stages(
+        range(4),
+        [Stage('work', boom), Stage('sink', out.append)],
+        on_error=lambda stage, item, exc: errors.append((stage, item, str(exc))),
+    )
+    assert out == [0, 1, 3]
+    assert errors == [('work', 2, 'bad item')]
+    assert report['stages'][0]['errors'] == 1
+
+
+def test_unhandled_error_stops_pipeline_and_reraises():
+    consumed = []
+
+    def boom(x):
+        if x == 3:
+            raise RuntimeError('fatal')
+        return x
+
+    with pytest.raises(RuntimeError, match='fatal'):
+        run_stages(
+            range(1000),
+            [Stage('source', lambda x: x), Stage('work', boom), Stage('sink', consumed.append)],
+            queue_size=1,
+        )
+    assert consumed == [0, 1, 2]
+
+
+def test_step_timer_accumulates_across_threads():
+    timer = StepTimer()
+
+    def work():
+        with timer.time('embed'):
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with timer.time('upsert'):
+        pass
+
+    totals = timer.to_dict()
+    assert set(totals) == {'embed', 'upsert'}
+    assert totals['embed'] >= 0.06
+
+
+def test_flush_releases_buffered_items_after_last_input():
+    buffered = []
+    seen = []
+
+    def collect(x):
+        buffered.append(x)
+        if len(buffered) == 2:
+            batch = list(buffered)
+            buffered.clear()
+            return batch
+        return None
+
+    def flush():
+        return list(buffered) or None
+
+    report = run_stages(range(5), [Stage('pairs', collect, flush=flush), Stage('sink', seen.append)])
+    assert seen == [[0, 1], [2, 3], [4]]
+    assert report['stages'][0]['items_out'] == 3
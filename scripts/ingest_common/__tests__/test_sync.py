@@ -0,0 +1,73 @@
+from memory_index import MemoryIndex
+from sync import chunk_hashes, compute_chunk_hash, delete_ids, embedding_key, list_ids, plan_sync, remote_chunk_hashes
+
+
+def _vec(source_id: str, i: int, text: str, embedding: str | None = None, **extra) -> dict:
+    metadata = {'text': text, 'source_id': source_id, 'chunk_index': i, 'content_hash': 'doc-v1', **extra}
+    metadata['chunk_hash'] = compute_chunk_hash(text, metadata, embedding)
+    return {'id': f'md|{source_id}|{i}', 'values': [0.1, 0.2], 'metadata': metadata}
+
+
+def test_chunk_hash_ignores_document_hash_but_not_metadata():
+    base = {'text': 'x', 'title': 'T', 'content_hash': 'doc-v1'}
+    assert compute_chunk_hash('x', base) == compute_chunk_hash('x', {**base, 'content_hash': 'doc-v2'})
+    assert compute_chunk_hash('x', base) != compute_chunk_hash('x', {**base, 'title': 'U'})
+    assert compute_chunk_hash('x', base) != compute_chunk_hash('y', base)
+
+
+def test_plan_upserts_new_and_changed_and_deletes_stale():
+    remote = {
+        'md|s|0': _vec('s', 0, 'same')['metadata']['chunk_hash'],
+        'md|s|1': 'old-hash',
+        'md|s|2': None,
+        'md|s|9': 'gone',
+    }
+    local = [_vec('s', 0, 'same'), _vec('s', 1, 'edited'), _vec('s', 2, 'legacy'), _vec('s', 3, 'new')]
+    plan = plan_sync(local, remote)
+    assert plan.unchanged == ['md|s|0']
+    assert [v['id'] for v in plan.upsert] == ['md|s|1', 'md|s|2', 'md|s|3']
+    assert plan.delete == ['md|s|9']
+    assert plan.to_dict() == {'upsert': 3, 'unchanged': 1, 'delete': 1}
+    assert plan_sync(local, chunk_hashes(local)).noop
+
+
+def test_model_change_or_force_reembeds_every_chunk():
+    old = [_vec('s', i, f'chunk {i}', embedding_key('text-embedding-3-small')) for i in range(3)]
+    tracked = chunk_hashes(old)
+    assert plan_sync(old, tracked).noop
+
+    for embedding in (embedding_key('text-embedding-3-large'), embedding_key('text-embedding-3-small', 512)):
+        local = [_vec('s', i, f'chunk {i}', embedding) for i in range(3)]
+        plan = plan_sync(local, tracked)
+        assert [v['id'] for v in plan.upsert] == ['md|s|0', 'md|s|1', 'md|s|2']
+        assert plan.unchanged == []
+
+    stale = {**tracked, 'md|s|9': 'gone'}
+    plan = plan_sync(old, stale, force=True)
+    assert len(plan.upsert) == 3 and plan.unchanged == []
+    assert plan.delete == ['md|s|9']
+
+
+def test_listed_remote_state_round_trip():
+    index = MemoryIndex()
+    old = [_vec('s', i, f'chunk {i}') for i in range(250)] + [_vec('t', 0, 'other source')]
+    index.upsert(vectors=old[:200], namespace='ns')
+    index.upsert(vectors=old[200:], namespace='ns')
+
+    assert len(list_ids(index, 'ns', 'md|s|')) == 250
+    assert index.stats['list_requests'] == 3
+
+    local = [_vec('s', i, f'chunk {i}') for i in range(100)]
+    local[5] = _vec('s', 5, 'rewritten')
+    plan = plan_sync(local, remote_chunk_hashes(index, 'ns', 'md|s|'))
+    assert [v['id'] for v in plan.upsert] == ['md|s|5']
+    assert len(plan.unchanged) == 99
+    assert len(plan.delete) == 150
+
+    tracked = chunk_hashes(old[:250])
+    assert plan_sync(local, remote_chunk_hashes(index, 'ns', 'md|s|', tracked)).to_dict() == plan.to_dict()
+
+    index.upsert(vectors=plan.upsert, namespace='ns')
+    assert delete_ids(index, 'ns', plan.delete, batch_size=100) == 150
+    assert len(list_ids(index, 'ns', 'md|s|')) == 100
+    assert list_ids(index, 'ns', 'md|t|') == ['md|t|0']
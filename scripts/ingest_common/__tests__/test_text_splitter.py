@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from text_splitter import TextSplitter
+
+
+PIECES = ['a', 'bb', 'ccc', ' ', '  ', '\n', '\n\n', '\n\n\n', 'word', 'x' * 30, ' \n ', '\t']
+
+
+def _random_text(rng: random.Random) -> str:
+    return ''.join(rng.choice(PIECES) for _ in range(rng.randint(0, 80)))
+
+
+def test_paragraphs_merge_up_to_chunk_size_with_overlap():
+    text = 'alpha beta gamma\n\ndelta epsilon\n\nzeta eta theta iota'
+    splitter = TextSplitter(chunk_size=20, chunk_overlap=8)
+    assert splitter.split_text(text) == ['alpha beta gamma', 'delta epsilon', 'zeta eta theta iota']
+    assert TextSplitter(chunk_size=12, chunk_overlap=6).split_text('one two three four five') == [
+        'one two', 'two three', 'three four', 'four five',
+    ]
+
+
+def test_long_words_fall_back_to_characters():
+    assert TextSplitter(chunk_size=4, chunk_overlap=1).split_text('abcdefghij') == ['abcd', 'defg', 'ghij']
+
+
+def test_offsets_point_at_chunks():
+    rng = random.Random(5)
+    for _ in range(500):
+        text = _random_text(rng)
+        size = rng.randint(1, 40)
+        splitter = TextSplitter(chunk_size=size, chunk_overlap=rng.randint(0, size))
+        for offset, chunk in splitter.split_with_offsets(text):
+            assert text[offset:offset + len(chunk)] == chunk
+
+
+def test_batch_api_matches_single_calls():
+    splitter = TextSplitter(chunk_size=10, chunk_overlap=3)
+    texts = ['first section text', '', 'second\n\nsection']
+    assert splitter.split_texts(texts) == [splitter.split_text(t) for t in texts]
+
+
+def test_rejects_overlap_larger_than_chunk():
+    with pytest.raises(ValueError):
+        TextSplitter(chunk_size=10, chunk_overlap=11)
+
+
+def test_matches_langchain_recursive_splitter():
+    langchain = pytest.importorskip('langchain_text_splitters')
+    rng = random.Random(1)
+    for _ in range(3000):
+        text = _random_text(rng)
+        size = rng.randint(1, 60)
+        overlap = rng.randint(0, size)
+        separators = rng.choice([['\n\n', '\n', ' ', ''], ['\n\n', '\n', ' '], ['\n'], [' \n', 'b', '']])
+        reference = langchain.RecursiveCharacterTextSplitter(
+            chunk_size=size, chunk_overlap=overlap, separators=separators,
+        )
+        assert TextSplitter(size, overlap, separators).split_text(text) == reference.split_text(text)
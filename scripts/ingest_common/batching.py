@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Byte-accurate upsert batching shared by the PDF and markdown ingesters.
+
+Pinecone rejects upsert requests over 2 MB. Each vector is serialized once to
+learn its exact size, then batches are packed greedily by count and bytes.
+`EmbeddingBatcher` does the same on the embedding side, filling requests with
+chunks from as many files as it takes.
+"""
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+PINECONE_MAX_REQUEST_BYTES = 2 * 1024 * 1024
+# Headroom under the hard limit for the request envelope (namespace, keys).
+DEFAULT_MAX_BATCH_BYTES = 1_800_000
+DEFAULT_MAX_BATCH_COUNT = 100
+
+
+def vector_payload_size(vector: dict) -> int:
+    return len(json.dumps(vector).encode('utf-8'))
+
+
+def pack_batches(
+    vectors: list[dict],
+    max_count: int = DEFAULT_MAX_BATCH_COUNT,
+    max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+) -> list[list[dict]]:
+    """
+    Split vectors into ordered batches of at most `max_count` vectors whose
+    JSON array encoding is at most `max_bytes`.
+
+    A vector that is larger than `max_bytes` on its own is sent alone.
+    """
+    max_count = max(1, max_count)
+    batches: list[list[dict]] = []
+    current: list[dict] = []
+    # Encoded as a JSON array: '[' + ']' plus ', ' between items.
+    current_bytes = 2
+
+    for vector in vectors:
+        size = vector_payload_size(vector)
+        added = size + (2 if current else 0)
+        if current and (len(current) >= max_count or current_bytes + added > max_bytes):
+            batches.append(current)
+            current = []
+            current_bytes = 2
+            added = size
+        current.append(vector)
+        current_bytes += added
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def send_batches(
+    index: Any,
+    namespace: str,
+    batches: list[list[dict]],
+    *,
+    max_workers: int = 1,
+    on_error: Callable[[int, list[dict], Exception], None] | None = None,
+) -> int:
+    """
+    Upsert each batch and return the number of vectors accepted.
+
+    With `max_workers > 1` batches are sent concurrently from a thread pool.
+    A failed batch is passed to `on_error(batch_number, batch, exc)` when a
+    handler is given; otherwise the first failure is raised.
+    """
+    def send(batch: list[dict]) -> int:
+        index.upsert(vectors=batch, namespace=namespace)
+        return len(batch)
+
+    total = 0
+    if max_workers <= 1 or len(batches) <= 1:
+        for number, batch in enumerate(batches):
+            try:
+                total += send(batch)
+            except Exception as exc:
+                if on_error is None:
+                    raise
+                on_error(number, batch, exc)
+        return total
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upsert') as pool:
+        futures = [pool.submit(send, batch) for batch in batches]
+        for number, (batch, future) in enumerate(zip(batches, futures)):
+            try:
+                total += future.result()
+            except Exception as exc:
+                if on_error is None:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                on_error(number, batch, exc)
+    return total
+
+
+DEFAULT_EMBED_BATCH_COUNT = 96
+DEFAULT_EMBED_BATCH_TOKENS = 20_000
+
+
+def estimate_tokens(text: str) -> int:
+    # Same ~4 chars/token estimate LegalUnit.estimated_tokens uses.
+    return max(1, -(-len(text) // 4))
+
+
+class EmbeddingBatcher:
+    """
+    Collects chunks from many files into full embedding requests.
+
+    `add(key, vectors, texts)` queues one file's chunks and sends every batch
+    that is full by count (`max_count`) or estimated tokens (`max_tokens`);
+    `flush()` sends the remainder. Both return the files whose chunks all have
+    embeddings now, as `(key, vectors)` with `values` set on each vector, in the
+    order they were added.
+
+    `embed(texts)` must return one embedding per text. When a batch call fails
+    or returns the wrong number of embeddings, its chunks are retried one at a
+    time; a file with a chunk that still fails is reported through
+    `on_failure(key, vectors, failed_indices)` instead of being returned.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], list[list[float]]],
+        max_count: int = DEFAULT_EMBED_BATCH_COUNT,
+        max_tokens: int = DEFAULT_EMBED_BATCH_TOKENS,
+        on_failure: Callable[[Any, list[dict], list[int]], None] | None = None,
+    ) -> None:
+        self.embed = embed
+        self.max_count = max(1, max_count)
+        self.max_tokens = max(1, max_tokens)
+        self.on_failure = on_failure
+        self.requests = 0
+        self.retried_chunks = 0
+        self._files: list[dict[str, Any]] = []
+        # Queued chunks: (file entry, chunk index, text, estimated tokens).
+        self._queue: list[tuple[dict[str, Any], int, str, int]] = []
+        self._queued_tokens = 0
+
+    def add(self, key: Any, vectors: list[dict], texts: list[str]) -> list[tuple[Any, list[dict]]]:
+        entry = {'key': key, 'vectors': vectors, 'remaining': len(vectors), 'failed': []}
+        self._files.append(entry)
+        for i, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            self._queue.append((entry, i, text, tokens))
+            self._queued_tokens += tokens
+        while self._queue and (len(self._queue) >= self.max_count or self._queued_tokens >= self.max_tokens):
+            self._send(self._take_batch())
+        return self._completed()
+
+    def flush(self) -> list[tuple[Any, list[dict]]]:
+        while self._queue:
+            self._send(self._take_batch())
+        return self._completed()
+
+    def _take_batch(self) -> list[tuple[dict[str, Any], int, str, int]]:
+        count = 0
+        tokens = 0
+        for item in self._queue:
+            if count and (count >= self.max_count or tokens + item[3] > self.max_tokens):
+                break
+            count += 1
+            tokens += item[3]
+        batch = self._queue[:count]
+        del self._queue[:count]
+        self._queued_tokens -= tokens
+        return batch
+
+    def _call(self, texts: list[str]) -> list[list[float]] | None:
+        self.requests += 1
+        try:
+            embeddings = self.embed(texts)
+        except Exception:
+            return None
+        if len(embeddings) != len(texts) or not all(embeddings):
+            return None
+        return embeddings
+
+    def _send(self, batch: list[tuple[dict[str, Any], int, str, int]]) -> None:
+        embeddings = self._call([item[2] for item in batch])
+        if embeddings is None and len(batch) > 1:
+            self.retried_chunks += len(batch)
+            embeddings = []
+            for item in batch:
+                single = self._call([item[2]])
+                embeddings.append(single[0] if single else None)
+        elif embeddings is None:
+            embeddings = [None]
+        for (entry, i, _, _), values in zip(batch, embeddings):
+            if values is None:
+                entry['failed'].append(i)
+            else:
+                entry['vectors'][i]['values'] = values
+            entry['remaining'] -= 1
+
+    def _completed(self) -> list[tuple[Any, list[dict]]]:
+        done = []
+        while self._files and self._files[0]['remaining'] == 0:
+            entry = self._files.pop(0)
+            if entry['failed']:
+                if self.on_failure is not None:
+                    self.on_failure(entry['key'], entry['vectors'], entry['failed'])
+            else:
+                done.append((entry['key'], entry['vectors']))
+        return done
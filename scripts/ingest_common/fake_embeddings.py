@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Deterministic offline embedder for benchmarks and tests.
+
+`FakeEmbeddingClient` mimics the OpenAI client surface the ingesters use
+(`client.embeddings.create(model=..., input=[...])`). The same text always maps
+to the same unit vector, and each request can be delayed to model API latency.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+
+def fake_embedding(text: str, dimension: int) -> list[float]:
+    seed = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+    rng = random.Random(seed)
+    values = [rng.uniform(-1.0, 1.0) for _ in range(dimension)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+class _Embeddings:
+    def __init__(self, owner: 'FakeEmbeddingClient') -> None:
+        self._owner = owner
+
+    def create(self, model: str, input: list[str]) -> SimpleNamespace:
+        owner = self._owner
+        if owner.latency_seconds > 0:
+            time.sleep(owner.latency_seconds)
+        with owner.lock:
+            owner.requests += 1
+            owner.texts += len(input)
+        data = [SimpleNamespace(index=i, embedding=fake_embedding(text, owner.dimension)) for i, text in enumerate(input)]
+        return SimpleNamespace(model=model, data=data)
+
+
+class FakeEmbeddingClient:
+    def __init__(self, dimension: int = 1024, latency_seconds: float = 0.0) -> None:
+        self.dimension = dimension
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self.texts = 0
+        self.lock = threading.Lock()
+        self.embeddings = _Embeddings(self)
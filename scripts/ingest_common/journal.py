@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+JSON snapshot plus append-only journal, shared by the ingesters' state files.
+
+The snapshot at `path` is a plain JSON object whose top-level keys are
+sections: dict sections map keys to records, list sections collect entries.
+Updates are appended as one fsynced JSON line each to `<path>.journal` and
+replayed on load; a torn final line from a crash is ignored. `compact` folds
+the journal into a new snapshot written atomically (temp file + rename) and
+truncates the journal. Journal entries carry a sequence number and the
+snapshot records the last one it includes (`journal_seq`), so a crash between
+the two steps never replays an entry twice.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+COMPACT_EVERY = 500
+
+
+def journal_path(path: str | Path) -> Path:
+    return Path(f'{path}.journal')
+
+
+def _empty(sections: dict[str, type]) -> dict[str, Any]:
+    return {name: kind() for name, kind in sections.items()}
+
+
+def read_snapshot(path: str | Path, sections: dict[str, type]) -> dict[str, Any] | None:
+    """The snapshot with every section present, or None if it cannot be parsed."""
+    p = Path(path)
+    if not p.exists():
+        return _empty(sections)
+    try:
+        state = json.loads(p.read_text(encoding='utf-8'))
+    except Exception:
+        return None
+    if not isinstance(state, dict):
+        return None
+    for name, kind in sections.items():
+        state.setdefault(name, kind())
+    return state
+
+
+def _apply(state: dict[str, Any], entry: dict[str, Any]) -> None:
+    op = entry.get('op')
+    section = entry.get('section')
+    if op == 'set':
+        state.setdefault(section, {})[entry['key']] = entry['value']
+    elif op == 'delete':
+        state.setdefault(section, {}).pop(entry['key'], None)
+    elif op == 'append':
+        state.setdefault(section, []).append(entry['value'])
+
+
+def replay_journal(state: dict[str, Any], path: str | Path) -> int:
+    """Apply journal entries newer than the snapshot; returns the number applied."""
+    p = journal_path(path)
+    if not p.exists():
+        return 0
+    applied = 0
+    with p.open('r', encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Only the last line can be torn; nothing after it was committed.
+                break
+            if entry.get('seq', 0) <= state.get('journal_seq', 0):
+                continue
+            _apply(state, entry)
+            state['journal_seq'] = entry['seq']
+            applied += 1
+    return applied
+
+
+def load_journaled(path: str | Path, sections: dict[str, type]) -> dict[str, Any]:
+    """Read-only view: snapshot (empty if unreadable) with the journal replayed."""
+    state = read_snapshot(path, sections) or _empty(sections)
+    replay_journal(state, path)
+    return state
+
+
+def write_snapshot(path: str | Path, state: dict[str, Any]) -> None:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f'{p.name}.tmp')
+    with tmp.open('w', encoding='utf-8') as handle:
+        handle.write(json.dumps(state, ensure_ascii=True, indent=2))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, p)
+
+
+class JournaledState:
+    """
+    Snapshot + journal store. Each update is one fsynced line (O(1) per
+    record); the journal is compacted every `compact_every` entries, on open
+    and on close.
+    """
+
+    def __init__(self, path: str | Path, sections: dict[str, type], compact_every: int = COMPACT_EVERY) -> None:
+        self.path = Path(path)
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        state = read_snapshot(self.path, sections)
+        if state is None:
+            # Keep an unreadable snapshot for inspection instead of overwriting it.
+            os.replace(self.path, self.path.with_name(f'{self.path.name}.corrupt'))
+            state = _empty(sections)
+        self.pending = replay_journal(state, self.path)
+        self.state = state
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._journal = journal_path(self.path).open('a', encoding='utf-8')
+        if self._journal.tell():
+            # Fold what a previous run left behind (including a torn tail) so new
+            # entries are never appended after an unreadable line.
+            self._compact()
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        _apply(self.state, entry)
+        entry['seq'] = self.state['journal_seq'] = self.state.get('journal_seq', 0) + 1
+        self._journal.write(json.dumps(entry, ensure_ascii=True) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.pending += 1
+        if self.pending >= self.compact_every:
+            self._compact()
+
+    def set(self, section: str, key: str, value: Any) -> None:
+        with self.lock:
+            self._append({'op': 'set', 'section': section, 'key': key, 'value': value})
+
+    def delete(self, section: str, key: str) -> None:
+        with self.lock:
+            self._append({'op': 'delete', 'section': section, 'key': key})
+
+    def append(self, section: str, value: Any) -> None:
+        with self.lock:
+            self._append({'op': 'append', 'section': section, 'value': value})
+
+    def _compact(self) -> None:
+        write_snapshot(self.path, self.state)
+        # Entries left behind by a crash before the truncate are at or below
+        # the snapshot's journal_seq and are skipped on replay.
+        self._journal.seek(0)
+        self._journal.truncate()
+        self.pending = 0
+
+    def compact(self) -> None:
+        with self.lock:
+            self._compact()
+
+    def close(self) -> None:
+        with self.lock:
+            self._compact()
+            self._journal.close()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for a Pinecone index.
+
+Implements the parts of `pinecone.Index` the ingesters and validators use
+(`upsert`, `fetch`, `delete` by id or metadata filter, `query` with a metadata
+filter, `list`/`list_paginated` by id prefix, `describe_index_stats`),
+enforces Pinecone's request-size and metadata limits, and can add latency or
+fail a fraction of requests. Similarity is computed with NumPy over a
+per-namespace matrix that is rebuilt lazily after writes.
+
+Set `PINECONE_BACKEND=memory` to make every ingester use one shared instance
+for the life of the process (see `memory_index_from_env`).
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Iterable
+
+import numpy as np
+
+
+# Pinecone serverless limits (https://docs.pinecone.io/reference/api/database-limits).
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+MAX_UPSERT_VECTORS = 1000
+MAX_FETCH_IDS = 1000
+MAX_DELETE_IDS = 1000
+MAX_LIST_LIMIT = 100
+MAX_ID_LENGTH = 512
+MAX_METADATA_BYTES = 40 * 1024
+MAX_TOP_K = 10_000
+# top_k is capped lower when values or metadata are returned.
+MAX_TOP_K_WITH_DATA = 1000
+
+BACKEND_ENV = 'PINECONE_BACKEND'
+
+
+class MemoryIndexError(Exception):
+    """A request Pinecone would reject; `status` mirrors the HTTP status."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class InjectedFault(MemoryIndexError):
+    def __init__(self, operation: str) -> None:
+        super().__init__(f'injected fault in {operation}', status=503)
+
+
+class Response(dict):
+    """Dict response that also allows attribute access, like the SDK's models."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError as exc:
+            raise AttributeError(name) from exc
+
+    def to_dict(self) -> dict:
+        return json.loads(json.dumps(self))
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if op == '$exists':
+        return (value is not None) == bool(operand)
+    if value is None:
+        return op in ('$ne', '$nin')
+    if isinstance(value, list):
+        if op == '$eq':
+            return operand in value
+        if op == '$ne':
+            return operand not in value
+        if op == '$in':
+            return any(item in operand for item in value)
+        if op == '$nin':
+            return not any(item in operand for item in value)
+        return False
+    if op == '$eq':
+        return value == operand
+    if op == '$ne':
+        return value != operand
+    if op == '$in':
+        return value in operand
+    if op == '$nin':
+        return value not in operand
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(operand, (int, float)):
+        raise MemoryIndexError(f'{op} requires numeric metadata and operand')
+    if op == '$gt':
+        return value > operand
+    if op == '$gte':
+        return value >= operand
+    if op == '$lt':
+        return value < operand
+    if op == '$lte':
+        return value <= operand
+    raise MemoryIndexError(f'unsupported filter operator: {op}')
+
+
+def matches_filter(metadata: dict[str, Any], flt: dict[str, Any] | None) -> bool:
+    """Evaluate a Pinecone metadata filter against one record's metadata."""
+    if not flt:
+        return True
+    for key, cond in flt.items():
+        if key == '$and':
+            if not all(matches_filter(metadata, sub) for sub in cond):
+                return False
+        elif key == '$or':
+            if not any(matches_filter(metadata, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict):
+            value = metadata.get(key)
+            if not all(_compare(value, op, operand) for op, operand in cond.items()):
+                return False
+        elif not _compare(metadata.get(key), '$eq', cond):
+            return False
+    return True
+
+
+def _validate_metadata(vector_id: str, metadata: dict[str, Any]) -> None:
+    for key, value in metadata.items():
+        if value is None:
+            raise MemoryIndexError(f'metadata {key!r} of {vector_id} is null')
+        if isinstance(value, list):
+            if not all(isinstance(item, str) for item in value):
+                raise MemoryIndexError(f'metadata {key!r} of {vector_id} must be a list of strings')
+        elif not isinstance(value, (str, int, float, bool)):
+            raise MemoryIndexError(f'metadata {key!r} of {vector_id} has unsupported type {type(value).__name__}')
+    size = len(json.dumps(metadata).encode('utf-8'))
+    if size > MAX_METADATA_BYTES:
+        raise MemoryIndexError(f'metadata size is {size} bytes, which exceeds the limit of {MAX_METADATA_BYTES} bytes per vector')
+
+
+def _as_record(vector: Any) -> tuple[str, list[float], dict[str, Any]]:
+    if isinstance(vector, dict):
+        return vector['id'], vector.get('values') or [], dict(vector.get('metadata') or {})
+    if isinstance(vector, (tuple, list)):
+        metadata = vector[2] if len(vector) > 2 else {}
+        return vector[0], vector[1], dict(metadata or {})
+    return vector.id, vector.values, dict(getattr(vector, 'metadata', None) or {})
+
+
+class _Namespace:
+    def __init__(self) -> None:
+        self.values: dict[str, np.ndarray] = {}
+        self.metadata: dict[str, dict[str, Any]] = {}
+        self._matrix: tuple[list[str], np.ndarray] | None = None
+
+    def put(self, vector_id: str, values: np.ndarray, metadata: dict[str, Any]) -> None:
+        self.values[vector_id] = values
+        self.metadata[vector_id] = metadata
+        self._matrix = None
+
+    def remove(self, vector_id: str) -> None:
+        if self.values.pop(vector_id, None) is not None:
+            self.metadata.pop(vector_id, None)
+            self._matrix = None
+
+    def matrix(self) -> tuple[list[str], np.ndarray]:
+        if self._matrix is None:
+            ids = list(self.values)
+            rows = np.stack([self.values[i] for i in ids]) if ids else np.zeros((0, 0), dtype=np.float32)
+            self._matrix = (ids, rows)
+        return self._matrix
+
+
+class MemoryIndex:
+    """
+    Thread-safe in-memory index.
+
+    `latency_seconds` delays every request; `fault_rate` makes that fraction of
+    requests (optionally only the operations in `fault_operations`) raise
+    `InjectedFault`, drawn from a seeded RNG so runs are repeatable.
+    """
+
+    def __init__(
+        self,
+        dimension: int | None = None,
+        metric: str = 'cosine',
+        latency_seconds: float = 0.0,
+        fault_rate: float = 0.0,
+        fault_operations: Iterable[str] | None = None,
+        seed: int = 0,
+    ) -> None:
+        if metric not in ('cosine', 'dotproduct', 'euclidean'):
+            raise ValueError(f'unsupported metric: {metric}')
+        self.dimension = dimension
+        self.metric = metric
+        self.latency_seconds = latency_seconds
+        self.fault_rate = fault_rate
+        self.fault_operations = set(fault_operations) if fault_operations else None
+        self._rng = random.Random(seed)
+        self._namespaces: dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'upsert_requests': 0,
+            'vectors_upserted': 0,
+            'bytes_upserted': 0,
+            'delete_requests': 0,
+            'fetch_requests': 0,
+            'list_requests': 0,
+            'query_requests': 0,
+            'faults_injected': 0,
+        }
+
+    def _request(self, operation: str) -> None:
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+        if self.fault_rate <= 0:
+            return
+        if self.fault_operations is not None and operation not in self.fault_operations:
+            return
+        with self._lock:
+            failed = self._rng.random() < self.fault_rate
+            if failed:
+                self.stats['faults_injected'] += 1
+        if failed:
+            raise InjectedFault(operation)
+
+    def upsert(self, vectors: list[Any], namespace: str = '', **_kwargs: Any) -> Response:
+        self._request('upsert')
+        if len(vectors) > MAX_UPSERT_VECTORS:
+            raise MemoryIndexError(f'upsert of {len(vectors)} vectors exceeds the limit of {MAX_UPSERT_VECTORS}')
+
+        records = [_as_record(v) for v in vectors]
+        size = len(json.dumps(
+            [{'id': i, 'values': list(values), 'metadata': metadata} for i, values, metadata in records]
+        ).encode('utf-8'))
+        if size > MAX_REQUEST_BYTES:
+            raise MemoryIndexError(f'request size {size} exceeds the limit of {MAX_REQUEST_BYTES} bytes')
+
+        prepared = []
+        for vector_id, values, metadata in records:
+            if not vector_id or len(vector_id) > MAX_ID_LENGTH:
+                raise MemoryIndexError(f'vector id must be 1-{MAX_ID_LENGTH} characters: {vector_id[:40]!r}')
+            _validate_metadata(vector_id, metadata)
+            prepared.append((vector_id, np.asarray(values, dtype=np.float32), metadata))
+
+        with self._lock:
+            for vector_id, array, _metadata in prepared:
+                if self.dimension is None:
+                    self.dimension = int(array.shape[0])
+                if array.ndim != 1 or array.shape[0] != self.dimension:
+                    raise MemoryIndexError(
+                        f'vector dimension {array.shape[-1] if array.ndim else 0} does not match the dimension of the index {self.dimension}'
+                    )
+            ns = self._namespaces.setdefault(namespace, _Namespace())
+            for vector_id, array, metadata in prepared:
+                ns.put(vector_id, array, metadata)
+            self.stats['upsert_requests'] += 1
+            self.stats['vectors_upserted'] += len(prepared)
+            self.stats['bytes_upserted'] += size
+        return Response(upserted_count=len(prepared))
+
+    def fetch(self, ids: list[str], namespace: str = '', **_kwargs: Any) -> Response:
+        self._request('fetch')
+        if len(ids) > MAX_FETCH_IDS:
+            raise MemoryIndexError(f'fetch of {len(ids)} ids exceeds the limit of {MAX_FETCH_IDS}')
+        with self._lock:
+            self.stats['fetch_requests'] += 1
+            ns = self._namespaces.get(namespace) or _Namespace()
+            vectors = {
+                i: Response(id=i, values=ns.values[i].tolist(), metadata=dict(ns.metadata[i]))
+                for i in ids
+                if i in ns.values
+            }
+        return Response(namespace=namespace, vectors=vectors)
+
+    def delete(
+        self,
+        ids: list[str] | None = None,
+        delete_all: bool | None = None,
+        namespace: str = '',
+        filter: dict[str, Any] | None = None,
+        **_kwargs: Any,
+    ) -> Response:
+        self._request('delete')
+        if ids and len(ids) > MAX_DELETE_IDS:
+            raise MemoryIndexError(f'delete of {len(ids)} ids exceeds the limit of {MAX_DELETE_IDS}')
+        with self._lock:
+            self.stats['delete_requests'] += 1
+            ns = self._namespaces.get(namespace)
+            if ns is None:
+                return Response()
+            if delete_all:
+                del self._namespaces[namespace]
+            elif ids:
+                for i in ids:
+                    ns.remove(i)
+            elif filter:
+                for i in [i for i, meta in ns.metadata.items() if matches_filter(meta, filter)]:
+                    ns.remove(i)
+            if not ns.values and namespace in self._namespaces:
+                del self._namespaces[namespace]
+        return Response()
+
+    def list_paginated(
+        self,
+        prefix: str | None = None,
+        limit: int | None = None,
+        pagination_token: str | None = None,
+        namespace: str = '',
+        **_kwargs: Any,
+    ) -> Response:
+        """One page of ids starting with `prefix`, in id order; `pagination.next` resumes after it."""
+        self._request('list')
+        limit = MAX_LIST_LIMIT if limit is None else limit
+        if limit < 1 or limit > MAX_LIST_LIMIT:
+            raise MemoryIndexError(f'limit must be between 1 and {MAX_LIST_LIMIT}')
+        with self._lock:
+            self.stats['list_requests'] += 1
+            ns = self._namespaces.get(namespace) or _Namespace()
+            ids = sorted(
+                i for i in ns.values
+                if (not prefix or i.startswith(prefix)) and (pagination_token is None or i > pagination_token)
+            )
+        page = ids[:limit]
+        pagination = Response(next=page[-1]) if len(ids) > limit else None
+        return Response(namespace=namespace, vectors=[Response(id=i) for i in page], pagination=pagination)
+
+    def list(self, prefix: str | None = None, namespace: str = '', limit: int | None = None, **_kwargs: Any):
+        """Yield pages of ids starting with `prefix`, like the SDK's `Index.list`."""
+        token = None
+        while True:
+            page = self.list_paginated(prefix=prefix, limit=limit, pagination_token=token, namespace=namespace)
+            if page.vectors:
+                yield [v.id for v in page.vectors]
+            if not page.pagination:
+                return
+            token = page.pagination.next
+
+    def query(
+        self,
+        vector: list[float] | None = None,
+        id: str | None = None,
+        top_k: int = 10,
+        namespace: str = '',
+        filter: dict[str, Any] | None = None,
+        include_values: bool = False,
+        include_metadata: bool = False,
+        **_kwargs: Any,
+    ) -> Response:
+        self._request('query')
+        limit = MAX_TOP_K_WITH_DATA if (include_values or include_metadata) else MAX_TOP_K
+        if top_k < 1 or top_k > limit:
+            raise MemoryIndexError(f'top_k must be between 1 and {limit}')
+
+        with self._lock:
+            self.stats['query_requests'] += 1
+            ns = self._namespaces.get(namespace) or _Namespace()
+            if vector is None:
+                if id is None or id not in ns.values:
+                    return Response(namespace=namespace, matches=[])
+                query = ns.values[id]
+            else:
+                query = np.asarray(vector, dtype=np.float32)
+                if self.dimension is not None and query.shape[0] != self.dimension:
+                    raise MemoryIndexError(
+                        f'query vector dimension {query.shape[0]} does not match the dimension of the index {self.dimension}'
+                    )
+            ids, matrix = ns.matrix()
+            if filter:
+                keep = [pos for pos, i in enumerate(ids) if matches_filter(ns.metadata[i], filter)]
+                ids = [ids[pos] for pos in keep]
+                matrix = matrix[keep] if keep else matrix[:0]
+            scores = self._scores(matrix, query)
+            order = np.argsort(-scores, kind='stable')[:top_k]
+            matches = []
+            for pos in order:
+                match = Response(id=ids[pos], score=float(scores[pos]))
+                if include_values:
+                    match['values'] = matrix[pos].tolist()
+                if include_metadata:
+                    match['metadata'] = dict(ns.metadata[ids[pos]])
+                matches.append(match)
+        return Response(namespace=namespace, matches=matches)
+
+    def _scores(self, matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if matrix.shape[0] == 0:
+            return np.zeros(0, dtype=np.float32)
+        if self.metric == 'dotproduct':
+            return matrix @ query
+        if self.metric == 'euclidean':
+            # Pinecone ranks euclidean by squared distance, smaller is closer.
+            return -np.sum((matrix - query) ** 2, axis=1)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        dots = matrix @ query
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def describe_index_stats(self, filter: dict[str, Any] | None = None, **_kwargs: Any) -> Response:
+        self._request('describe_index_stats')
+        with self._lock:
+            namespaces = {
+                name: Response(vector_count=sum(1 for meta in ns.metadata.values() if matches_filter(meta, filter)))
+                for name, ns in self._namespaces.items()
+            }
+        return Response(
+            namespaces=namespaces,
+            dimension=self.dimension or 0,
+            total_vector_count=sum(ns.vector_count for ns in namespaces.values()),
+        )
+
+
+_shared_index: MemoryIndex | None = None
+_shared_lock = threading.Lock()
+
+
+def memory_index_from_env() -> MemoryIndex | None:
+    """
+    Return the process-wide MemoryIndex when `PINECONE_BACKEND=memory`, else None.
+
+    Optional tuning: `MEMORY_INDEX_LATENCY_MS`, `MEMORY_INDEX_FAULT_RATE`,
+    `MEMORY_INDEX_SEED`, `MEMORY_INDEX_METRIC` and `EMBEDDING_DIM`.
+    """
+    global _shared_index
+    if os.getenv(BACKEND_ENV, '').strip().lower() != 'memory':
+        return None
+    with _shared_lock:
+        if _shared_index is None:
+            dimension = os.getenv('EMBEDDING_DIM')
+            _shared_index = MemoryIndex(
+                dimension=int(dimension) if dimension else None,
+                metric=os.getenv('MEMORY_INDEX_METRIC', 'cosine'),
+                latency_seconds=float(os.getenv('MEMORY_INDEX_LATENCY_MS', '0')) / 1000,
+                fault_rate=float(os.getenv('MEMORY_INDEX_FAULT_RATE', '0')),
+                seed=int(os.getenv('MEMORY_INDEX_SEED', '0')),
+            )
+        return _shared_index
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Checksum tree over (chunk id, chunk hash) pairs, grouped by source_id.
+
+Three levels above the chunks: a hash per source (its sorted chunk ids and
+hashes), a hash per bucket of sources (the first `BUCKET_CHARS` characters of
+the source_id) and a root over the buckets. The ingesters write the tree for
+what they have upserted; the same tree can be rebuilt from chunk metadata
+fetched from the namespace. `diff` walks the two top-down and only descends
+into buckets and sources whose hashes differ, so comparing trees costs
+O(changed) and names the exact chunks that are missing, extra or changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterable
+
+from journal import write_snapshot
+
+BUCKET_CHARS = 2
+TREE_VERSION = 1
+
+
+def source_of(chunk_id: str) -> str:
+    """source_id embedded in ingester ids (`pdf|<source_id>|c3`, `md|<source_id>|3`)."""
+    parts = chunk_id.split('|')
+    return parts[1] if len(parts) == 3 else ''
+
+
+def _digest(lines: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    for line in lines:
+        h.update(line.encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def source_hash(chunks: dict[str, str | None]) -> str:
+    return _digest(f'{chunk_id}\t{chunks[chunk_id] or ""}' for chunk_id in sorted(chunks))
+
+
+class ChecksumTree:
+    def __init__(self, namespace: str = '') -> None:
+        self.namespace = namespace
+        self.sources: dict[str, dict[str, str | None]] = {}
+        self._hashes: tuple[dict[str, str], dict[str, str], str] | None = None
+
+    def add(self, chunk_id: str, chunk_hash: str | None, source_id: str | None = None) -> None:
+        self.sources.setdefault(source_id or source_of(chunk_id), {})[chunk_id] = chunk_hash
+        self._hashes = None
+
+    def add_source(self, source_id: str, chunks: dict[str, str | None]) -> None:
+        self.sources.setdefault(source_id, {}).update(chunks)
+        self._hashes = None
+
+    def merge(self, other: 'ChecksumTree') -> None:
+        for sid, chunks in other.sources.items():
+            self.add_source(sid, chunks)
+
+    def _compute(self) -> tuple[dict[str, str], dict[str, str], str]:
+        if self._hashes is None:
+            source_hashes = {sid: source_hash(chunks) for sid, chunks in self.sources.items()}
+            grouped: dict[str, list[str]] = {}
+            for sid in sorted(source_hashes):
+                grouped.setdefault(sid[:BUCKET_CHARS], []).append(f'{sid}\t{source_hashes[sid]}')
+            bucket_hashes = {bucket: _digest(lines) for bucket, lines in grouped.items()}
+            root = _digest(f'{bucket}\t{bucket_hashes[bucket]}' for bucket in sorted(bucket_hashes))
+            self._hashes = (source_hashes, bucket_hashes, root)
+        return self._hashes
+
+    @property
+    def source_hashes(self) -> dict[str, str]:
+        return self._compute()[0]
+
+    @property
+    def bucket_hashes(self) -> dict[str, str]:
+        return self._compute()[1]
+
+    @property
+    def root(self) -> str:
+        return self._compute()[2]
+
+    @property
+    def chunk_count(self) -> int:
+        return sum(len(chunks) for chunks in self.sources.values())
+
+    def diff(self, other: 'ChecksumTree') -> dict[str, Any]:
+        """
+        Sources that differ between `self` (expected) and `other` (actual):
+        `{source_id: {'missing': [...], 'extra': [...], 'changed': [...]}}` where
+        missing chunks are only in self and extra chunks only in other.
+        """
+        if self.root == other.root:
+            return {}
+        mine, theirs = self.bucket_hashes, other.bucket_hashes
+        buckets = {b for b in mine.keys() | theirs.keys() if mine.get(b) != theirs.get(b)}
+        drifted: dict[str, Any] = {}
+        for sid in sorted(s for s in self.sources.keys() | other.sources.keys() if s[:BUCKET_CHARS] in buckets):
+            if self.source_hashes.get(sid) == other.source_hashes.get(sid):
+                continue
+            expected = self.sources.get(sid, {})
+            actual = other.sources.get(sid, {})
+            drifted[sid] = {
+                'missing': sorted(expected.keys() - actual.keys()),
+                'extra': sorted(actual.keys() - expected.keys()),
+                'changed': sorted(i for i in expected.keys() & actual.keys() if expected[i] != actual[i]),
+            }
+        return drifted
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'version': TREE_VERSION,
+            'namespace': self.namespace,
+            'root': self.root,
+            'chunks': self.chunk_count,
+            'buckets': dict(sorted(self.bucket_hashes.items())),
+            'sources': {
+                sid: {'hash': self.source_hashes[sid], 'chunks': dict(sorted(self.sources[sid].items()))}
+                for sid in sorted(self.sources)
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ChecksumTree':
+        tree = cls(data.get('namespace', ''))
+        for sid, source in (data.get('sources') or {}).items():
+            tree.add_source(sid, source.get('chunks') or {})
+        return tree
+
+    def save(self, path: str | Path) -> None:
+        write_snapshot(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path: str | Path) -> 'ChecksumTree':
+        return cls.from_dict(json.loads(Path(path).read_text(encoding='utf-8')))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Staged producer/consumer runner shared by the PDF and markdown ingesters.
+
+Each stage runs in its own thread and hands items to the next stage through a
+bounded queue, so CPU-bound chunking, embedding calls and upserts overlap
+across files while a slow stage applies backpressure to the ones before it.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+@dataclass
+class StageStats:
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    idle_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+
+    def to_dict(self, wall_seconds: float) -> dict[str, Any]:
+        utilization = self.busy_seconds / wall_seconds if wall_seconds > 0 else 0.0
+        return {
+            'name': self.name,
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'idle_seconds': round(self.idle_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'utilization': round(min(1.0, utilization), 3),
+        }
+
+
+@dataclass
+class Stage:
+    """
+    A named pipeline step.
+
+    `fn` receives one item and returns the item for the next stage, or None to
+    drop it (e.g. dry runs or files that were skipped). A stage that buffers
+    items across calls (e.g. to fill embedding batches) can set `flush`, which
+    is called once after the last input and whose result, if not None, is
+    passed on like any other.
+    """
+    name: str
+    fn: Callable[[Any], Any]
+    flush: Callable[[], Any] | None = None
+    stats: StageStats = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.stats = StageStats(self.name)
+
+
+class StepTimer:
+    """
+    Thread-safe wall-time totals for named steps inside a stage
+    (e.g. extract, normalize, chunk within the prepare stage).
+    """
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+
+    def to_dict(self) -> dict[str, float]:
+        with self._lock:
+            return {name: round(seconds, 3) for name, seconds in self.seconds.items()}
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def run_stages(
+    source: Iterable[Any],
+    stages: list[Stage],
+    *,
+    queue_size: int = 2,
+    on_error: Callable[[str, Any, BaseException], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Push every item of `source` through `stages` and return utilization stats.
+
+    Queues between stages hold at most `queue_size` items. When a stage raises,
+    `on_error(stage_name, item, exc)` is called (item is None when `flush`
+    raised) and the item is dropped; if no
+    handler is given, or the handler itself raises, every stage is stopped and
+    the original exception is re-raised here once all threads have exited.
+    """
+    if not stages:
+        raise ValueError('at least one stage is required')
+
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages[1:]]
+    failure: list[BaseException] = []
+    failure_lock = threading.Lock()
+
+    def abort(exc: BaseException) -> None:
+        with failure_lock:
+            if not failure:
+                failure.append(exc)
+        stop.set()
+
+    def worker(position: int) -> None:
+        stage = stages[position]
+        stats = stage.stats
+        inbox = queues[position - 1] if position > 0 else None
+        outbox = queues[position] if position < len(queues) else None
+        items = iter(source) if inbox is None else None
+
+        try:
+            while not stop.is_set():
+                waited = time.perf_counter()
+                if inbox is None:
+                    item = next(items, _END)
+                else:
+                    item = _get(inbox, stop)
+                stats.idle_seconds += time.perf_counter() - waited
+                if item is _END:
+                    break
+
+                stats.items_in += 1
+                started = time.perf_counter()
+                try:
+                    result = stage.fn(item)
+                except Exception as exc:
+                    stats.busy_seconds += time.perf_counter() - started
+                    stats.errors += 1
+                    if on_error is None:
+                        raise
+                    on_error(stage.name, item, exc)
+                    continue
+                stats.busy_seconds += time.perf_counter() - started
+
+                if result is None:
+                    continue
+                stats.items_out += 1
+                if outbox is not None:
+                    blocked = time.perf_counter()
+                    if not _put(outbox, result, stop):
+                        break
+                    stats.blocked_seconds += time.perf_counter() - blocked
+
+            if stage.flush is not None and not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    result = stage.flush()
+                except Exception as exc:
+                    stats.errors += 1
+                    if on_error is None:
+                        raise
+                    on_error(stage.name, None, exc)
+                    result = None
+                stats.busy_seconds += time.perf_counter() - started
+                if result is not None:
+                    stats.items_out += 1
+                    if outbox is not None:
+                        _put(outbox, result, stop)
+        except BaseException as exc:
+            abort(exc)
+        finally:
+            if outbox is not None:
+                _put(outbox, _END, stop)
+
+    threads = [
+        threading.Thread(target=worker, args=(i,), name=f'stage-{stage.name}', daemon=True)
+        for i, stage in enumerate(stages)
+    ]
+    started_at = time.perf_counter()
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(timeout=_POLL_SECONDS)
+    except BaseException as exc:
+        abort(exc)
+        for t in threads:
+            t.join()
+    wall_seconds = time.perf_counter() - started_at
+
+    if failure:
+        raise failure[0]
+
+    return {
+        'wall_seconds': round(wall_seconds, 3),
+        'queue_size': max(1, queue_size),
+        'stages': [stage.stats.to_dict(wall_seconds) for stage in stages],
+    }
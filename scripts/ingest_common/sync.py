@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Chunk-level sync of one source's vectors against a Pinecone namespace.
+
+Every chunk carries a `chunk_hash` in its metadata: SHA-256 over the text that
+is embedded, the chunk's metadata and the embedding model and dimension. A
+vector stored under another model therefore never counts as unchanged. The
+document-level `content_hash` is left out, so an edit elsewhere in a document
+does not mark all of its chunks as changed. What the namespace holds for a
+source is either tracked locally (the ids and hashes the last successful run
+wrote) or read back by listing ids with the source's id prefix and fetching
+their `chunk_hash`.
+
+`plan_sync` compares the two. New or changed chunks are embedded and upserted,
+unchanged ones are left alone, and ids the source no longer produces are
+deleted by explicit id once the upsert has succeeded, so a source never
+disappears from the namespace while it is being updated.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+SYNC_MODES = ('replace', 'tracked', 'listed')
+HASH_EXCLUDED_METADATA = ('content_hash', 'chunk_hash')
+LIST_PAGE_SIZE = 100
+FETCH_BATCH_SIZE = 100
+DELETE_BATCH_SIZE = 1000
+
+
+def embedding_key(model: str | None, dimension: Any = None) -> str | None:
+    """The embedding a vector was made with, as folded into its chunk hash."""
+    if not model:
+        return None
+    return f'{model}/{dimension}' if dimension else model
+
+
+def compute_chunk_hash(text: str, metadata: dict[str, Any], embedding: str | None = None) -> str:
+    payload = {k: v for k, v in metadata.items() if k not in HASH_EXCLUDED_METADATA}
+    blob = json.dumps([text, payload, embedding], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def chunk_hashes(vectors: Iterable[dict[str, Any]]) -> dict[str, str]:
+    """`{id: chunk_hash}` for locally built vectors, the form kept in state files."""
+    return {v['id']: (v.get('metadata') or {}).get('chunk_hash') for v in vectors}
+
+
+@dataclass
+class SyncPlan:
+    upsert: list[dict[str, Any]] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    delete: list[str] = field(default_factory=list)
+
+    @property
+    def noop(self) -> bool:
+        return not self.upsert and not self.delete
+
+    def to_dict(self) -> dict[str, int]:
+        return {'upsert': len(self.upsert), 'unchanged': len(self.unchanged), 'delete': len(self.delete)}
+
+
+def plan_sync(local_vectors: list[dict[str, Any]], remote: dict[str, str | None], force: bool = False) -> SyncPlan:
+    """
+    Diff local vectors against `remote` (`{id: chunk_hash}`; None when the
+    stored vector predates chunk hashes, which always counts as changed).
+    With `force` every local vector is upserted; stale ids are still deleted.
+    """
+    plan = SyncPlan()
+    local_ids = set()
+    for vector in local_vectors:
+        vector_id = vector['id']
+        local_ids.add(vector_id)
+        current = (vector.get('metadata') or {}).get('chunk_hash')
+        if not force and current is not None and remote.get(vector_id) == current:
+            plan.unchanged.append(vector_id)
+        else:
+            plan.upsert.append(vector)
+    plan.delete = sorted(i for i in remote if i not in local_ids)
+    return plan
+
+
+def _field(response: Any, name: str) -> Any:
+    if isinstance(response, dict):
+        return response.get(name)
+    return getattr(response, name, None)
+
+
+def iter_id_pages(index: Any, namespace: str, prefix: str = '', page_size: int = LIST_PAGE_SIZE) -> Iterator[list[str]]:
+    """Pages of ids in `namespace` starting with `prefix`, following pagination tokens."""
+    token = None
+    while True:
+        kwargs = {'limit': page_size, 'namespace': namespace}
+        if prefix:
+            kwargs['prefix'] = prefix
+        if token:
+            kwargs['pagination_token'] = token
+        response = index.list_paginated(**kwargs)
+        page = [_field(item, 'id') for item in _field(response, 'vectors') or []]
+        if page:
+            yield page
+        pagination = _field(response, 'pagination')
+        token = _field(pagination, 'next') if pagination else None
+        if not token:
+            return
+
+
+def list_ids(index: Any, namespace: str, prefix: str, page_size: int = LIST_PAGE_SIZE) -> list[str]:
+    """Every id in `namespace` starting with `prefix`."""
+    return [i for page in iter_id_pages(index, namespace, prefix, page_size) for i in page]
+
+
+def fetch_chunk_hashes(index: Any, namespace: str, ids: list[str], batch_size: int = FETCH_BATCH_SIZE) -> dict[str, str | None]:
+    """`{id: chunk_hash}` for the ids that exist; None for vectors without one."""
+    hashes: dict[str, str | None] = {}
+    for i in range(0, len(ids), batch_size):
+        response = index.fetch(ids=ids[i:i + batch_size], namespace=namespace)
+        for vector_id, vector in (_field(response, 'vectors') or {}).items():
+            metadata = _field(vector, 'metadata') or {}
+            hashes[vector_id] = metadata.get('chunk_hash')
+    return hashes
+
+
+def remote_chunk_hashes(
+    index: Any,
+    namespace: str,
+    prefix: str,
+    tracked: dict[str, str] | None = None,
+) -> dict[str, str | None]:
+    """What the namespace holds under `prefix`: the tracked hashes when given, else listed and fetched."""
+    if tracked is not None:
+        return dict(tracked)
+    return fetch_chunk_hashes(index, namespace, list_ids(index, namespace, prefix))
+
+
+def delete_ids(index: Any, namespace: str, ids: list[str], batch_size: int = DELETE_BATCH_SIZE) -> int:
+    for i in range(0, len(ids), batch_size):
+        index.delete(ids=ids[i:i + batch_size], namespace=namespace)
+    return len(ids)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Recursive character text splitter shared by the PDF and markdown ingesters.
+
+Produces the same chunks as langchain's `RecursiveCharacterTextSplitter` with
+its defaults (separators kept at the start of the following piece, chunks
+stripped, length measured in characters): split on the first separator present
+in the text, merge pieces shorter than `chunk_size` up to `chunk_size` with at
+most `chunk_overlap` characters carried into the next chunk, and re-split longer
+pieces with the remaining separators.
+
+Pieces are tracked as offsets into the original string rather than copied, so
+every chunk comes with its start offset and text is only sliced once per chunk.
+"""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Iterable
+
+DEFAULT_SEPARATORS = ('\n\n', '\n', ' ', '')
+
+
+class TextSplitter:
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 150,
+        separators: Iterable[str] = DEFAULT_SEPARATORS,
+    ) -> None:
+        if chunk_overlap > chunk_size:
+            raise ValueError(f'chunk_overlap ({chunk_overlap}) is larger than chunk_size ({chunk_size})')
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(separators)
+
+    def split_text(self, text: str) -> list[str]:
+        return [chunk for _, chunk in self.split_with_offsets(text)]
+
+    def split_texts(self, texts: Iterable[str]) -> list[list[str]]:
+        """Split many sections with one splitter; results keep the input order."""
+        return [self.split_text(text) for text in texts]
+
+    def split_with_offsets(self, text: str) -> list[tuple[int, str]]:
+        """Chunks of `text` with the offset each one starts at."""
+        out: list[tuple[int, str]] = []
+        if text:
+            self._split(text, 0, len(text), 0, out)
+        return out
+
+    def _split(self, text: str, start: int, end: int, level: int, out: list[tuple[int, str]]) -> None:
+        separators = self.separators
+        separator = separators[-1] if separators else ''
+        next_level = len(separators)
+        for i in range(level, len(separators)):
+            candidate = separators[i]
+            if not candidate:
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                next_level = i + 1
+                break
+
+        # Piece boundaries: each separator occurrence starts a new piece.
+        if separator:
+            width = len(separator)
+            parts = text[start:end].split(separator)
+            bounds = [start] + [pos - width for pos in accumulate((len(part) + width for part in parts[:-1]), initial=start)][1:]
+            if len(bounds) > 1 and bounds[1] == start:
+                del bounds[1]
+            bounds.append(end)
+        else:
+            bounds = list(range(start, end + 1))
+
+        chunk_size = self.chunk_size
+        run_start = 0
+        for i in [i for i, (a, b) in enumerate(zip(bounds, bounds[1:])) if b - a >= chunk_size]:
+            if i > run_start:
+                self._merge(text, bounds, run_start, i, out)
+            if next_level >= len(separators):
+                out.append((bounds[i], text[bounds[i]:bounds[i + 1]]))
+            else:
+                self._split(text, bounds[i], bounds[i + 1], next_level, out)
+            run_start = i + 1
+        if len(bounds) - 1 > run_start:
+            self._merge(text, bounds, run_start, len(bounds) - 1, out)
+
+    def _merge(self, text: str, bounds: list[int], first: int, stop: int, out: list[tuple[int, str]]) -> None:
+        """Merge the contiguous pieces bounds[first:stop+1], each shorter than chunk_size, into chunks."""
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        lo = first
+        while True:
+            # Piece `i` is the first that no longer fits after bounds[lo].
+            i = bisect_right(bounds, bounds[lo] + chunk_size, lo, stop + 1) - 1
+            if i >= stop:
+                break
+            self._emit(text, bounds[lo], bounds[i], out)
+            # Drop pieces from the front until at most chunk_overlap remains
+            # and piece `i` fits behind what is kept.
+            keep_overlap = bisect_left(bounds, bounds[i] - chunk_overlap, lo, i)
+            keep_fit = bisect_left(bounds, bounds[i + 1] - chunk_size, lo, i)
+            lo = max(keep_overlap, keep_fit)
+        if stop > lo:
+            self._emit(text, bounds[lo], bounds[stop], out)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, out: list[tuple[int, str]]) -> None:
+        raw = text[start:end]
+        chunk = raw.strip()
+        if chunk:
+            out.append((start + len(raw) - len(raw.lstrip()), chunk))
+
+
+def benchmark(texts: list[str], chunk_size: int = 1000, chunk_overlap: int = 150, repeat: int = 5) -> dict[str, float | int]:
+    """Best-of-`repeat` wall time for splitting `texts`, against langchain when it is installed."""
+    splitter = TextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    candidates = {'local': splitter.split_texts}
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        pass
+    else:
+        reference = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=list(DEFAULT_SEPARATORS),
+        )
+        candidates['langchain'] = lambda batch: [reference.split_text(text) for text in batch]
+
+    report: dict[str, float | int] = {'texts': len(texts), 'chars': sum(len(t) for t in texts)}
+    for name, split in candidates.items():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            chunks = split(texts)
+            best = min(best, time.perf_counter() - started)
+        report[f'{name}_seconds'] = round(best, 4)
+        report[f'{name}_chunks'] = sum(len(c) for c in chunks)
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Benchmark the text splitter on text files')
+    parser.add_argument('files', nargs='+', help='Text or markdown files; each is split as one text')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--chunk-overlap', type=int, default=150)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    texts = [open(path, encoding='utf-8').read() for path in args.files]
+    print(json.dumps(benchmark(texts, args.chunk_size, args.chunk_overlap, args.repeat), indent=2))
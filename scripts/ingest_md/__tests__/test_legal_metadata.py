@@ -0,0 +1,80 @@
+from legal_metadata import (
+    _boundary_window,
+    _detect_doc_family,
+    _detect_instrument,
+    build_chunk_metadata,
+    build_document_context,
+)
+
+
+def _context(title: str = 'Program guide', manual: str = 'General', chapter: str = '', url: str = '', heading_path=None):
+    return build_document_context(
+        url=url,
+        title=title,
+        manual=manual,
+        chapter=chapter,
+        last_updated='2024-01-31T10:00:00',
+        ingest_date=None,
+        heading_path=heading_path or [],
+    )
+
+
+def _full_scan(chunk_text: str, title: str = 'Program guide', manual: str = 'General', chapter: str = '', url: str = '', heading_path=None) -> tuple[str, str]:
+    """doc_family and instrument scanned over the whole joined text, as before the document context."""
+    heading = '/'.join(heading_path or [])
+    combined = ' | '.join([title, manual, chapter, heading, chunk_text[:200]])
+    doc_family = _detect_doc_family(combined, url, manual)
+    return doc_family, _detect_instrument(combined, url, doc_family)
+
+
+def _both(chunk_text: str, **fields) -> tuple[dict, tuple[str, str]]:
+    per_chunk = build_chunk_metadata(_context(**fields), chunk_text=chunk_text)
+    return per_chunk, _full_scan(chunk_text, **fields)
+
+
+def test_document_context_is_reused_across_chunks():
+    context = _context(title='Work permits', url='https://www.canada.ca/en/temporary-residents/work.html')
+    first = build_chunk_metadata(context, chunk_text='See R205(a) for NOC 1234.')
+    second = build_chunk_metadata(context, chunk_text='TEER 3 applies.')
+
+    assert first['effective_date'] == second['effective_date'] == '2024-01-31'
+    assert first['section_id'] == 'IRPR_205a'
+    assert first['noc_code'] == '1234'
+    assert second['teer'] == '3'
+    assert 'section_id' not in second
+    assert second['instrument'] == 'WORK'
+
+
+def test_rule_match_across_document_fields_and_chunk():
+    # 'permanent residence.*economic' only matches across the join between heading and chunk.
+    per_chunk, full = _both('for the economic class', heading_path=['Permanent residence'])
+    assert (per_chunk['doc_family'], per_chunk['instrument']) == full
+    assert per_chunk['instrument'] == 'PR_ECON'
+
+    # `.*` reaches further back than the 64-char window, up to the last newline.
+    per_chunk, full = _both('for the economic class', chapter='Permanent residence ' + 'x' * 80)
+    assert (per_chunk['doc_family'], per_chunk['instrument']) == full
+    assert per_chunk['instrument'] == 'PR_ECON'
+
+
+def test_word_boundary_rules_match_full_text_semantics():
+    # The 64-char window would start at 'mi' inside 'admi'; '\bmi\b' must not fire on it.
+    chapter = 'admi ' + 'z' * 50 + '\n' + 'z' * 7
+    prefix = ' | '.join(['Program guide', 'General', chapter, '']).lower()
+    assert _boundary_window(prefix).startswith('admi ')
+
+    per_chunk, full = _both('General guidance', chapter=chapter)
+    assert (per_chunk['doc_family'], per_chunk['instrument']) == full
+    assert per_chunk['doc_family'] == 'PDI'
+
+
+def test_document_fields_and_url_override_chunk_text():
+    per_chunk, full = _both('Officers assess visitor records.', title='Ontario Immigrant Nominee Program guide')
+    assert (per_chunk['doc_family'], per_chunk['instrument']) == full
+    assert per_chunk['doc_family'] == 'OINP'
+    assert per_chunk['jurisdiction'] == 'ontario'
+    assert per_chunk['instrument'] == 'TRV'
+
+    per_chunk, full = _both('General guidance', title='Guide', manual='ENF 10', url='https://www.canada.ca/en/enforcement/x.html')
+    assert (per_chunk['doc_family'], per_chunk['instrument']) == full
+    assert (per_chunk['doc_family'], per_chunk['authority_level']) == ('ENF', 'manual')
@@ -0,0 +1,132 @@
+import json
+
+from validate_namespace import audit_namespace, check_drift, stats_report, validate_namespace
+
+# validate_namespace puts scripts/ingest_common on sys.path.
+from memory_index import MemoryIndex
+
+
+def _vector(i: int, **overrides) -> dict:
+    metadata = {
+        'text': f'chunk {i}',
+        'title': 'Title',
+        'url': 'https://example.test/page',
+        'source_id': f's{i % 7}',
+        'source_file': f'file{i % 7}.md',
+        'authority_level': 'policy',
+        'doc_family': 'PDI',
+        'instrument': 'WORK,STUDY',
+        'jurisdiction': 'federal',
+        'effective_date': '2024-01-31',
+        **overrides,
+    }
+    return {'id': f'md|s{i % 7}|{i}', 'values': [1.0, float(i)], 'metadata': metadata}
+
+
+def _index(count: int, **kwargs) -> MemoryIndex:
+    index = MemoryIndex(**kwargs)
+    vectors = [_vector(i) for i in range(count)]
+    for i in range(0, count, 3):
+        vectors[i]['metadata']['doc_family'] = 'NOT_A_FAMILY'
+    for i in range(0, count, 5):
+        vectors[i]['metadata']['effective_date'] = '31/01/2024'
+    for i in range(0, count, 11):
+        del vectors[i]['metadata']['jurisdiction']
+    for start in range(0, count, 500):
+        index.upsert(vectors=vectors[start:start + 500], namespace='ns')
+    return index
+
+
+def test_full_audit_counts_every_vector_with_bounded_examples():
+    index = _index(1050)
+    stats = audit_namespace(index, 'ns', fetch_batch_size=64, workers=3, max_examples=5)
+
+    assert stats['vectors_checked'] == stats['vectors_listed'] == 1050
+    assert stats['fetch_requests'] == 17
+    assert stats['errors'] == []
+    canonical = stats['canonical_fields']
+    assert canonical['doc_family']['invalid_count'] == 350
+    assert len(canonical['doc_family']['invalid']) == 5
+    assert canonical['effective_date']['invalid_count'] == 210
+    assert canonical['effective_date']['invalid_dates'] == ['31/01/2024'] * 5
+    assert canonical['jurisdiction']['missing'] == 96
+    assert canonical['instrument']['distribution'] == {'WORK': 1050, 'STUDY': 1050}
+    assert len(stats['unique_sources']) == 7
+
+
+def test_full_audit_matches_sampled_check_when_sample_covers_namespace(monkeypatch):
+    monkeypatch.setenv('EMBEDDING_DIM', '2')
+    index = _index(90)
+    sampled = stats_report(validate_namespace(index, 'ns'))
+    audited = stats_report(audit_namespace(index, 'ns', fetch_batch_size=16))
+
+    for key in ('vectors_checked', 'missing_url', 'missing_title', 'unique_sources', 'unique_files'):
+        assert audited[key] == sampled[key]
+    for field, field_stats in sampled['canonical_fields'].items():
+        audited_field = audited['canonical_fields'][field]
+        for name in ('present', 'missing', 'invalid_count', 'distribution'):
+            assert audited_field.get(name) == field_stats.get(name), (field, name)
+
+
+def test_fetch_failures_are_reported_and_report_is_json():
+    index = _index(300, fault_rate=0.5, fault_operations=['fetch'], seed=3)
+    stats = audit_namespace(index, 'ns', fetch_batch_size=50, workers=2)
+
+    assert 0 < stats['failed_batches'] < 6
+    assert stats['vectors_checked'] == 300 - 50 * stats['failed_batches']
+    assert len(stats['errors']) == stats['failed_batches']
+    report = json.loads(json.dumps(stats_report(stats)))
+    assert report['unique_sources'] <= 7
+    assert report['canonical_fields']['doc_family']['distribution'] == {'PDI': stats['vectors_checked'] - report['canonical_fields']['doc_family']['invalid_count']}
+
+
+def test_drift_check_finds_exactly_the_changed_sources():
+    from merkle import ChecksumTree
+
+    index = MemoryIndex()
+    vectors = [_vector(i, chunk_hash=f'h{i}') for i in range(60)]
+    index.upsert(vectors=vectors, namespace='ns')
+    local = ChecksumTree('ns')
+    for v in vectors:
+        local.add(v['id'], v['metadata']['chunk_hash'], v['metadata']['source_id'])
+    assert check_drift(index, 'ns', local)['in_sync']
+
+    index.delete(ids=['md|s1|8'], namespace='ns')
+    index.upsert(vectors=[_vector(9, chunk_hash='edited')], namespace='ns')
+    report = check_drift(index, 'ns', local, fetch_batch_size=16, workers=2)
+    assert not report['in_sync']
+    assert report['sources'] == {
+        's1': {'missing': ['md|s1|8'], 'extra': [], 'changed': []},
+        's2': {'missing': [], 'extra': [], 'changed': ['md|s2|9']},
+    }
+
+    before = index.stats['fetch_requests']
+    recheck = check_drift(index, 'ns', local, source_ids=['s2'])
+    assert recheck['sources'] == {'s2': {'missing': [], 'extra': [], 'changed': ['md|s2|9']}}
+    assert recheck['remote_chunks'] == 9
+    assert index.stats['fetch_requests'] - before == 1
+
+
+def test_drift_check_lists_untracked_sources_apart():
+    from merkle import ChecksumTree
+
+    index = MemoryIndex()
+    vectors = [_vector(i, chunk_hash=f'h{i}') for i in range(20)]
+    index.upsert(vectors=vectors, namespace='ns')
+    local = ChecksumTree('ns')
+    # Only s0 has chunk hashes locally; the others were synced without them (--sync replace).
+    for v in vectors:
+        if v['metadata']['source_id'] == 's0':
+            local.add(v['id'], v['metadata']['chunk_hash'], 's0')
+
+    report = check_drift(index, 'ns', local)
+    assert report['in_sync']
+    assert report['sources'] == {}
+    assert report['untracked'] == ['s1', 's2', 's3', 's4', 's5', 's6']
+    assert report['untracked_sources'] == 6
+
+    assert check_drift(index, 'ns', local, source_ids=['s1'])['in_sync']
+    index.delete(ids=['md|s0|7'], namespace='ns')
+    report = check_drift(index, 'ns', local)
+    assert not report['in_sync']
+    assert report['sources'] == {'s0': {'missing': ['md|s0|7'], 'extra': [], 'changed': []}}
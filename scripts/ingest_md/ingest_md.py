@@ -8,21 +8,43 @@ import argparse
 import hashlib
 import json
 import logging
+import multiprocessing
 import os
 import re
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from urllib import request as urllib_request
 from urllib import error as urllib_error
 
 import frontmatter
-from legal_metadata import build_canonical_metadata
+from legal_metadata import build_chunk_metadata, build_document_context
 from openai import OpenAI, RateLimitError
 from pinecone import Pinecone
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+COMMON_DIR = Path(__file__).resolve().parents[1] / 'ingest_common'
+if str(COMMON_DIR) not in sys.path:
+    sys.path.append(str(COMMON_DIR))
+
+from batching import (
+    DEFAULT_EMBED_BATCH_COUNT,
+    DEFAULT_EMBED_BATCH_TOKENS,
+    DEFAULT_MAX_BATCH_BYTES,
+    EmbeddingBatcher,
+    pack_batches,
+    send_batches,
+)
+from journal import JournaledState
+from merkle import ChecksumTree
+from stages import Stage, run_stages
+from sync import SYNC_MODES, compute_chunk_hash, delete_ids, embedding_key, plan_sync, remote_chunk_hashes
+from text_splitter import TextSplitter
 
 logging.basicConfig(
     level=logging.INFO,
@@ -207,15 +229,16 @@ def embed_chunks(client: OpenAI, model: str, texts: List[str], max_retries: int
     return embeddings
 
 
-def process_file(
+def build_file_vectors(
     file_path: Path,
     base_dir: Path,
-    splitter: RecursiveCharacterTextSplitter,
-    client: OpenAI,
-    model: str,
-    dry_run: bool = False
+    splitter: TextSplitter,
+    embedding: Optional[str] = None,
 ) -> Optional[List[dict]]:
-    """Process a single markdown file into vector records."""
+    """
+    Parse, clean and chunk a markdown file into vector records without values.
+    `embedding` (see sync.embedding_key) is folded into each chunk hash.
+    """
     try:
         # Read and parse frontmatter
         post = frontmatter.load(file_path)
@@ -253,34 +276,22 @@ def process_file(
             logger.warning(f"No chunks produced from: {file_path}")
             return None
         
-        # Generate vectors with metadata
+        doc_context = build_document_context(
+            url=url,
+            title=title,
+            manual=str(manual or ''),
+            chapter=str(chapter or ''),
+            last_updated=last_updated,
+            ingest_date=ingest_date,
+            heading_path=heading_path if isinstance(heading_path, list) else [],
+        )
+
+        # Generate vector records with metadata
         vectors = []
         for i, chunk_text in enumerate(chunks):
             chunk_id = f"md|{source_id}|{i}"
-            
-            # Get embedding.
-            # For non-dry runs we always call embed_chunks(), including when
-            # EMBEDDING_PROVIDER=pinecone (client is intentionally None there).
-            if dry_run:
-                # Dummy embedding for dry run only.
-                embedding = [0.0] * 1536
-            else:
-                embeddings = embed_chunks(client, model, [chunk_text])
-                if not embeddings or not embeddings[0]:
-                    logger.warning(f"Failed to embed chunk {i} in {file_path}")
-                    continue
-                embedding = embeddings[0]
-
-            canonical = build_canonical_metadata(
-                url=url,
-                title=title,
-                manual=str(manual or ''),
-                chapter=str(chapter or ''),
-                last_updated=last_updated,
-                ingest_date=ingest_date,
-                chunk_text=chunk_text,
-                heading_path=heading_path if isinstance(heading_path, list) else [],
-            )
+
+            canonical = build_chunk_metadata(doc_context, chunk_text=chunk_text)
             
             metadata = {
                 'text': chunk_text,
@@ -302,14 +313,13 @@ def process_file(
                 metadata['chapter'] = chapter
             if heading_path:
                 metadata['heading_path'] = json.dumps(heading_path) if isinstance(heading_path, list) else str(heading_path)
+            metadata['chunk_hash'] = compute_chunk_hash(chunk_text, metadata, embedding)
             
             vectors.append({
                 'id': chunk_id,
-                'values': embedding,
                 'metadata': metadata,
             })
         
-        logger.info(f"Processed {file_path.name}: {len(vectors)} chunks")
         return vectors
         
     except Exception as e:
@@ -317,6 +327,152 @@ def process_file(
         return None
 
 
+MANIFEST_SECTIONS = {'sources': dict, 'runs': list}
+
+
+def file_hash(file_path: Path) -> str:
+    """Hash of the raw file (frontmatter included), checked before any parsing."""
+    return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+
+def manifest_record(
+    rel_path: str,
+    fingerprint: dict,
+    status: str,
+    vectors: Optional[List[dict]] = None,
+    error: Optional[str] = None,
+) -> dict:
+    """Manifest entry for one source: fingerprint, outcome and the chunk ids written."""
+    vectors = vectors or []
+    return {
+        'source_file': rel_path,
+        **fingerprint,
+        'content_hash': vectors[0]['metadata'].get('content_hash') if vectors else None,
+        'chunk_ids': [v['id'] for v in vectors],
+        'chunk_hashes': [v['metadata'].get('chunk_hash') for v in vectors],
+        'status': status,
+        'error': error,
+        'updated_at': datetime.now().isoformat(),
+    }
+
+
+def is_unchanged(record: Optional[dict], fingerprint: dict) -> bool:
+    """True when the source was fully upserted with the same file content, chunking, embedding and namespace."""
+    if not record or record.get('status') != 'upserted':
+        return False
+    return all(record.get(key) == value for key, value in fingerprint.items())
+
+
+def tracked_chunk_hashes(record: Optional[dict], namespace: str) -> Optional[dict]:
+    """{chunk_id: chunk_hash} a fully upserted manifest entry says is in `namespace`, else None."""
+    if not record or record.get('status') != 'upserted' or record.get('namespace') != namespace:
+        return None
+    if record.get('chunk_hashes') is None:
+        return None
+    return dict(zip(record['chunk_ids'], record['chunk_hashes']))
+
+
+def discover_markdown_files(base_dir: Path, file_glob: str, max_files: Optional[int] = None) -> List[Path]:
+    """Matching files sorted by relative path, so runs (and --max-files) are reproducible."""
+    files = sorted(base_dir.rglob(file_glob), key=lambda p: p.relative_to(base_dir).as_posix())
+    if max_files:
+        files = files[:max_files]
+    return files
+
+
+def prepare_files(
+    files: List[Path],
+    base_dir: Path,
+    splitter: TextSplitter,
+    workers: int = 1,
+    embedding: Optional[str] = None,
+) -> Iterator[Tuple[Path, Optional[List[dict]]]]:
+    """
+    Parse, clean and chunk files, yielding (file_path, vectors) in input order.
+
+    With workers > 1 files are prepared in a process pool. At most `workers * 4`
+    files are in flight, so slow embedding or upserting still holds parsing back.
+    The pool is started from a stage thread while the other stages run, so its
+    workers are spawned rather than forked from the threaded process.
+    """
+    if workers <= 1:
+        for file_path in files:
+            yield file_path, build_file_vectors(file_path, base_dir, splitter, embedding)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        remaining = iter(files)
+        pending = deque(
+            (file_path, pool.submit(build_file_vectors, file_path, base_dir, splitter, embedding))
+            for file_path in islice(remaining, workers * 4)
+        )
+        while pending:
+            file_path, future = pending.popleft()
+            following = next(remaining, None)
+            if following is not None:
+                pending.append((following, pool.submit(build_file_vectors, following, base_dir, splitter, embedding)))
+            yield file_path, future.result()
+
+
+def make_embedding_batcher(
+    client: OpenAI,
+    model: str,
+    max_count: int = DEFAULT_EMBED_BATCH_COUNT,
+    max_tokens: int = DEFAULT_EMBED_BATCH_TOKENS,
+    on_failure=None,
+) -> EmbeddingBatcher:
+    """Batcher that fills embed_chunks() requests with chunks from any number of files."""
+    # embed_chunks() is used for every provider, including EMBEDDING_PROVIDER=pinecone
+    # (client is intentionally None there).
+    return EmbeddingBatcher(
+        lambda texts: embed_chunks(client, model, texts),
+        max_count=max_count,
+        max_tokens=max_tokens,
+        on_failure=on_failure,
+    )
+
+
+def log_embedding_failure(file_path: Path, vectors: List[dict], failed: List[int]) -> None:
+    logger.error(f"Failed to embed {len(failed)} of {len(vectors)} chunks in {file_path} (chunks {failed[:10]})")
+
+
+def embed_file_vectors(
+    file_path: Path,
+    vectors: List[dict],
+    client: OpenAI,
+    model: str,
+    dry_run: bool = False,
+    batcher: Optional[EmbeddingBatcher] = None,
+) -> List[dict]:
+    """Attach embedding values to one file's vector records; empty if any chunk fails."""
+    if dry_run:
+        # Dummy embedding for dry run only.
+        for vector in vectors:
+            vector['values'] = [0.0] * 1536
+        return vectors
+
+    batcher = batcher or make_embedding_batcher(client, model, on_failure=log_embedding_failure)
+    done = batcher.add(file_path, vectors, [v['metadata']['text'] for v in vectors]) + batcher.flush()
+    embedded = next((v for key, v in done if key == file_path), [])
+    logger.info(f"Processed {file_path.name}: {len(embedded)} chunks")
+    return embedded
+
+
+def process_file(
+    file_path: Path,
+    base_dir: Path,
+    splitter: TextSplitter,
+    client: OpenAI,
+    model: str,
+    dry_run: bool = False
+) -> Optional[List[dict]]:
+    """Process a single markdown file into vector records."""
+    vectors = build_file_vectors(file_path, base_dir, splitter, embedding_key(model, os.getenv('EMBEDDING_DIM')))
+    if vectors is None:
+        return None
+    return embed_file_vectors(file_path, vectors, client, model, dry_run=dry_run)
+
+
 def delete_existing_source_vectors(index, namespace: str, source_id: str):
     """Delete all vectors for a given source_id to prevent ghosts."""
     try:
@@ -327,16 +483,6 @@ def delete_existing_source_vectors(index, namespace: str, source_id: str):
         logger.error(f"Failed to delete existing vectors for {source_id}: {e}")
 
 
-def calculate_batch_size(vectors: List[dict], max_bytes: int = 1800000) -> int:
-    """Calculate how many vectors fit under byte limit."""
-    if not vectors:
-        return 0
-    
-    total_size = sum(len(json.dumps(v)) for v in vectors)
-    avg_size = total_size / len(vectors)
-    return max(1, int(max_bytes / avg_size))
-
-
 def filter_existing_vectors(index, namespace: str, vectors: List[dict], fetch_batch_size: int = 500) -> List[dict]:
     """Return only vectors whose IDs are not already present in the namespace."""
     if not vectors:
@@ -380,32 +526,17 @@ def upsert_batches(
     index,
     namespace: str,
     vectors: List[dict],
-    target_batch_size: int = 100
+    target_batch_size: int = 100,
+    max_workers: int = 1,
 ):
-    """Upsert vectors in size-aware batches."""
-    total_upserted = 0
-    i = 0
-    
-    while i < len(vectors):
-        # Calculate how many fit in this batch
-        remaining = vectors[i:]
-        batch_size = min(target_batch_size, len(remaining))
-        
-        # Check byte limit
-        byte_limit = calculate_batch_size(remaining[:batch_size])
-        actual_batch_size = min(batch_size, byte_limit)
-        
-        batch = remaining[:actual_batch_size]
-        
-        try:
-            index.upsert(vectors=batch, namespace=namespace)
-            total_upserted += len(batch)
-            logger.info(f"Upserted batch of {len(batch)} vectors")
-        except Exception as e:
-            logger.error(f"Upsert failed for batch {i}: {e}")
-        
-        i += actual_batch_size
-    
+    """Upsert vectors in batches packed by exact serialized size."""
+    batches = pack_batches(vectors, max_count=target_batch_size, max_bytes=DEFAULT_MAX_BATCH_BYTES)
+
+    def log_failure(number: int, batch: List[dict], exc: Exception) -> None:
+        logger.error(f"Upsert failed for batch {number} ({len(batch)} vectors): {exc}")
+
+    total_upserted = send_batches(index, namespace, batches, max_workers=max_workers, on_error=log_failure)
+    logger.info(f"Upserted {total_upserted} vectors in {len(batches)} batches")
     return total_upserted
 
 
@@ -427,16 +558,43 @@ def main():
                         help='Chunk size for splitting')
     parser.add_argument('--chunk-overlap', type=int, default=150,
                         help='Chunk overlap for splitting')
+    parser.add_argument('--sync', choices=SYNC_MODES, default='tracked',
+                        help='How to update a source: diff chunk hashes against the manifest (tracked, listing ids '
+                             'when it has no entry), against ids listed from the namespace (listed), or delete by '
+                             'source_id and re-upsert everything (replace)')
     parser.add_argument('--no-delete-existing-source', action='store_true',
-                        help='Do not delete existing vectors by source_id before upsert')
+                        help='With --sync replace: do not delete existing vectors by source_id before upsert')
     parser.add_argument('--skip-existing-ids', action='store_true',
-                        help='Before upsert, fetch and skip vectors whose IDs already exist in namespace')
+                        help='With --sync replace: fetch and skip vectors whose IDs already exist in namespace')
+    parser.add_argument('--upsert-workers', type=int, default=1,
+                        help='Concurrent upsert requests per file')
+    parser.add_argument('--queue-size', type=int, default=2,
+                        help='Files buffered between chunk, embed and upsert stages')
+    parser.add_argument('--manifest-file', default='tmp/md_ingest_manifest.json',
+                        help='Run manifest keyed by source_id; unchanged files are skipped')
+    parser.add_argument('--checksum-tree', default='tmp/md_checksum_tree.json',
+                        help='Where to write the checksum tree of synced chunks for validate_namespace.py --drift')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-ingest and re-embed every chunk, even when the manifest or stored chunk hashes say it is unchanged')
+    parser.add_argument('--parse-workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Worker processes for parsing and chunking markdown files (default: CPU count, at most 4; '
+                             'parsing only has to keep ahead of embedding)')
+    parser.add_argument('--embed-batch-size', type=int, default=DEFAULT_EMBED_BATCH_COUNT,
+                        help='Maximum chunks per embedding request (chunks are batched across files)')
+    parser.add_argument('--embed-batch-tokens', type=int, default=DEFAULT_EMBED_BATCH_TOKENS,
+                        help='Maximum estimated tokens per embedding request')
     
     args = parser.parse_args()
     
     # Initialize Pinecone (skip in dry-run mode)
     index = None
     if not args.dry_run:
+        from memory_index import memory_index_from_env
+
+        index = memory_index_from_env()
+    if index is not None:
+        logger.info("Using in-memory index (PINECONE_BACKEND=memory)")
+    elif not args.dry_run:
         pinecone_key = os.getenv('PINECONE_API_KEY')
         if not pinecone_key:
             logger.error("PINECONE_API_KEY not set")
@@ -461,17 +619,15 @@ def main():
             index = pc.Index(index_name)
     
     # Initialize text splitter
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=args.chunk_size,
-        chunk_overlap=args.chunk_overlap,
-        separators=["\n\n", "\n", " ", ""]
-    )
+    splitter = TextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
     
     # Initialize embedding client (skip in dry-run mode)
     client, model = None, None
     if not args.dry_run:
         client, model = get_embedding_client()
         logger.info(f"Using embedding model: {model}")
+    embedding_dim = os.getenv('EMBEDDING_DIM')
+    embedding = embedding_key(model, embedding_dim)
     
     # Find markdown files
     base_dir = Path(args.directory)
@@ -479,10 +635,8 @@ def main():
         logger.error(f"Directory not found: {base_dir}")
         sys.exit(1)
     
-    md_files = list(base_dir.rglob(args.file_glob))
-    if args.max_files:
-        md_files = md_files[:args.max_files]
-    
+    md_files = discover_markdown_files(base_dir, args.file_glob, args.max_files)
+
     logger.info(f"Found {len(md_files)} markdown files")
     
     # Track stats
@@ -491,31 +645,127 @@ def main():
         'files_failed': 0,
         'chunks_embedded': 0,
         'vectors_upserted': 0,
+        'vectors_unchanged': 0,
+        'vectors_deleted': 0,
         'skipped': 0,
+        'unchanged': 0,
     }
-    
-    # Process files
+    stats_lock = threading.Lock()
+
+    # Every finished file is journaled right away, so a crashed run resumes
+    # where it stopped. Dry runs neither read nor write the manifest.
+    manifest = None if args.dry_run else JournaledState(args.manifest_file, MANIFEST_SECTIONS)
+    fingerprints = {}
+    pending_files = []
     for file_path in md_files:
         rel_path = str(file_path.relative_to(base_dir))
-        source_id = derive_source_id(rel_path)
+        fingerprint = {
+            'file_hash': file_hash(file_path),
+            'chunk_size': args.chunk_size,
+            'chunk_overlap': args.chunk_overlap,
+            'model': model,
+            'embedding_dim': embedding_dim,
+            'namespace': args.namespace,
+        }
+        fingerprints[file_path] = fingerprint
+        if manifest is not None and not args.force:
+            if is_unchanged(manifest.state['sources'].get(derive_source_id(rel_path)), fingerprint):
+                stats['unchanged'] += 1
+                continue
+        pending_files.append(file_path)
+    if stats['unchanged']:
+        logger.info(f"Skipping {stats['unchanged']} unchanged files (manifest: {args.manifest_file})")
 
-        # Process file
-        vectors = process_file(
-            file_path=file_path,
-            base_dir=base_dir,
-            splitter=splitter,
-            client=client,
-            model=model,
-            dry_run=args.dry_run
+    def record_source(file_path: Path, status: str, vectors: Optional[List[dict]] = None, error: Optional[str] = None) -> None:
+        if manifest is None:
+            return
+        rel_path = str(file_path.relative_to(base_dir))
+        manifest.set(
+            'sources',
+            derive_source_id(rel_path),
+            manifest_record(rel_path, fingerprints[file_path], status, vectors, error),
         )
-        
+
+    def bump(key: str, amount: int = 1) -> None:
+        with stats_lock:
+            stats[key] += amount
+
+    # Chunk-level sync: only new or changed chunks go on to be embedded; the
+    # full chunk list and the plan wait here for the upsert stage.
+    diff_sync = not args.dry_run and args.sync != 'replace'
+    plans = {}
+
+    # Stage 1: collect parsed and chunked files (CPU work runs in prepare_files' pool)
+    def prepare_stage(item):
+        file_path, vectors = item
         if vectors is None:
-            stats['files_failed'] += 1
-            continue
-        
-        if not vectors:
-            stats['skipped'] += 1
-            continue
+            bump('files_failed')
+            record_source(file_path, 'failed', error='parse or chunking failed')
+            return None
+        return item
+
+    # Diff one file's chunks against what the namespace holds (network when listed)
+    def plan_file(file_path: Path, vectors: List[dict]) -> List[dict]:
+        source_id = derive_source_id(str(file_path.relative_to(base_dir)))
+        tracked = None
+        if args.sync == 'tracked' and manifest is not None:
+            tracked = tracked_chunk_hashes(manifest.state['sources'].get(source_id), args.namespace)
+        remote = remote_chunk_hashes(index, args.namespace, f"md|{source_id}|", tracked)
+        plan = plan_sync(vectors, remote, force=args.force)
+        plans[file_path] = (vectors, plan)
+        bump('vectors_unchanged', len(plan.unchanged))
+        return plan.upsert
+
+    def embedding_failed(file_path: Path, vectors: List[dict], failed: List[int]) -> None:
+        log_embedding_failure(file_path, vectors, failed)
+        plans.pop(file_path, None)
+        bump('files_failed')
+        record_source(file_path, 'failed', error=f'embedding failed for {len(failed)} chunks')
+
+    batcher = make_embedding_batcher(
+        client,
+        model,
+        max_count=args.embed_batch_size,
+        max_tokens=args.embed_batch_tokens,
+        on_failure=embedding_failed,
+    )
+
+    # Stage 2: plan the sync and embed chunks (network). As in ingest_pdf, the
+    # diff runs here so listing the namespace never holds up parsing. Chunks are
+    # pooled across files into full requests; a file moves on once all of its
+    # chunks have embeddings.
+    def embed_stage(item):
+        file_path, vectors = item
+        if args.dry_run:
+            return [(file_path, embed_file_vectors(file_path, vectors, client, model, dry_run=True))]
+        if diff_sync:
+            vectors = plan_file(file_path, vectors)
+        return batcher.add(file_path, vectors, [v['metadata']['text'] for v in vectors]) or None
+
+    def embed_flush():
+        return batcher.flush() or None
+
+    # Upsert one file's new or changed chunks, then delete its stale ids (network)
+    def sync_file(file_path: Path, vectors: List[dict]):
+        all_vectors, plan = plans.pop(file_path)
+        if vectors:
+            upserted = upsert_batches(index, args.namespace, vectors, max_workers=args.upsert_workers)
+            bump('vectors_upserted', upserted)
+            if upserted < len(vectors):
+                raise RuntimeError(f'only {upserted} of {len(vectors)} vectors were upserted')
+        if plan.delete:
+            # Only after the upsert, so the source never has an empty window.
+            bump('vectors_deleted', delete_ids(index, args.namespace, plan.delete))
+        bump('files_processed')
+        bump('chunks_embedded', len(vectors))
+        record_source(file_path, 'upserted', all_vectors)
+        logger.info(f"Synced {file_path.name}: {len(vectors)} upserted, {len(plan.unchanged)} unchanged, {len(plan.delete)} deleted")
+
+    # Delete stale vectors and upsert one file (network)
+    def upsert_file(file_path: Path, vectors: List[dict]):
+        if diff_sync:
+            return sync_file(file_path, vectors)
+        source_id = derive_source_id(str(file_path.relative_to(base_dir)))
 
         # Delete existing vectors for this source unless explicitly disabled.
         if not args.dry_run and not args.no_delete_existing_source:
@@ -523,18 +773,70 @@ def main():
 
         # Optionally skip vectors that already exist in namespace.
         if not args.dry_run and args.skip_existing_ids:
-            vectors = filter_existing_vectors(index, args.namespace, vectors)
-            if not vectors:
-                stats['skipped'] += 1
-                continue
-        
-        stats['files_processed'] += 1
-        stats['chunks_embedded'] += len(vectors)
-        
+            new_vectors = filter_existing_vectors(index, args.namespace, vectors)
+            if not new_vectors:
+                bump('skipped')
+                record_source(file_path, 'upserted', vectors)
+                return None
+        else:
+            new_vectors = vectors
+
         # Upsert vectors
-        if not args.dry_run and vectors:
-            upserted = upsert_batches(index, args.namespace, vectors)
-            stats['vectors_upserted'] += upserted
+        if not args.dry_run and new_vectors:
+            upserted = upsert_batches(index, args.namespace, new_vectors, max_workers=args.upsert_workers)
+            bump('vectors_upserted', upserted)
+            if upserted < len(new_vectors):
+                raise RuntimeError(f'only {upserted} of {len(new_vectors)} vectors were upserted')
+
+        bump('files_processed')
+        bump('chunks_embedded', len(new_vectors))
+        record_source(file_path, 'upserted', vectors)
+        return None
+
+    # Stage 3: upsert every file the embed stage released
+    def upsert_stage(files):
+        for file_path, vectors in files:
+            try:
+                upsert_file(file_path, vectors)
+            except Exception as exc:
+                on_error('upsert', (file_path, vectors), exc)
+        return None
+
+    def on_error(stage_name: str, item, exc: BaseException) -> None:
+        file_path = item[0] if isinstance(item, tuple) else item
+        plans.pop(file_path, None)
+        bump('files_failed')
+        if isinstance(file_path, Path):
+            record_source(file_path, 'failed', error=str(exc))
+        logger.error(f"Error processing {file_path} ({stage_name}): {exc}")
+
+    stage_report = run_stages(
+        prepare_files(pending_files, base_dir, splitter, workers=args.parse_workers, embedding=embedding),
+        [
+            Stage('prepare', prepare_stage),
+            Stage('embed', embed_stage, flush=embed_flush),
+            Stage('upsert', upsert_stage),
+        ],
+        queue_size=args.queue_size,
+        on_error=on_error,
+    )
+
+    if manifest is not None:
+        manifest.append('runs', {
+            'finished_at': datetime.now().isoformat(),
+            'namespace': args.namespace,
+            'files_found': len(md_files),
+            **stats,
+        })
+        manifest.close()
+
+        tree = ChecksumTree(args.namespace)
+        for source_id, record in manifest.state['sources'].items():
+            chunks = tracked_chunk_hashes(record, args.namespace)
+            if chunks is not None:
+                tree.add_source(source_id, chunks)
+        tree.save(args.checksum_tree)
+        logger.info(f"Checksum tree: {args.checksum_tree} (root {tree.root[:12]}, {len(tree.sources)} sources)")
     
     # Print summary
     logger.info("=" * 50)
@@ -543,8 +845,18 @@ def main():
     logger.info(f"Files processed: {stats['files_processed']}")
     logger.info(f"Chunks embedded: {stats['chunks_embedded']}")
     logger.info(f"Vectors upserted: {stats['vectors_upserted']}")
+    logger.info(f"Vectors unchanged: {stats['vectors_unchanged']}")
+    logger.info(f"Stale vectors deleted: {stats['vectors_deleted']}")
     logger.info(f"Files failed: {stats['files_failed']}")
     logger.info(f"Skipped (empty): {stats['skipped']}")
+    logger.info(f"Unchanged (manifest): {stats['unchanged']}")
+    if not args.dry_run:
+        logger.info(f"Embedding requests: {batcher.requests} (chunks retried individually: {batcher.retried_chunks})")
+    for stage in stage_report['stages']:
+        logger.info(
+            f"Stage {stage['name']}: items={stage['items_in']} errors={stage['errors']} "
+            f"busy={stage['busy_seconds']:.1f}s utilization={stage['utilization'] * 100:.0f}%"
+        )
     
     if args.dry_run:
         logger.info("DRY RUN - No vectors were uploaded")
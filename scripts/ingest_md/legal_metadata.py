@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
@@ -39,35 +40,35 @@ def _normalize_date(value: Any) -> str | None:
         return None
 
 
+DOC_FAMILY_RULES: list[tuple[str, re.Pattern[str], tuple[str, ...], str | None]] = [
+    # (doc_family, pattern over lowercased text, url markers, manual prefix)
+    ('OINP', re.compile(r'ontario immigrant nominee|oinp'), ('/ontario/',), None),
+    ('BC_PNP', re.compile(r'bc pnp|bcpnp|british columbia pnp'), (), None),
+    ('AAIP', re.compile(r'alberta advantage immigration|aaip'), (), None),
+    ('NOC2021', re.compile(r'noc 2021|\bnoc\b'), (), None),
+    ('LICO_MNI', re.compile(r'lico|minimum necessary income|\bmni\b'), (), None),
+    ('MI', re.compile(r'ministerial instruction|\bmi\b'), (), None),
+    ('PUBLIC_POLICY', re.compile(r'public policy'), (), None),
+    ('VOI', re.compile(r'visa office'), ('/visa-office-', '/visa-office/'), None),
+    ('ENF', re.compile(r'enforcement manual'), ('/enforcement/',), 'enf'),
+    ('IRB_GUIDE', re.compile(r'jurisprudential guide|irb guide'), (), None),
+    ('IRPA', re.compile(r'\birpa\b'), (), None),
+    ('IRPR', re.compile(r'\birpr\b|sor-2002-227'), (), None),
+]
+
+
+def _doc_family_rule_hit(rule: tuple, u: str, m: str) -> bool:
+    _doc_family, _pattern, url_markers, manual_prefix = rule
+    return any(marker in u for marker in url_markers) or bool(manual_prefix and m.startswith(manual_prefix))
+
+
 def _detect_doc_family(combined: str, url: str, manual: str) -> str:
     c = combined.lower()
     u = url.lower()
     m = manual.lower()
-
-    if 'ontario immigrant nominee' in c or 'oinp' in c or '/ontario/' in u:
-        return 'OINP'
-    if 'bc pnp' in c or 'bcpnp' in c or 'british columbia pnp' in c:
-        return 'BC_PNP'
-    if 'alberta advantage immigration' in c or 'aaip' in c:
-        return 'AAIP'
-    if 'noc 2021' in c or re.search(r'\bnoc\b', c):
-        return 'NOC2021'
-    if 'lico' in c or 'minimum necessary income' in c or re.search(r'\bmni\b', c):
-        return 'LICO_MNI'
-    if 'ministerial instruction' in c or re.search(r'\bmi\b', c):
-        return 'MI'
-    if 'public policy' in c:
-        return 'PUBLIC_POLICY'
-    if 'visa office' in c or '/visa-office-' in u or '/visa-office/' in u:
-        return 'VOI'
-    if m.startswith('enf') or '/enforcement/' in u or 'enforcement manual' in c:
-        return 'ENF'
-    if 'jurisprudential guide' in c or 'irb guide' in c:
-        return 'IRB_GUIDE'
-    if re.search(r'\birpa\b', c):
-        return 'IRPA'
-    if re.search(r'\birpr\b', c) or 'sor-2002-227' in c:
-        return 'IRPR'
+    for rule in DOC_FAMILY_RULES:
+        if _doc_family_rule_hit(rule, u, m) or rule[1].search(c):
+            return rule[0]
     return 'PDI'
 
 
@@ -101,44 +102,49 @@ def _detect_jurisdiction(doc_family: str) -> str:
     return 'federal'
 
 
+INSTRUMENT_RULES: list[tuple[str, re.Pattern[str]]] = [
+    ('TRV', re.compile(r'\btrv\b|temporary resident visa|visitor|super visa')),
+    ('ETA', re.compile(r'\beta\b|electronic travel authorization')),
+    ('STUDY', re.compile(r'study permit|student')),
+    ('WORK', re.compile(r'work permit|foreign workers|lmia|r205|r186')),
+    ('PR_ECON', re.compile(r'express entry|economic class|federal skilled|cec|fst|permanent residence.*economic')),
+    ('PR_FAMILY', re.compile(r'family sponsorship|spousal|parent sponsorship')),
+    ('PR_REFUGEE', re.compile(r'refugee|asylum|protected person')),
+    ('INADMISSIBILITY', re.compile(r'inadmissib|criminality|medical inadmissib|security inadmissib')),
+    ('MISREP', re.compile(r'misrep|misrepresentation|\ba40\b')),
+    ('ENFORCEMENT', re.compile(r'enforcement|removal order|detention|admissibility hearing')),
+]
+
+INSTRUMENT_URL_RULES = [
+    ('/temporary-residents/', 'TRV'),
+    ('/permanent-residence/', 'PR_ECON'),
+    ('/enforcement/', 'ENFORCEMENT'),
+    ('/refugees/', 'PR_REFUGEE'),
+]
+
+INSTRUMENT_DEFAULTS = {
+    'ENF': 'ENFORCEMENT',
+    'OINP': 'PR_ECON',
+    'BC_PNP': 'PR_ECON',
+    'AAIP': 'PR_ECON',
+    'NOC2021': 'WORK',
+    'LICO_MNI': 'PR_FAMILY',
+}
+
+
+def _instrument_from_url(u: str) -> str | None:
+    for marker, tag in INSTRUMENT_URL_RULES:
+        if marker in u:
+            return tag
+    return None
+
+
 def _detect_instrument(combined: str, url: str, doc_family: str) -> str:
     c = combined.lower()
-    u = url.lower()
-
-    rules = [
-        ('TRV', r'\btrv\b|temporary resident visa|visitor|super visa'),
-        ('ETA', r'\beta\b|electronic travel authorization'),
-        ('STUDY', r'study permit|student'),
-        ('WORK', r'work permit|foreign workers|lmia|r205|r186'),
-        ('PR_ECON', r'express entry|economic class|federal skilled|cec|fst|permanent residence.*economic'),
-        ('PR_FAMILY', r'family sponsorship|spousal|parent sponsorship'),
-        ('PR_REFUGEE', r'refugee|asylum|protected person'),
-        ('INADMISSIBILITY', r'inadmissib|criminality|medical inadmissib|security inadmissib'),
-        ('MISREP', r'misrep|misrepresentation|\ba40\b'),
-        ('ENFORCEMENT', r'enforcement|removal order|detention|admissibility hearing'),
-    ]
-    for tag, pattern in rules:
-        if re.search(pattern, c):
+    for tag, pattern in INSTRUMENT_RULES:
+        if pattern.search(c):
             return tag
-
-    if '/temporary-residents/' in u:
-        return 'TRV'
-    if '/permanent-residence/' in u:
-        return 'PR_ECON'
-    if '/enforcement/' in u:
-        return 'ENFORCEMENT'
-    if '/refugees/' in u:
-        return 'PR_REFUGEE'
-
-    defaults = {
-        'ENF': 'ENFORCEMENT',
-        'OINP': 'PR_ECON',
-        'BC_PNP': 'PR_ECON',
-        'AAIP': 'PR_ECON',
-        'NOC2021': 'WORK',
-        'LICO_MNI': 'PR_FAMILY',
-    }
-    return defaults.get(doc_family, 'WORK')
+    return _instrument_from_url(url.lower()) or INSTRUMENT_DEFAULTS.get(doc_family, 'WORK')
 
 
 def _extract_section_id(text: str) -> str | None:
@@ -209,7 +215,35 @@ def _detect_table_type(combined: str) -> str | None:
     return None
 
 
-def build_canonical_metadata(
+# Doc-family and instrument rules run over "<title | manual | chapter | heading> | <chunk
+# text>". Only the chunk text changes per chunk, and a rule match that starts in the
+# document fields can only reach into it from their tail (the longest literal is under
+# 64 chars; `.*` stops at a newline), so per chunk we scan that tail plus the chunk text
+# and take matches found in the document fields alone from the cached context.
+_BOUNDARY_WINDOW = 64
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _boundary_window(prefix: str) -> str:
+    start = min(max(0, len(prefix) - _BOUNDARY_WINDOW), prefix.rfind('\n') + 1)
+    # Start after a non-word character so leading \b assertions behave as in the full text.
+    while start > 0 and _WORD_CHAR.match(prefix[start - 1]):
+        start -= 1
+    return prefix[start:]
+
+
+@dataclass(frozen=True)
+class DocumentMetadataContext:
+    """Page-wide metadata inputs, computed once per markdown file."""
+    prefix: str
+    boundary: str
+    url_lower: str
+    doc_family_hits: tuple[bool, ...]
+    instrument_hits: tuple[bool, ...]
+    effective_date: str | None
+
+
+def build_document_context(
     *,
     url: str,
     title: str,
@@ -217,18 +251,48 @@ def build_canonical_metadata(
     chapter: str,
     last_updated: Any,
     ingest_date: Any,
-    chunk_text: str,
     heading_path: list[str] | None,
-) -> dict[str, Any]:
+) -> DocumentMetadataContext:
     heading = '/'.join(heading_path or [])
-    combined = ' | '.join([title, manual, chapter, heading, chunk_text[:200]])
+    prefix = ' | '.join([title, manual, chapter, heading])
+    p = prefix.lower()
+    u = url.lower()
+    m = manual.lower()
+    return DocumentMetadataContext(
+        prefix=prefix,
+        boundary=_boundary_window(p),
+        url_lower=u,
+        doc_family_hits=tuple(
+            _doc_family_rule_hit(rule, u, m) or bool(rule[1].search(p))
+            for rule in DOC_FAMILY_RULES
+        ),
+        instrument_hits=tuple(bool(pattern.search(p)) for _tag, pattern in INSTRUMENT_RULES),
+        effective_date=_normalize_date(last_updated) or _normalize_date(ingest_date),
+    )
+
+
+def _first_rule(rules: list[tuple], doc_hits: tuple[bool, ...], probe: str) -> str | None:
+    for rule, doc_hit in zip(rules, doc_hits):
+        if doc_hit or rule[1].search(probe):
+            return rule[0]
+    return None
 
-    doc_family = _detect_doc_family(combined, url, manual)
+
+def build_chunk_metadata(context: DocumentMetadataContext, *, chunk_text: str) -> dict[str, Any]:
+    head = chunk_text[:200]
+    combined = f'{context.prefix} | {head}'
+    probe = f'{context.boundary} | {head.lower()}'
+
+    doc_family = _first_rule(DOC_FAMILY_RULES, context.doc_family_hits, probe) or 'PDI'
     authority_level = _authority_from_doc_family(doc_family)
     jurisdiction = _detect_jurisdiction(doc_family)
-    instrument = _detect_instrument(combined, url, doc_family)
+    instrument = (
+        _first_rule(INSTRUMENT_RULES, context.instrument_hits, probe)
+        or _instrument_from_url(context.url_lower)
+        or INSTRUMENT_DEFAULTS.get(doc_family, 'WORK')
+    )
 
-    effective_date = _normalize_date(last_updated) or _normalize_date(ingest_date)
+    effective_date = context.effective_date
     section_id = _extract_section_id(chunk_text)
     program_stream = _detect_program_stream(combined)
     noc_code = _extract_noc_code(chunk_text)
@@ -255,3 +319,26 @@ def build_canonical_metadata(
         out['table_type'] = table_type
 
     return out
+
+
+def build_canonical_metadata(
+    *,
+    url: str,
+    title: str,
+    manual: str,
+    chapter: str,
+    last_updated: Any,
+    ingest_date: Any,
+    chunk_text: str,
+    heading_path: list[str] | None,
+) -> dict[str, Any]:
+    context = build_document_context(
+        url=url,
+        title=title,
+        manual=manual,
+        chapter=chapter,
+        last_updated=last_updated,
+        ingest_date=ingest_date,
+        heading_path=heading_path,
+    )
+    return build_chunk_metadata(context, chunk_text=chunk_text)
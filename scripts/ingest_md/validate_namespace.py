@@ -11,11 +11,21 @@ import logging
 import os
 import re
 import sys
-from collections import Counter
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 
 from pinecone import Pinecone
 
+COMMON_DIR = Path(__file__).resolve().parents[1] / 'ingest_common'
+if str(COMMON_DIR) not in sys.path:
+    sys.path.append(str(COMMON_DIR))
+
+from merkle import ChecksumTree
+from sync import iter_id_pages
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -71,6 +81,9 @@ VALID_JURISDICTIONS = {'federal', 'ontario', 'bc', 'alberta'}
 
 DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
 
+# Checksum trees the ingesters write after each run (see ingest_common/merkle.py).
+DEFAULT_TREE_FILES = ('tmp/md_checksum_tree.json', 'tmp/pdf_checksum_tree.json')
+
 
 def get_embedding_dimension() -> int:
     """Get embedding dimension from env or default."""
@@ -125,10 +138,29 @@ def validate_enum(value: str | list, valid_set: set, field_name: str) -> tuple[b
     return True, ""
 
 
-def validate_namespace(index, namespace: str) -> dict:
-    """Validate a Pinecone namespace and return stats."""
-    stats = {
+ENUM_FIELDS = {
+    'authority_level': VALID_AUTHORITY_LEVELS,
+    'doc_family': VALID_DOC_FAMILIES,
+    'instrument': VALID_INSTRUMENTS,
+    'jurisdiction': VALID_JURISDICTIONS,
+}
+DATE_FIELDS = ('effective_date', 'expiry_date')
+PRESENCE_FIELDS = ('section_id', 'program_stream', 'noc_code', 'teer', 'table_type')
+CANONICAL_FIELDS = [*ENUM_FIELDS, *DATE_FIELDS, *PRESENCE_FIELDS]
+
+
+def new_stats() -> dict:
+    """Empty counters shared by the sampled check and the full audit."""
+    canonical = {}
+    for field in ENUM_FIELDS:
+        canonical[field] = {'present': 0, 'missing': 0, 'invalid': [], 'invalid_count': 0, 'distribution': Counter()}
+    for field in DATE_FIELDS:
+        canonical[field] = {'present': 0, 'missing': 0, 'invalid': [], 'invalid_count': 0, 'invalid_dates': []}
+    for field in PRESENCE_FIELDS:
+        canonical[field] = {'present': 0, 'missing': 0}
+    return {
         'total_vectors': 0,
+        'vectors_checked': 0,
         'unique_sources': set(),
         'unique_files': set(),
         'missing_url': 0,
@@ -136,34 +168,111 @@ def validate_namespace(index, namespace: str) -> dict:
         'missing_text': 0,
         'legal_enrichment_present': 0,
         'errors': [],
-        # New canonical metadata stats
-        'canonical_fields': {
-            'authority_level': {'present': 0, 'missing': 0, 'invalid': [], 'distribution': Counter()},
-            'doc_family': {'present': 0, 'missing': 0, 'invalid': [], 'distribution': Counter()},
-            'instrument': {'present': 0, 'missing': 0, 'invalid': [], 'distribution': Counter()},
-            'jurisdiction': {'present': 0, 'missing': 0, 'invalid': [], 'distribution': Counter()},
-            'effective_date': {'present': 0, 'missing': 0, 'invalid': [], 'invalid_dates': []},
-            'expiry_date': {'present': 0, 'missing': 0, 'invalid': [], 'invalid_dates': []},
-            'section_id': {'present': 0, 'missing': 0},
-            'program_stream': {'present': 0, 'missing': 0},
-            'noc_code': {'present': 0, 'missing': 0},
-            'teer': {'present': 0, 'missing': 0},
-            'table_type': {'present': 0, 'missing': 0},
-        },
+        'canonical_fields': canonical,
     }
-    
-    # Get stats
+
+
+def _record_invalid(field_stats: dict, vector_id: str, err: str, max_examples: int | None, log_invalid: bool) -> None:
+    field_stats['invalid_count'] += 1
+    if max_examples is None or len(field_stats['invalid']) < max_examples:
+        field_stats['invalid'].append(vector_id)
+    if log_invalid:
+        logger.warning(f"{err} (id: {vector_id})")
+
+
+def check_vector_metadata(
+    stats: dict,
+    vector_id: str,
+    meta: dict,
+    max_examples: int | None = None,
+    log_invalid: bool = True,
+) -> None:
+    """
+    Fold one vector's metadata into `stats`. With `max_examples` set, at most
+    that many offending ids (and invalid date values) are kept per field; the
+    counts are always exact.
+    """
+    stats['vectors_checked'] += 1
+
+    # Check for metadata fields
+    if not meta.get('url') and not meta.get('source_url'):
+        stats['missing_url'] += 1
+
+    if not meta.get('title'):
+        stats['missing_title'] += 1
+
+    if not meta.get('text'):
+        stats['missing_text'] += 1
+
+    # Track sources
+    if meta.get('source_id'):
+        stats['unique_sources'].add(meta['source_id'])
+
+    if meta.get('source_file'):
+        stats['unique_files'].add(meta['source_file'])
+
+    # Check for legal enrichment
+    text = meta.get('text', '')
+    if 'Regulation 205' in text or 'Act Section 25' in text:
+        stats['legal_enrichment_present'] += 1
+
+    # Validate canonical metadata fields
+    canonical = stats['canonical_fields']
+
+    for field, valid_set in ENUM_FIELDS.items():
+        field_stats = canonical[field]
+        val = meta.get(field)
+        if not val:
+            field_stats['missing'] += 1
+            continue
+        field_stats['present'] += 1
+        valid, err = validate_enum(val, valid_set, field)
+        if not valid:
+            _record_invalid(field_stats, vector_id, err, max_examples, log_invalid)
+        elif field == 'instrument':
+            for item in _split_values(val):
+                field_stats['distribution'][_normalize_enum_value(item, field)] += 1
+        else:
+            field_stats['distribution'][_normalize_enum_value(val, field)] += 1
+
+    for field in DATE_FIELDS:
+        field_stats = canonical[field]
+        val = meta.get(field)
+        if not val:
+            field_stats['missing'] += 1
+            continue
+        field_stats['present'] += 1
+        valid, err = validate_date_format(val, field)
+        if not valid:
+            _record_invalid(field_stats, vector_id, err, max_examples, log_invalid)
+            if max_examples is None or len(field_stats['invalid_dates']) < max_examples:
+                field_stats['invalid_dates'].append(val)
+
+    for field in PRESENCE_FIELDS:
+        if meta.get(field):
+            canonical[field]['present'] += 1
+        else:
+            canonical[field]['missing'] += 1
+
+
+def _namespace_vector_count(index, namespace: str, stats: dict) -> bool:
     try:
         index_stats = index.describe_index_stats()
         if namespace in index_stats.namespaces:
             stats['total_vectors'] = index_stats.namespaces[namespace].vector_count
-        else:
-            stats['errors'].append(f"Namespace {namespace} not found")
-            return stats
+            return True
+        stats['errors'].append(f"Namespace {namespace} not found")
     except Exception as e:
         stats['errors'].append(f"Failed to get index stats: {e}")
+    return False
+
+
+def validate_namespace(index, namespace: str) -> dict:
+    """Validate a Pinecone namespace from a sample of up to 100 vectors and return stats."""
+    stats = new_stats()
+    if not _namespace_vector_count(index, namespace, stats):
         return stats
-    
+
     # Sample vectors for spot-checking
     try:
         # Query with a dummy vector to get sample results
@@ -175,148 +284,206 @@ def validate_namespace(index, namespace: str) -> dict:
             top_k=min(100, stats['total_vectors']),
             include_metadata=True
         )
-        
+
         for match in results.matches:
-            meta = match.metadata or {}
-            
-            # Check for metadata fields
-            if not meta.get('url') and not meta.get('source_url'):
-                stats['missing_url'] += 1
-            
-            if not meta.get('title'):
-                stats['missing_title'] += 1
-            
-            if not meta.get('text'):
-                stats['missing_text'] += 1
-            
-            # Track sources
-            if meta.get('source_id'):
-                stats['unique_sources'].add(meta['source_id'])
-            
-            if meta.get('source_file'):
-                stats['unique_files'].add(meta['source_file'])
-            
-            # Check for legal enrichment
-            text = meta.get('text', '')
-            if 'Regulation 205' in text or 'Act Section 25' in text:
-                stats['legal_enrichment_present'] += 1
-            
-            # Validate canonical metadata fields
-            canonical = stats['canonical_fields']
-            
-            # authority_level
-            val = meta.get('authority_level')
-            if val:
-                canonical['authority_level']['present'] += 1
-                valid, err = validate_enum(val, VALID_AUTHORITY_LEVELS, 'authority_level')
-                if not valid:
-                    canonical['authority_level']['invalid'].append(match.id)
-                    logger.warning(f"{err} (id: {match.id})")
-                else:
-                    canonical['authority_level']['distribution'][_normalize_enum_value(val, 'authority_level')] += 1
-            else:
-                canonical['authority_level']['missing'] += 1
-            
-            # doc_family
-            val = meta.get('doc_family')
-            if val:
-                canonical['doc_family']['present'] += 1
-                valid, err = validate_enum(val, VALID_DOC_FAMILIES, 'doc_family')
-                if not valid:
-                    canonical['doc_family']['invalid'].append(match.id)
-                    logger.warning(f"{err} (id: {match.id})")
-                else:
-                    canonical['doc_family']['distribution'][_normalize_enum_value(val, 'doc_family')] += 1
-            else:
-                canonical['doc_family']['missing'] += 1
-            
-            # instrument
-            val = meta.get('instrument')
-            if val:
-                canonical['instrument']['present'] += 1
-                valid, err = validate_enum(val, VALID_INSTRUMENTS, 'instrument')
-                if not valid:
-                    canonical['instrument']['invalid'].append(match.id)
-                    logger.warning(f"{err} (id: {match.id})")
-                else:
-                    for item in _split_values(val):
-                        canonical['instrument']['distribution'][_normalize_enum_value(item, 'instrument')] += 1
-            else:
-                canonical['instrument']['missing'] += 1
-            
-            # jurisdiction
-            val = meta.get('jurisdiction')
-            if val:
-                canonical['jurisdiction']['present'] += 1
-                valid, err = validate_enum(val, VALID_JURISDICTIONS, 'jurisdiction')
-                if not valid:
-                    canonical['jurisdiction']['invalid'].append(match.id)
-                    logger.warning(f"{err} (id: {match.id})")
-                else:
-                    canonical['jurisdiction']['distribution'][_normalize_enum_value(val, 'jurisdiction')] += 1
-            else:
-                canonical['jurisdiction']['missing'] += 1
-            
-            # effective_date
-            val = meta.get('effective_date')
-            if val:
-                canonical['effective_date']['present'] += 1
-                valid, err = validate_date_format(val, 'effective_date')
-                if not valid:
-                    canonical['effective_date']['invalid'].append(match.id)
-                    canonical['effective_date']['invalid_dates'].append(val)
-                    logger.warning(f"{err} (id: {match.id})")
-            else:
-                canonical['effective_date']['missing'] += 1
-            
-            # expiry_date
-            val = meta.get('expiry_date')
-            if val:
-                canonical['expiry_date']['present'] += 1
-                valid, err = validate_date_format(val, 'expiry_date')
-                if not valid:
-                    canonical['expiry_date']['invalid'].append(match.id)
-                    canonical['expiry_date']['invalid_dates'].append(val)
-                    logger.warning(f"{err} (id: {match.id})")
-            else:
-                canonical['expiry_date']['missing'] += 1
-            
-            # section_id
-            if meta.get('section_id'):
-                canonical['section_id']['present'] += 1
-            else:
-                canonical['section_id']['missing'] += 1
-            
-            # program_stream
-            if meta.get('program_stream'):
-                canonical['program_stream']['present'] += 1
-            else:
-                canonical['program_stream']['missing'] += 1
-            
-            # noc_code
-            if meta.get('noc_code'):
-                canonical['noc_code']['present'] += 1
-            else:
-                canonical['noc_code']['missing'] += 1
-            
-            # teer
-            if meta.get('teer'):
-                canonical['teer']['present'] += 1
-            else:
-                canonical['teer']['missing'] += 1
-            
-            # table_type
-            if meta.get('table_type'):
-                canonical['table_type']['present'] += 1
-            else:
-                canonical['table_type']['missing'] += 1
-    
+            check_vector_metadata(stats, match.id, match.metadata or {})
+
     except Exception as e:
         stats['errors'].append(f"Failed to query vectors: {e}")
-    
+
     return stats
 
 
+def _id_batches(pages, batch_size: int):
+    """Listed id pages regrouped into fetch-sized batches, one page at a time."""
+    batch = []
+    for page in pages:
+        batch.extend(page)
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    if batch:
+        yield batch
+
+
+def _fetch_metadata(index, namespace: str, ids: list) -> dict:
+    response = index.fetch(ids=ids, namespace=namespace)
+    vectors = response.get('vectors') if isinstance(response, dict) else getattr(response, 'vectors', None)
+    out = {}
+    for vector_id, vector in (vectors or {}).items():
+        meta = vector.get('metadata') if isinstance(vector, dict) else getattr(vector, 'metadata', None)
+        out[vector_id] = meta or {}
+    return out
+
+
+def _settle(ids: list, future):
+    try:
+        return ids, future.result()
+    except Exception as e:
+        return ids, e
+
+
+def fetch_metadata_batches(index, namespace: str, pages, batch_size: int = 100, workers: int = 4):
+    """
+    Yield `(ids, {id: metadata})` for listed id pages, fetched in batches of
+    `batch_size` from a thread pool with at most `workers * 2` batches in
+    flight. A batch whose fetch failed yields the exception instead.
+    """
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for ids in _id_batches(pages, batch_size):
+            pending.append((ids, pool.submit(_fetch_metadata, index, namespace, ids)))
+            if len(pending) >= workers * 2:
+                yield _settle(*pending.popleft())
+        while pending:
+            yield _settle(*pending.popleft())
+
+
+def audit_namespace(
+    index,
+    namespace: str,
+    page_size: int = 100,
+    fetch_batch_size: int = 100,
+    workers: int = 4,
+    max_examples: int = 20,
+) -> dict:
+    """
+    Check the metadata of every vector in the namespace.
+
+    Ids are enumerated with `list_paginated` and fetched in parallel batches
+    (see `fetch_metadata_batches`); each batch is folded into the counters as
+    it arrives. Memory stays bounded by the fetch window, the per-field
+    examples and the sets of source ids and files.
+    """
+    stats = new_stats()
+    stats.update({'mode': 'full', 'vectors_listed': 0, 'missing_on_fetch': 0, 'fetch_requests': 0, 'failed_batches': 0})
+    started = time.perf_counter()
+    if not _namespace_vector_count(index, namespace, stats):
+        return stats
+
+    try:
+        pages = iter_id_pages(index, namespace, page_size=page_size)
+        for ids, found in fetch_metadata_batches(index, namespace, pages, fetch_batch_size, workers):
+            stats['fetch_requests'] += 1
+            stats['vectors_listed'] += len(ids)
+            if isinstance(found, Exception):
+                stats['failed_batches'] += 1
+                if len(stats['errors']) < max_examples:
+                    stats['errors'].append(f"Failed to fetch {len(ids)} ids starting at {ids[0]}: {found}")
+                continue
+            stats['missing_on_fetch'] += len(ids) - len(found)
+            for vector_id in ids:
+                if vector_id in found:
+                    check_vector_metadata(stats, vector_id, found[vector_id], max_examples=max_examples, log_invalid=False)
+    except Exception as e:
+        stats['errors'].append(f"Failed to list vectors: {e}")
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def _source_prefixes(tree: ChecksumTree, source_ids: list) -> list:
+    prefixes = set()
+    for sid in source_ids:
+        chunk_ids = tree.sources.get(sid) or {}
+        if chunk_ids:
+            prefixes.update(f"{chunk_id.rsplit('|', 1)[0]}|" for chunk_id in chunk_ids)
+        else:
+            prefixes.update((f'pdf|{sid}|', f'md|{sid}|'))
+    return sorted(prefixes)
+
+
+def remote_checksum_tree(
+    index,
+    namespace: str,
+    prefixes: list | None = None,
+    fetch_batch_size: int = 100,
+    workers: int = 4,
+) -> tuple[ChecksumTree, dict]:
+    """
+    Rebuild the checksum tree from chunk metadata in the namespace, for every
+    id or only ids under `prefixes`. Returns the tree and fetch counters.
+    """
+    tree = ChecksumTree(namespace)
+    counters = {'fetch_requests': 0, 'vectors_fetched': 0, 'errors': []}
+
+    def pages():
+        for prefix in prefixes or ['']:
+            yield from iter_id_pages(index, namespace, prefix)
+
+    for ids, found in fetch_metadata_batches(index, namespace, pages(), fetch_batch_size, workers):
+        counters['fetch_requests'] += 1
+        if isinstance(found, Exception):
+            counters['errors'].append(f"Failed to fetch {len(ids)} ids starting at {ids[0]}: {found}")
+            continue
+        counters['vectors_fetched'] += len(found)
+        for vector_id, meta in found.items():
+            tree.add(vector_id, meta.get('chunk_hash'), meta.get('source_id'))
+    return tree, counters
+
+
+def check_drift(
+    index,
+    namespace: str,
+    local: ChecksumTree,
+    source_ids: list | None = None,
+    fetch_batch_size: int = 100,
+    workers: int = 4,
+) -> dict:
+    """
+    Compare the local checksum tree with one rebuilt from the namespace.
+
+    With `source_ids` only those sources are listed (by id prefix) and
+    fetched, e.g. to re-check the sources a previous run reported. Sources in
+    the namespace that the local tree has no chunk hashes for (e.g. synced with
+    `--sync replace`) are listed as `untracked` and do not count as drift.
+    """
+    if source_ids:
+        expected = ChecksumTree(namespace)
+        for sid in source_ids:
+            expected.add_source(sid, local.sources.get(sid) or {})
+        prefixes = _source_prefixes(local, source_ids)
+    else:
+        expected, prefixes = local, None
+    actual, counters = remote_checksum_tree(index, namespace, prefixes, fetch_batch_size, workers)
+    untracked = sorted(sid for sid in actual.sources if sid not in local.sources)
+    drifted = {sid: detail for sid, detail in expected.diff(actual).items() if sid in local.sources}
+    return {
+        'namespace': namespace,
+        'scope': sorted(source_ids) if source_ids else 'all',
+        'in_sync': not drifted and not counters['errors'],
+        'local_root': expected.root,
+        'remote_root': actual.root,
+        'local_chunks': expected.chunk_count,
+        'remote_chunks': actual.chunk_count,
+        'drifted_sources': len(drifted),
+        'sources': drifted,
+        'untracked_sources': len(untracked),
+        'untracked': untracked,
+        **counters,
+    }
+
+
+def stats_report(stats: dict) -> dict:
+    """JSON-ready copy of validation stats: sets become counts, distributions plain dicts."""
+    report = {}
+    for key, value in stats.items():
+        if isinstance(value, set):
+            report[key] = len(value)
+        elif key == 'canonical_fields':
+            report[key] = {
+                field: {
+                    name: dict(item.most_common()) if isinstance(item, Counter) else item
+                    for name, item in field_stats.items()
+                }
+                for field, field_stats in value.items()
+            }
+        else:
+            report[key] = value
+    return report
+
+
 def spot_check_vectors(index, namespace: str, sample_size: int = 3) -> list:
     """Spot-check specific vectors for required fields."""
     checks = []
@@ -399,17 +566,14 @@ def check_idempotency(index, namespace: str, source_id: str) -> dict:
     return result
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Validate Pinecone namespace')
-    parser.add_argument('--namespace', default=os.getenv('PINECONE_NAMESPACE', 'immigration-v2'),
-                        help='Namespace to validate')
-    parser.add_argument('--source-id', help='Specific source_id to check for idempotency')
-    parser.add_argument('--strict', action='store_true',
-                        help='Exit with error if any canonical field has invalid enum/date values')
-    
-    args = parser.parse_args()
-    
-    # Initialize Pinecone
+def init_index():
+    """Connect to Pinecone, or the in-memory stand-in when PINECONE_BACKEND=memory."""
+    from memory_index import memory_index_from_env
+
+    memory_index = memory_index_from_env()
+    if memory_index is not None:
+        return memory_index
+
     pinecone_key = os.getenv('PINECONE_API_KEY')
     if not pinecone_key:
         logger.error("PINECONE_API_KEY not set")
@@ -426,19 +590,108 @@ def main():
         host = index_host.strip().rstrip('/')
         if not host.startswith('http://') and not host.startswith('https://'):
             host = f'https://{host}'
-        index = pc.Index(host=host)
+        return pc.Index(host=host)
+    return pc.Index(index_name)
+
+
+def run_drift_check(index, args) -> bool:
+    """Log (and optionally write) a drift report; True when the namespace matches the local trees."""
+    local = ChecksumTree(args.namespace)
+    paths = args.tree or [p for p in DEFAULT_TREE_FILES if Path(p).exists()]
+    for path in paths:
+        tree = ChecksumTree.load(path)
+        if tree.namespace != args.namespace:
+            logger.warning(f"Skipping {path}: built for namespace {tree.namespace!r}")
+            continue
+        local.merge(tree)
+        logger.info(f"Loaded checksum tree {path}: {len(tree.sources)} sources, {tree.chunk_count} chunks")
+    if not local.sources:
+        logger.error(f"No local checksum tree for namespace {args.namespace} (looked in {paths})")
+        return False
+
+    report = check_drift(
+        index,
+        args.namespace,
+        local,
+        source_ids=args.drift_source,
+        fetch_batch_size=args.audit_batch_size,
+        workers=args.audit_workers,
+    )
+    logger.info("=" * 50)
+    logger.info("Drift Check")
+    logger.info("=" * 50)
+    logger.info(f"Local root:  {report['local_root']} ({report['local_chunks']} chunks)")
+    logger.info(f"Remote root: {report['remote_root']} ({report['remote_chunks']} chunks)")
+    logger.info(f"Fetch requests: {report['fetch_requests']}")
+    if report['untracked_sources']:
+        logger.info(f"Untracked sources (no local chunk hashes, not compared): {report['untracked_sources']}")
+    for sid, detail in list(report['sources'].items())[:50]:
+        logger.warning(
+            f"  {sid}: missing={len(detail['missing'])} extra={len(detail['extra'])} changed={len(detail['changed'])}"
+        )
+    for err in report['errors']:
+        logger.error(f"  - {err}")
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report, indent=2, sort_keys=True), encoding='utf-8')
+        logger.info(f"Report written: {args.report}")
+    if report['in_sync']:
+        logger.info("✓ NO DRIFT")
     else:
-        index = pc.Index(index_name)
+        logger.info(f"✗ DRIFT in {report['drifted_sources']} sources")
+    return report['in_sync']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate Pinecone namespace')
+    parser.add_argument('--namespace', default=os.getenv('PINECONE_NAMESPACE', 'immigration-v2'),
+                        help='Namespace to validate')
+    parser.add_argument('--source-id', help='Specific source_id to check for idempotency')
+    parser.add_argument('--strict', action='store_true',
+                        help='Exit with error if any canonical field has invalid enum/date values')
+    parser.add_argument('--full-audit', action='store_true',
+                        help='Check every vector (ids listed in pages, metadata fetched in parallel) instead of a sample')
+    parser.add_argument('--audit-workers', type=int, default=4,
+                        help='Concurrent fetch requests in --full-audit')
+    parser.add_argument('--audit-batch-size', type=int, default=100,
+                        help='Ids per fetch request in --full-audit')
+    parser.add_argument('--report', default=None,
+                        help='Write the validation stats (or drift report) as JSON to this path')
+    parser.add_argument('--drift', action='store_true',
+                        help='Compare the local checksum trees written at ingest time with the namespace')
+    parser.add_argument('--tree', action='append', default=None,
+                        help=f'Checksum tree file for --drift (repeatable; default: {", ".join(DEFAULT_TREE_FILES)})')
+    parser.add_argument('--drift-source', action='append', default=None,
+                        help='With --drift: only list and fetch this source_id (repeatable)')
+    
+    args = parser.parse_args()
+    
+    index = init_index()
     
+    if args.drift:
+        sys.exit(0 if run_drift_check(index, args) else 1)
+
     logger.info(f"Validating namespace: {args.namespace}")
     
     # Run validation
-    stats = validate_namespace(index, args.namespace)
+    if args.full_audit:
+        stats = audit_namespace(
+            index,
+            args.namespace,
+            fetch_batch_size=args.audit_batch_size,
+            workers=args.audit_workers,
+        )
+    else:
+        stats = validate_namespace(index, args.namespace)
     
     logger.info("=" * 50)
     logger.info("Validation Results")
     logger.info("=" * 50)
     logger.info(f"Total vectors: {stats['total_vectors']}")
+    logger.info(f"Vectors checked: {stats['vectors_checked']}")
+    if args.full_audit:
+        logger.info(f"Fetch requests: {stats['fetch_requests']} ({stats['failed_batches']} failed), "
+                    f"ids missing on fetch: {stats['missing_on_fetch']}, {stats.get('seconds', 0)}s")
     logger.info(f"Unique sources: {len(stats['unique_sources'])}")
     logger.info(f"Unique files: {len(stats['unique_files'])}")
     logger.info(f"Vectors missing url: {stats['missing_url']}")
@@ -453,16 +706,13 @@ def main():
     
     # Canonical metadata fields validation
     logger.info("=" * 50)
-    logger.info("Canonical Metadata Fields (Sampled)")
+    logger.info(f"Canonical Metadata Fields ({'Full Audit' if args.full_audit else 'Sampled'})")
     logger.info("=" * 50)
     
-    sample_size = min(100, stats['total_vectors'])
     canonical = stats['canonical_fields']
     any_invalid = False
     
-    for field in ['authority_level', 'doc_family', 'instrument', 'jurisdiction',
-                  'effective_date', 'expiry_date', 'section_id', 'program_stream',
-                  'noc_code', 'teer', 'table_type']:
+    for field in CANONICAL_FIELDS:
         field_stats = canonical[field]
         present = field_stats['present']
         missing = field_stats['missing']
@@ -482,7 +732,7 @@ def main():
             if field_stats.get('invalid'):
                 any_invalid = True
                 invalid_ids = field_stats['invalid'][:5]
-                logger.warning(f"  INVALID: {len(field_stats['invalid'])} vectors ({invalid_ids}...)")
+                logger.warning(f"  INVALID: {field_stats['invalid_count']} vectors ({invalid_ids}...)")
             
             # Invalid dates
             if field_stats.get('invalid_dates'):
@@ -502,9 +752,7 @@ def main():
         logger.info(f"\nVector {i}: {check['id']}")
         for field, present in check.items():
             if field != 'id':
-                if field in ['authority_level', 'doc_family', 'instrument', 'jurisdiction',
-                            'effective_date', 'expiry_date', 'section_id', 'program_stream',
-                            'noc_code', 'teer', 'table_type']:
+                if field in CANONICAL_FIELDS:
                     status = "✓" if present else "○"
                     logger.info(f"  {status} {field}: {present or '(not set)'}")
                 else:
@@ -522,9 +770,24 @@ def main():
         logger.info(f"Consistent (no duplicates): {idem['consistent']}")
     
     # Overall pass/fail
+    passed = stats['total_vectors'] > 0 and not stats['errors'] and stats['missing_url'] == 0
+    strict_failed = passed and args.strict and any_invalid
+
+    if args.report:
+        report = {
+            'namespace': args.namespace,
+            'mode': 'full' if args.full_audit else 'sampled',
+            'generated_at': datetime.now().isoformat(),
+            'passed': passed and not strict_failed,
+            **stats_report(stats),
+        }
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report, indent=2, sort_keys=True), encoding='utf-8')
+        logger.info(f"Report written: {args.report}")
+
     logger.info("=" * 50)
-    if stats['total_vectors'] > 0 and not stats['errors'] and stats['missing_url'] == 0:
-        if args.strict and any_invalid:
+    if passed:
+        if strict_failed:
             logger.info("✗ VALIDATION FAILED (strict mode: invalid enum/date values found)")
             sys.exit(1)
         else:
@@ -533,6 +796,5 @@ def main():
         logger.info("✗ VALIDATION FAILED")
         sys.exit(1)
 
-
 if __name__ == '__main__':
     main()
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from chunk import build_chunks
+from normalize import normalize_document
+from structure import build_sections
+
+
+BOILERPLATE = 'Applicants must provide all supporting documents listed in the checklist.'
+
+
+def _build(pages: list[str], chunk_size: int = 120, chunk_overlap: int = 20) -> dict:
+    extracted = {
+        'file_path': '/docs/manual.pdf',
+        'pages': [{'page_number': i + 1, 'text': text, 'figures': []} for i, text in enumerate(pages)],
+        'warnings': [],
+    }
+    normalized = normalize_document(extracted)
+    sections = build_sections(normalized)
+    return build_chunks(normalized, sections, base_dir=Path('/docs'), chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def test_sections_carry_offsets_into_full_text():
+    extracted = {
+        'file_path': '/docs/manual.pdf',
+        'pages': [
+            {'page_number': 1, 'text': 'Intro paragraph.\n\nSecond paragraph.', 'figures': []},
+            {'page_number': 2, 'text': 'Third paragraph.', 'figures': []},
+        ],
+    }
+    normalized = normalize_document(extracted)
+    sections = build_sections(normalized)
+    full_text = normalized['full_text']
+    for section in sections:
+        for section_offset, full_offset in section['spans']:
+            assert full_text[full_offset:full_offset + 10] == section['text'][section_offset:section_offset + 10]
+
+
+def test_repeated_boilerplate_is_attributed_to_its_own_page():
+    pages = [
+        f'1. OVERVIEW OF PROCESS\n\n{BOILERPLATE}',
+        'Officers review the file and record the outcome in the system of record.',
+        f'2. FINAL DECISIONS\n\n{BOILERPLATE}',
+    ]
+    vectors = _build(pages, chunk_size=80)['vectors']
+    boilerplate_pages = [
+        (v['metadata']['page_start'], v['metadata']['page_end'])
+        for v in vectors
+        if v['text'] == BOILERPLATE
+    ]
+    assert boilerplate_pages == [(1, 1), (3, 3)]
+
+
+def test_empty_pages_do_not_shift_attribution():
+    pages = [
+        'FIRST HEADING\n\nAlpha text on page one.',
+        '',
+        '',
+        'SECOND HEADING\n\nOmega text on page four.',
+    ]
+    vectors = _build(pages)['vectors']
+    by_text = {v['text']: v['metadata'] for v in vectors}
+    omega = next(meta for text, meta in by_text.items() if 'Omega' in text)
+    assert (omega['page_start'], omega['page_end']) == (4, 4)
+
+
+def test_chunk_spanning_pages_reports_range():
+    pages = [
+        'Paragraph on page one continues',
+        'and ends on page two.',
+    ]
+    vectors = _build(pages, chunk_size=500)['vectors']
+    assert len(vectors) == 1
+    assert (vectors[0]['metadata']['page_start'], vectors[0]['metadata']['page_end']) == (1, 2)
@@ -0,0 +1,56 @@
+from legal_metadata import build_canonical_metadata, build_chunk_metadata, build_document_context
+
+
+def _both(chunk_text: str, full_text: str, section_heading: str = 'Overview', manual_code: str = 'op1') -> tuple[dict, dict]:
+    context = build_document_context(file_title='op1-eng', manual_code=manual_code, full_text=full_text)
+    per_chunk = build_chunk_metadata(
+        context,
+        section_heading=section_heading,
+        heading_path=[section_heading],
+        chunk_text=chunk_text,
+    )
+    direct = build_canonical_metadata(
+        file_title='op1-eng',
+        manual_code=manual_code,
+        section_heading=section_heading,
+        heading_path=[section_heading],
+        chunk_text=chunk_text,
+        full_text=full_text,
+    )
+    return per_chunk, direct
+
+
+def test_document_context_is_reused_across_chunks():
+    full_text = 'Effective date: 2023-04-01\n\nThis manual covers study permit applications.'
+    context = build_document_context(file_title='op1-eng', manual_code='op1', full_text=full_text)
+    first = build_chunk_metadata(context, section_heading='A', heading_path=['A'], chunk_text='See R205(a) for NOC 1234.')
+    second = build_chunk_metadata(context, section_heading='B', heading_path=['B'], chunk_text='TEER 3 applies.')
+
+    assert first['effective_date'] == second['effective_date'] == '2023-04-01'
+    assert first['section_id'] == 'IRPR_205a'
+    assert first['noc_code'] == '1234'
+    assert second['teer'] == '3'
+    assert 'section_id' not in second
+
+
+def test_rule_match_across_chunk_and_document_boundary():
+    # 'public policy' only appears across the join between chunk fields and document head.
+    per_chunk, direct = _both('Read the public', 'policy on exemptions.')
+    assert per_chunk == direct
+    assert per_chunk['doc_family'] == 'PUBLIC_POLICY'
+
+
+def test_word_boundary_rules_match_full_text_semantics():
+    # '\bmi\b' must not fire on 'mi' cut out of a longer word in the document head.
+    head = 'x' * 60 + ' mining and other text'
+    per_chunk, direct = _both('General guidance', head)
+    assert per_chunk == direct
+    assert per_chunk['doc_family'] == 'PDI'
+
+
+def test_document_head_matches_override_chunk_text():
+    per_chunk, direct = _both('Officers assess visitor records.', 'Ontario Immigrant Nominee Program guide')
+    assert per_chunk == direct
+    assert per_chunk['doc_family'] == 'OINP'
+    assert per_chunk['jurisdiction'] == 'ontario'
+    assert per_chunk['instrument'] == 'TRV'
@@ -15,3 +15,42 @@ def test_normalize_removes_repeated_headers_footers():
     assert 'HEADER' not in out['full_text']
     assert 'FOOTER' not in out['full_text']
     assert 'Body A' in out['full_text']
+
+
+def _long_document(page_count: int) -> dict:
+    pages = []
+    for i in range(page_count):
+        filler = [f'Unique line {chr(65 + j)} on sheet {chr(97 + i % 26)}{j}' for j in range(6)]
+        text = '\n'.join([
+            'Program Delivery Instructions',
+            *filler[:3],
+            f'Section {i % 7}. Overview ........ {i + 3}',
+            f'Body paragraph {i} with a hyphen-\nated word.',
+            f'2024-01-0{i % 9 + 1}',
+            *filler[3:],
+            f'Page {i + 1} of {page_count}',
+        ])
+        pages.append({'page_number': i + 1, 'text': text, 'figures': []})
+    return {'file_path': '/tmp/long.pdf', 'pages': pages, 'warnings': []}
+
+
+def test_parallel_normalization_matches_sequential(monkeypatch):
+    import normalize
+
+    extracted = _long_document(40)
+    sequential = normalize_document(extracted)
+    monkeypatch.setattr(normalize, 'PARALLEL_MIN_PAGES', 10)
+    parallel = normalize_document(extracted, workers=2)
+    pool = normalize.normalize_pool(2)
+    try:
+        shared = [normalize_document(extracted, workers=2, pool=pool) for _ in range(2)]
+    finally:
+        pool.shutdown()
+
+    assert parallel == sequential
+    assert shared == [sequential, sequential]
+    assert 'program delivery instructions' in sequential['removed_header_patterns']
+    assert 'page # of #' in sequential['removed_footer_patterns']
+    assert 'Section 0. Overview\n' in sequential['full_text']
+    assert 'hyphenated' in sequential['full_text']
+    assert '2024-01-01' not in sequential['full_text']
@@ -1,7 +1,8 @@
+import json
 import tempfile
 from pathlib import Path
 
-from state import load_state, mark_file, save_state
+from state import StateStore, checksum_tree, journal_path, load_state, mark_file, save_state, tracked_chunk_hashes
 
 
 def test_state_roundtrip():
@@ -14,3 +15,85 @@ def test_state_roundtrip():
         loaded = load_state(str(p))
         assert loaded['files']['a.pdf']['chunks'] == 7
         assert loaded['files']['a.pdf']['status'] == 'upserted'
+
+
+def test_store_journals_updates_without_rewriting_snapshot():
+    with tempfile.TemporaryDirectory() as td:
+        p = Path(td) / 'state.json'
+        store = StateStore(str(p))
+        store.mark_file('a.pdf', 'h1', 'upserted', 3)
+        store.mark_file('b.pdf', 'h2', 'failed', 0, 'boom')
+        assert not p.exists()
+        assert len(journal_path(str(p)).read_text(encoding='utf-8').splitlines()) == 2
+
+        # A reader that never saw close() still sees every committed entry.
+        loaded = load_state(str(p))
+        assert loaded['files']['b.pdf']['error'] == 'boom'
+
+        store.add_run({'files_found': 2})
+        store.close()
+        assert journal_path(str(p)).read_text(encoding='utf-8') == ''
+        assert json.loads(p.read_text(encoding='utf-8'))['runs'] == [{'files_found': 2}]
+
+
+def test_store_imports_legacy_json_and_ignores_torn_tail():
+    with tempfile.TemporaryDirectory() as td:
+        p = Path(td) / 'state.json'
+        p.write_text(json.dumps({'files': {'old.pdf': {'status': 'upserted', 'chunks': 1}}, 'runs': [{'n': 1}]}), encoding='utf-8')
+        store = StateStore(str(p), compact_every=2)
+        store.mark_file('a.pdf', 'h1', 'upserted', 3)
+        with journal_path(str(p)).open('a', encoding='utf-8') as handle:
+            handle.write('{"op": "file", "path": "torn')
+
+        reopened = StateStore(str(p))
+        assert set(reopened.files) == {'old.pdf', 'a.pdf'}
+        assert reopened.state['runs'] == [{'n': 1}]
+        reopened.mark_file('c.pdf', 'h3', 'upserted', 2)
+        reopened.close()
+        assert set(load_state(str(p))['files']) == {'old.pdf', 'a.pdf', 'c.pdf'}
+
+
+def test_compaction_crash_does_not_replay_runs_twice():
+    with tempfile.TemporaryDirectory() as td:
+        p = Path(td) / 'state.json'
+        store = StateStore(str(p))
+        store.add_run({'n': 1})
+        journal = journal_path(str(p)).read_text(encoding='utf-8')
+        store.close()
+        # Snapshot written, journal truncate lost.
+        journal_path(str(p)).write_text(journal, encoding='utf-8')
+        assert load_state(str(p))['runs'] == [{'n': 1}]
+
+
+def test_tracked_chunk_hashes_are_per_namespace():
+    with tempfile.TemporaryDirectory() as td:
+        p = Path(td) / 'state.json'
+        store = StateStore(str(p))
+        store.mark_file('a.pdf', 'h1', 'upserted', 2, namespace='ns', chunk_hashes={'pdf|x|c0': 'k0', 'pdf|x|c1': 'k1'})
+        store.mark_file('b.pdf', 'h2', 'upserted', 1)
+        store.close()
+
+        files = load_state(str(p))['files']
+        assert tracked_chunk_hashes(files['a.pdf'], 'ns') == {'pdf|x|c0': 'k0', 'pdf|x|c1': 'k1'}
+        assert tracked_chunk_hashes(files['a.pdf'], 'other') is None
+        assert tracked_chunk_hashes(files['b.pdf'], 'ns') is None
+        assert 'chunk_hashes' not in files['b.pdf']
+
+
+def test_dry_run_and_failure_keep_the_synced_chunks():
+    with tempfile.TemporaryDirectory() as td:
+        p = Path(td) / 'state.json'
+        store = StateStore(str(p))
+        synced = {'pdf|x|c0': 'k0', 'pdf|x|c1': 'k1'}
+        store.mark_file('a.pdf', 'h1', 'upserted', 2, namespace='ns', chunk_hashes=synced)
+        root = checksum_tree(store.files, 'ns').root
+
+        store.mark_file('a.pdf', 'h1', 'dry_run', 2, namespace='other')
+        assert tracked_chunk_hashes(store.files['a.pdf'], 'ns') == synced
+        store.mark_file('a.pdf', 'unknown', 'failed', 0, 'boom', namespace='ns')
+        store.close()
+
+        files = load_state(str(p))['files']
+        assert files['a.pdf']['status'] == 'failed'
+        assert tracked_chunk_hashes(files['a.pdf'], 'ns') == synced
+        assert checksum_tree(files, 'ns').root == root
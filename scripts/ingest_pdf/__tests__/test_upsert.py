@@ -0,0 +1,38 @@
+from upsert import delete_existing_source_vectors, filter_existing_vectors, init_index, upsert_batches
+
+# upsert puts scripts/ingest_common on sys.path.
+from memory_index import MemoryIndex
+
+
+def _vectors(source_id: str, count: int, text: str = 'chunk') -> list[dict]:
+    return [
+        {'id': f'pdf|{source_id}|c{i}', 'values': [float(i), 1.0], 'metadata': {'source_id': source_id, 'text': f'{text} {i}'}}
+        for i in range(count)
+    ]
+
+
+def test_reingest_replaces_source_and_skips_existing_ids():
+    index = MemoryIndex()
+    assert upsert_batches(index, 'ns', _vectors('a', 250) + _vectors('b', 5), target_batch_size=100) == 255
+    assert index.stats['upsert_requests'] == 3
+
+    delete_existing_source_vectors(index, 'ns', 'a')
+    assert index.describe_index_stats().namespaces['ns'].vector_count == 5
+
+    fresh = filter_existing_vectors(index, 'ns', _vectors('b', 8))
+    assert [v['id'] for v in fresh] == ['pdf|b|c5', 'pdf|b|c6', 'pdf|b|c7']
+
+
+def test_large_metadata_is_split_under_request_limit():
+    index = MemoryIndex()
+    vectors = _vectors('big', 120, text='z' * 30_000)
+    assert upsert_batches(index, 'ns', vectors) == 120
+    assert index.stats['upsert_requests'] > 2
+
+
+def test_init_index_uses_memory_backend(monkeypatch):
+    import memory_index
+
+    monkeypatch.setattr(memory_index, '_shared_index', None)
+    monkeypatch.setenv('PINECONE_BACKEND', 'memory')
+    assert isinstance(init_index(), MemoryIndex)
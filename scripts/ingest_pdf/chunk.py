@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 import hashlib
 import re
+import sys
+from bisect import bisect_right
 from pathlib import Path
 from typing import Any
 
-from legal_metadata import build_canonical_metadata
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from legal_metadata import build_chunk_metadata, build_document_context
+
+COMMON_DIR = Path(__file__).resolve().parents[1] / 'ingest_common'
+if str(COMMON_DIR) not in sys.path:
+    sys.path.append(str(COMMON_DIR))
+
+from sync import compute_chunk_hash
+from text_splitter import TextSplitter
 
 
 def derive_source_id(rel_path: str) -> str:
@@ -52,23 +60,33 @@ def derive_manual_code(file_path: Path) -> str:
     return re.sub(r'[^a-z0-9\-\.]+', '-', stem)[:48]
 
 
-def _char_page_ranges(pages: list[dict[str, Any]]) -> list[tuple[int, int, int]]:
-    ranges = []
-    offset = 0
+def _page_index(pages: list[dict[str, Any]]) -> tuple[list[int], list[int]]:
+    """Sorted page start offsets in full_text with their page numbers (empty pages excluded)."""
+    starts = []
+    numbers = []
     for p in pages:
-        text = p.get('text', '')
-        start = offset
-        end = offset + len(text)
-        ranges.append((start, end, p.get('page_number', 1)))
-        offset = end + 2
-    return ranges
+        if not p.get('text'):
+            continue
+        start = p.get('char_start')
+        if start is None:
+            return [], []
+        starts.append(start)
+        numbers.append(p.get('page_number', 1))
+    return starts, numbers
 
 
-def _pages_for_chunk(start: int, end: int, ranges: list[tuple[int, int, int]]) -> tuple[int, int]:
-    pages = [pg for rs, re, pg in ranges if not (end < rs or start > re)]
-    if not pages:
-        return 1, 1
-    return min(pages), max(pages)
+def _pages_for_chunk(start: int, end: int, page_index: tuple[list[int], list[int]]) -> tuple[int, int] | None:
+    starts, numbers = page_index
+    if not starts:
+        return None
+    first = max(0, bisect_right(starts, start) - 1)
+    last = max(0, bisect_right(starts, max(start, end - 1)) - 1)
+    return numbers[first], numbers[last]
+
+
+def _full_text_offset(section_offset: int, span_starts: list[int], spans: list[list[int]]) -> int:
+    j = max(0, bisect_right(span_starts, section_offset) - 1)
+    return spans[j][1] + (section_offset - spans[j][0])
 
 
 def build_chunks(
@@ -77,6 +95,7 @@ def build_chunks(
     base_dir: Path,
     chunk_size: int = 1000,
     chunk_overlap: int = 150,
+    embedding: str | None = None,
 ) -> dict[str, Any]:
     file_path = Path(normalized.get('file_path'))
     rel_path = str(file_path.relative_to(base_dir))
@@ -84,67 +103,65 @@ def build_chunks(
     manual_code = derive_manual_code(file_path)
     full_text = normalized.get('full_text', '')
     content_hash = derive_content_hash(full_text)
-    page_ranges = _char_page_ranges(normalized.get('pages', []))
+    page_index = _page_index(normalized.get('pages', []))
+    doc_context = build_document_context(file_title=file_path.stem, manual_code=manual_code, full_text=full_text)
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=['\n\n', '\n', ' ', ''],
-    )
+    splitter = TextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
     vectors = []
     chunk_index = 0
-    cursor = 0
 
     for section in sections:
         section_text = section.get('text', '').strip()
         if not section_text:
             continue
-        pieces = splitter.split_text(section_text)
-        for piece in pieces:
+        spans = section.get('spans') or []
+        span_starts = [span[0] for span in spans]
+        for offset, piece in splitter.split_with_offsets(section_text):
             piece_original = piece
             piece_enriched = enrich_legal_tokens(piece_original)
 
-            idx = full_text.find(piece, cursor)
-            if idx < 0:
-                idx = full_text.find(piece)
-            if idx >= 0:
-                cursor = idx + len(piece)
-                p_start, p_end = _pages_for_chunk(idx, idx + len(piece), page_ranges)
+            pages = None
+            if spans:
+                start = _full_text_offset(offset, span_starts, spans)
+                end = _full_text_offset(offset + len(piece) - 1, span_starts, spans) + 1
+                pages = _pages_for_chunk(start, end, page_index)
+            if pages:
+                p_start, p_end = pages
             else:
                 p_start, p_end = section.get('page_start', 1), section.get('page_end', 1)
 
             chunk_id = f'pdf|{source_id}|c{chunk_index}'
             heading_path = section.get('heading_path') or [section.get('heading', 'Document')]
-            canonical = build_canonical_metadata(
-                file_title=file_path.stem,
-                manual_code=manual_code,
+            canonical = build_chunk_metadata(
+                doc_context,
                 section_heading=section.get('heading', 'Document'),
                 heading_path=heading_path,
                 chunk_text=piece_original,
-                full_text=full_text,
             )
+            metadata = {
+                'text': piece_original,
+                'text_enriched': piece_enriched,
+                'title': file_path.stem,
+                'source_type': 'guidance_pdf',
+                'source_file': rel_path,
+                'source_id': source_id,
+                'manual_code': manual_code,
+                'chunk_index': chunk_index,
+                'chunk_id': chunk_id,
+                'content_hash': content_hash,
+                'page_start': p_start,
+                'page_end': p_end,
+                'section_heading': section.get('heading', 'Document'),
+                'heading_path': heading_path,
+                **canonical,
+            }
+            metadata['chunk_hash'] = compute_chunk_hash(piece_enriched, metadata, embedding)
             vectors.append({
                 'id': chunk_id,
                 'text': piece_original,
                 'text_embed': piece_enriched,
-                'metadata': {
-                    'text': piece_original,
-                    'text_enriched': piece_enriched,
-                    'title': file_path.stem,
-                    'source_type': 'guidance_pdf',
-                    'source_file': rel_path,
-                    'source_id': source_id,
-                    'manual_code': manual_code,
-                    'chunk_index': chunk_index,
-                    'chunk_id': chunk_id,
-                    'content_hash': content_hash,
-                    'page_start': p_start,
-                    'page_end': p_end,
-                    'section_heading': section.get('heading', 'Document'),
-                    'heading_path': heading_path,
-                    **canonical,
-                },
+                'metadata': metadata,
             })
             chunk_index += 1
 
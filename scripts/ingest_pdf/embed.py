@@ -34,7 +34,8 @@ def embed_texts(client: OpenAI | None, model: str, texts: list[str], max_retries
 
     for attempt in range(max_retries):
         try:
-            if provider == 'pinecone':
+            # An explicitly passed client (e.g. the benchmark's fake embedder) wins over the provider env.
+            if provider == 'pinecone' and client is None:
                 api_key = os.getenv('PINECONE_API_KEY') or ''
                 base_url = (os.getenv('EMBEDDING_BASE_URL') or 'https://api.pinecone.io').rstrip('/')
                 api_version = os.getenv('PINECONE_API_VERSION', '2025-10')
@@ -4,21 +4,35 @@ import json
 import logging
 import os
 import re
+import sys
+import threading
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from chunk import build_chunks
 from config import env_snapshot, load_env_file
 from discover import discover_pdf_files
 from embed import attach_embeddings, get_embedding_client
 from extract import extract_pdf_document
-from normalize import normalize_document
+from normalize import normalize_document, normalize_pool
 from schemas import validate_vectors
-from state import load_state, mark_file, save_state
+from state import StateStore, checksum_tree, tracked_chunk_hashes
 from structure import build_sections
 from upsert import delete_existing_source_vectors, filter_existing_vectors, init_index, upsert_batches
 
+COMMON_DIR = Path(__file__).resolve().parents[1] / 'ingest_common'
+if str(COMMON_DIR) not in sys.path:
+    sys.path.append(str(COMMON_DIR))
+
+from fake_embeddings import FakeEmbeddingClient
+from stages import Stage, StepTimer, run_stages
+from sync import SYNC_MODES, chunk_hashes, delete_ids, embedding_key, plan_sync, remote_chunk_hashes
+
+if TYPE_CHECKING:
+    from memory_index import MemoryIndex
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -32,12 +46,31 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--dry-run', action='store_true', help='Process without uploading')
     parser.add_argument('--chunk-size', type=int, default=1000, help='Chunk size for splitting')
     parser.add_argument('--chunk-overlap', type=int, default=150, help='Chunk overlap for splitting')
-    parser.add_argument('--no-delete-existing-source', action='store_true', help='Do not delete vectors by source_id')
-    parser.add_argument('--skip-existing-ids', action='store_true', help='Skip vectors with existing IDs in namespace')
+    parser.add_argument(
+        '--sync',
+        choices=SYNC_MODES,
+        default='tracked',
+        help='How to update a source: diff chunk hashes against the state file (tracked, listing ids when the file has no record), '
+        'against ids listed from the namespace (listed), or delete by source_id and re-upsert everything (replace)',
+    )
+    parser.add_argument('--no-delete-existing-source', action='store_true', help='With --sync replace: do not delete vectors by source_id')
+    parser.add_argument('--skip-existing-ids', action='store_true', help='With --sync replace: skip vectors with existing IDs in namespace')
     parser.add_argument('--enable-ocr', action='store_true', help='Enable OCR fallback mode (placeholder in MVP)')
     parser.add_argument('--state-file', default='tmp/pdf_ingest_state.json', help='State file path')
+    parser.add_argument(
+        '--checksum-tree',
+        default='tmp/pdf_checksum_tree.json',
+        help='Where to write the checksum tree of synced chunks for validate_namespace.py --drift',
+    )
     parser.add_argument('--write-chunk-artifacts', action='store_true', help='Write per-file chunk JSON artifacts for review')
     parser.add_argument('--artifact-dir', default='tmp/pdf_chunk_preview', help='Output directory for chunk artifacts')
+    parser.add_argument('--upsert-workers', type=int, default=1, help='Concurrent upsert requests per file')
+    parser.add_argument('--normalize-workers', type=int, default=1, help='Worker processes for normalizing large documents')
+    parser.add_argument('--queue-size', type=int, default=2, help='Files buffered between chunk, embed and upsert stages')
+    parser.add_argument('--benchmark', action='store_true', help='Run the full path against a fake embedder and in-memory index and report timings')
+    parser.add_argument('--benchmark-embed-latency', type=float, default=0.05, help='Seconds of simulated latency per embedding request')
+    parser.add_argument('--benchmark-dim', type=int, default=1024, help='Dimension of fake embeddings')
+    parser.add_argument('--benchmark-report', default=None, help='Optional path for the benchmark JSON report')
     return parser.parse_args()
 
 
@@ -89,9 +122,50 @@ def write_chunk_artifact(
     return str(out_path)
 
 
+def _peak_memory_mb() -> float:
+    # Unix-only, and only needed for --benchmark.
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def build_benchmark_report(args: argparse.Namespace, run_summary: dict, index: 'MemoryIndex', client: FakeEmbeddingClient) -> dict:
+    wall_seconds = run_summary['stages']['wall_seconds']
+    chunks = run_summary['chunks_built']
+    return {
+        'files': run_summary['files_processed'],
+        'files_failed': run_summary['files_failed'],
+        'chunks': chunks,
+        'vectors_upserted': run_summary['vectors_upserted'],
+        'wall_seconds': wall_seconds,
+        'chunks_per_second': round(chunks / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+        'bytes_upserted': index.stats['bytes_upserted'],
+        'upsert_requests': index.stats['upsert_requests'],
+        'embed_requests': client.requests,
+        'peak_memory_mb': _peak_memory_mb(),
+        'step_seconds': run_summary['step_seconds'],
+        'stages': run_summary['stages']['stages'],
+        'settings': {
+            'chunk_size': args.chunk_size,
+            'chunk_overlap': args.chunk_overlap,
+            'queue_size': args.queue_size,
+            'upsert_workers': args.upsert_workers,
+            'normalize_workers': args.normalize_workers,
+            'embed_batch_size': int(os.getenv('PDF_EMBED_BATCH_SIZE', '32')),
+            'embed_latency_seconds': args.benchmark_embed_latency,
+            'embedding_dim': args.benchmark_dim,
+        },
+    }
+
+
 def main() -> None:
     load_env_file()
     args = parse_args()
+    if args.benchmark and args.dry_run:
+        raise SystemExit('--benchmark runs the full path; do not combine it with --dry-run')
 
     logger.info('Env snapshot: %s', env_snapshot())
 
@@ -100,7 +174,8 @@ def main() -> None:
         logger.error('No PDF files found in %s', args.directory)
         raise SystemExit(1)
 
-    state = load_state(args.state_file)
+    # Benchmark runs leave the state file untouched.
+    store = None if args.benchmark else StateStore(args.state_file)
     run_summary = {
         'started_at': datetime.now(timezone.utc).isoformat(),
         'namespace': args.namespace,
@@ -109,92 +184,194 @@ def main() -> None:
         'files_failed': 0,
         'chunks_built': 0,
         'vectors_upserted': 0,
+        'vectors_unchanged': 0,
+        'vectors_deleted': 0,
         'artifacts_written': 0,
     }
 
     index = None
-    if not args.dry_run:
-        index = init_index()
-
     client, model = (None, None)
-    if not args.dry_run:
+    if args.benchmark:
+        from memory_index import MemoryIndex
+
+        index = MemoryIndex()
+        client, model = FakeEmbeddingClient(args.benchmark_dim, args.benchmark_embed_latency), 'fake-embedding'
+        logger.info('Benchmark mode: fake embedder (%.3fs/request), in-memory index', args.benchmark_embed_latency)
+    elif not args.dry_run:
+        index = init_index()
         client, model = get_embedding_client()
         logger.info('Embedding model: %s', model)
+    # Part of every chunk hash, so switching models re-embeds instead of matching old hashes.
+    embedding = embedding_key(model, args.benchmark_dim if args.benchmark else os.getenv('EMBEDDING_DIM'))
 
     base_dir = Path(args.directory)
-
-    for file_path in files:
+    lock = threading.Lock()
+    timer = StepTimer()
+
+    def record(
+        rel_path: str,
+        content_hash: str,
+        status: str,
+        chunks: int,
+        error: str | None = None,
+        hashes: dict[str, str] | None = None,
+    ) -> None:
+        if store is not None:
+            store.mark_file(rel_path, content_hash, status, chunks, error, namespace=args.namespace, chunk_hashes=hashes)
+
+    def prepare_stage(file_path: Path) -> dict | None:
         rel_path = str(file_path.relative_to(base_dir))
-        try:
+        with timer.time('extract'):
             extracted = extract_pdf_document(file_path, enable_ocr=args.enable_ocr)
-            normalized = normalize_document(extracted)
+        with timer.time('normalize'):
+            normalized = normalize_document(extracted, workers=args.normalize_workers, pool=pool)
+        with timer.time('structure'):
             sections = build_sections(normalized)
+        with timer.time('chunk'):
             chunked = build_chunks(
                 normalized,
                 sections,
                 base_dir=base_dir,
                 chunk_size=args.chunk_size,
                 chunk_overlap=args.chunk_overlap,
+                embedding=embedding,
             )
-            vectors = chunked['vectors']
-
-            ok, msg = validate_vectors(vectors)
-            if not ok:
-                raise RuntimeError(msg)
-
-            if args.write_chunk_artifacts:
-                artifact_path = write_chunk_artifact(
-                    artifact_dir=args.artifact_dir,
-                    chunked=chunked,
-                    sections=sections,
-                    normalized=normalized,
-                )
+        vectors = chunked['vectors']
+
+        ok, msg = validate_vectors(vectors)
+        if not ok:
+            raise RuntimeError(msg)
+
+        if args.write_chunk_artifacts:
+            artifact_path = write_chunk_artifact(
+                artifact_dir=args.artifact_dir,
+                chunked=chunked,
+                sections=sections,
+                normalized=normalized,
+            )
+            with lock:
                 run_summary['artifacts_written'] += 1
-                logger.info('Wrote artifact: %s', artifact_path)
+            logger.info('Wrote artifact: %s', artifact_path)
 
+        with lock:
             run_summary['chunks_built'] += len(vectors)
             run_summary['files_processed'] += 1
 
-            if args.dry_run:
-                mark_file(state, rel_path, chunked['content_hash'], 'dry_run', len(vectors))
-                save_state(args.state_file, state)
-                logger.info('Dry run processed %s: %s chunks', rel_path, len(vectors))
-                continue
+        if args.dry_run:
+            record(rel_path, chunked['content_hash'], 'dry_run', len(vectors))
+            logger.info('Dry run processed %s: %s chunks', rel_path, len(vectors))
+            return None
+
+        return {'rel_path': rel_path, 'chunked': chunked}
+
+    def embed_stage(item: dict) -> dict | None:
+        rel_path = item['rel_path']
+        chunked = item['chunked']
 
+        vectors_to_embed = chunked['vectors']
+        if args.sync == 'replace':
             if not args.no_delete_existing_source:
                 try:
                     delete_existing_source_vectors(index, args.namespace, chunked['source_id'])
                 except Exception as exc:
                     logger.warning('Delete failed for %s: %s', rel_path, exc)
 
-            vectors_to_embed = vectors
             if args.skip_existing_ids:
                 vectors_to_embed = filter_existing_vectors(index, args.namespace, vectors_to_embed)
                 if not vectors_to_embed:
-                    mark_file(state, rel_path, chunked['content_hash'], 'skipped_existing', 0)
-                    save_state(args.state_file, state)
+                    record(rel_path, chunked['content_hash'], 'skipped_existing', 0)
                     logger.info('Skipped existing vectors for %s', rel_path)
-                    continue
-
-            payload_vectors = attach_embeddings(vectors_to_embed, client, model, dry_run=False)
+                    return None
+        else:
+            tracked = None
+            if args.sync == 'tracked' and store is not None:
+                tracked = tracked_chunk_hashes(store.files.get(rel_path), args.namespace)
+            with timer.time('diff'):
+                remote = remote_chunk_hashes(index, args.namespace, f"pdf|{chunked['source_id']}|", tracked)
+                plan = plan_sync(vectors_to_embed, remote)
+            item['plan'] = plan
+            with lock:
+                run_summary['vectors_unchanged'] += len(plan.unchanged)
+            if plan.noop:
+                record(rel_path, chunked['content_hash'], 'unchanged', len(vectors_to_embed), hashes=chunk_hashes(vectors_to_embed))
+                logger.info('Unchanged %s: %s chunks', rel_path, len(vectors_to_embed))
+                return None
+            vectors_to_embed = plan.upsert
+
+        payload_vectors = []
+        if vectors_to_embed:
+            with timer.time('embed'):
+                payload_vectors = attach_embeddings(vectors_to_embed, client, model, dry_run=False)
             if not payload_vectors:
                 raise RuntimeError('embedding failed for one or more chunks')
 
-            upserted = upsert_batches(index, args.namespace, payload_vectors)
+        item['payload_vectors'] = payload_vectors
+        return item
+
+    def upsert_stage(item: dict) -> None:
+        rel_path = item['rel_path']
+        chunked = item['chunked']
+        payload_vectors = item['payload_vectors']
+        plan = item.get('plan')
+
+        upserted = 0
+        if payload_vectors:
+            with timer.time('upsert'):
+                upserted = upsert_batches(index, args.namespace, payload_vectors, max_workers=args.upsert_workers)
+            if plan is not None and upserted < len(payload_vectors):
+                raise RuntimeError(f'only {upserted} of {len(payload_vectors)} vectors were upserted')
+        # Stale ids go only after the new chunks are in, so the source is never absent.
+        deleted = 0
+        if plan is not None and plan.delete:
+            with timer.time('delete'):
+                deleted = delete_ids(index, args.namespace, plan.delete)
+        with lock:
             run_summary['vectors_upserted'] += upserted
-            mark_file(state, rel_path, chunked['content_hash'], 'upserted', len(payload_vectors))
-            save_state(args.state_file, state)
-            logger.info('Processed %s: chunks=%s upserted=%s', rel_path, len(vectors), upserted)
+            run_summary['vectors_deleted'] += deleted
+        if plan is None:
+            record(rel_path, chunked['content_hash'], 'upserted', len(payload_vectors))
+        else:
+            vectors = chunked['vectors']
+            record(rel_path, chunked['content_hash'], 'upserted', len(vectors), hashes=chunk_hashes(vectors))
+        logger.info('Processed %s: chunks=%s upserted=%s deleted=%s', rel_path, len(chunked['vectors']), upserted, deleted)
 
-        except Exception as exc:
+    def on_error(stage_name: str, item: Path | dict, exc: BaseException) -> None:
+        rel_path = str(item.relative_to(base_dir)) if isinstance(item, Path) else item['rel_path']
+        with lock:
             run_summary['files_failed'] += 1
-            mark_file(state, rel_path, 'unknown', 'failed', 0, str(exc))
-            save_state(args.state_file, state)
-            logger.error('Failed %s: %s', rel_path, exc)
+        record(rel_path, 'unknown', 'failed', 0, str(exc))
+        logger.error('Failed %s (%s): %s', rel_path, stage_name, exc)
+
+    stages = [Stage('prepare', prepare_stage)]
+    if not args.dry_run:
+        stages.extend([Stage('embed', embed_stage), Stage('upsert', upsert_stage)])
+
+    # One pool for the run, created before the stage threads start.
+    pool = normalize_pool(args.normalize_workers)
+    try:
+        stage_report = run_stages(files, stages, queue_size=args.queue_size, on_error=on_error)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    run_summary['stages'] = stage_report
+    run_summary['step_seconds'] = timer.to_dict()
+
+    if args.benchmark:
+        report = build_benchmark_report(args, run_summary, index, client)
+        report_json = json.dumps(report, indent=2)
+        if args.benchmark_report:
+            Path(args.benchmark_report).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.benchmark_report).write_text(report_json, encoding='utf-8')
+        print(report_json)
+        return
 
     run_summary['finished_at'] = datetime.now(timezone.utc).isoformat()
-    state.setdefault('runs', []).append(run_summary)
-    save_state(args.state_file, state)
+    store.add_run(run_summary)
+    store.close()
+    if not args.dry_run:
+        tree = checksum_tree(store.files, args.namespace)
+        tree.save(args.checksum_tree)
+        logger.info('Checksum tree: %s (root %s, %s sources)', args.checksum_tree, tree.root[:12], len(tree.sources))
 
     logger.info('==================================================')
     logger.info('PDF Ingestion Summary')
@@ -204,7 +381,14 @@ def main() -> None:
     logger.info('Files failed: %s', run_summary['files_failed'])
     logger.info('Chunks built: %s', run_summary['chunks_built'])
     logger.info('Vectors upserted: %s', run_summary['vectors_upserted'])
+    logger.info('Vectors unchanged: %s', run_summary['vectors_unchanged'])
+    logger.info('Stale vectors deleted: %s', run_summary['vectors_deleted'])
     logger.info('Chunk artifacts written: %s', run_summary['artifacts_written'])
+    for stage in stage_report['stages']:
+        logger.info(
+            'Stage %s: items=%s errors=%s busy=%.1fs utilization=%.0f%%',
+            stage['name'], stage['items_in'], stage['errors'], stage['busy_seconds'], stage['utilization'] * 100,
+        )
     logger.info('Namespace: %s', args.namespace)
 
 
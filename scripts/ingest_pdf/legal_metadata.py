@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
 
@@ -49,34 +51,29 @@ def _extract_effective_date_from_text(text: str) -> str | None:
     return None
 
 
+DOC_FAMILY_RULES: list[tuple[str, re.Pattern[str], str | None]] = [
+    # (doc_family, pattern over lowercased text, manual_code prefix that also selects it)
+    ('OINP', re.compile(r'ontario immigrant nominee|oinp'), None),
+    ('BC_PNP', re.compile(r'bc pnp|bcpnp|british columbia pnp'), None),
+    ('AAIP', re.compile(r'alberta advantage immigration|aaip'), None),
+    ('NOC2021', re.compile(r'noc 2021|\bnoc\b'), None),
+    ('LICO_MNI', re.compile(r'lico|minimum necessary income|\bmni\b'), None),
+    ('MI', re.compile(r'ministerial instruction|\bmi\b'), None),
+    ('PUBLIC_POLICY', re.compile(r'public policy'), None),
+    ('VOI', re.compile(r'visa office'), 'voi'),
+    ('ENF', re.compile(r'enforcement manual|removal order'), 'enf'),
+    ('IRB_GUIDE', re.compile(r'jurisprudential guide|irb guide'), None),
+    ('IRPA', re.compile(r'immigration and refugee protection act'), None),
+    ('IRPR', re.compile(r'immigration and refugee protection regulations|sor-2002-227'), 'sor-'),
+]
+
+
 def _detect_doc_family(combined: str, manual_code: str) -> str:
     c = combined.lower()
     m = manual_code.lower()
-
-    if 'ontario immigrant nominee' in c or 'oinp' in c:
-        return 'OINP'
-    if 'bc pnp' in c or 'bcpnp' in c or 'british columbia pnp' in c:
-        return 'BC_PNP'
-    if 'alberta advantage immigration' in c or 'aaip' in c:
-        return 'AAIP'
-    if 'noc 2021' in c or re.search(r'\bnoc\b', c):
-        return 'NOC2021'
-    if 'lico' in c or 'minimum necessary income' in c or re.search(r'\bmni\b', c):
-        return 'LICO_MNI'
-    if 'ministerial instruction' in c or re.search(r'\bmi\b', c):
-        return 'MI'
-    if 'public policy' in c:
-        return 'PUBLIC_POLICY'
-    if 'visa office' in c or m.startswith('voi'):
-        return 'VOI'
-    if m.startswith('enf') or 'enforcement manual' in c or 'removal order' in c:
-        return 'ENF'
-    if 'jurisprudential guide' in c or 'irb guide' in c:
-        return 'IRB_GUIDE'
-    if 'immigration and refugee protection act' in c:
-        return 'IRPA'
-    if 'immigration and refugee protection regulations' in c or 'sor-2002-227' in c or m.startswith('sor-'):
-        return 'IRPR'
+    for doc_family, pattern, code_prefix in DOC_FAMILY_RULES:
+        if (code_prefix and m.startswith(code_prefix)) or pattern.search(c):
+            return doc_family
     return 'PDI'
 
 
@@ -110,33 +107,35 @@ def _detect_jurisdiction(doc_family: str) -> str:
     return 'federal'
 
 
+INSTRUMENT_RULES: list[tuple[str, re.Pattern[str]]] = [
+    ('TRV', re.compile(r'\btrv\b|temporary resident visa|visitor|super visa')),
+    ('ETA', re.compile(r'\beta\b|electronic travel authorization')),
+    ('STUDY', re.compile(r'study permit|student')),
+    ('WORK', re.compile(r'work permit|foreign workers|lmia|r205|r186')),
+    ('PR_ECON', re.compile(r'express entry|economic class|federal skilled|cec|fst|permanent residence.*economic')),
+    ('PR_FAMILY', re.compile(r'family sponsorship|spousal|parent sponsorship')),
+    ('PR_REFUGEE', re.compile(r'refugee|asylum|protected person')),
+    ('INADMISSIBILITY', re.compile(r'inadmissib|criminality|medical inadmissib|security inadmissib')),
+    ('MISREP', re.compile(r'misrep|misrepresentation|\ba40\b')),
+    ('ENFORCEMENT', re.compile(r'enforcement|removal order|detention|admissibility hearing')),
+]
+
+INSTRUMENT_DEFAULTS = {
+    'ENF': 'ENFORCEMENT',
+    'OINP': 'PR_ECON',
+    'BC_PNP': 'PR_ECON',
+    'AAIP': 'PR_ECON',
+    'NOC2021': 'WORK',
+    'LICO_MNI': 'PR_FAMILY',
+}
+
+
 def _detect_instrument(combined: str, doc_family: str) -> str:
     c = combined.lower()
-    rules = [
-        ('TRV', r'\btrv\b|temporary resident visa|visitor|super visa'),
-        ('ETA', r'\beta\b|electronic travel authorization'),
-        ('STUDY', r'study permit|student'),
-        ('WORK', r'work permit|foreign workers|lmia|r205|r186'),
-        ('PR_ECON', r'express entry|economic class|federal skilled|cec|fst|permanent residence.*economic'),
-        ('PR_FAMILY', r'family sponsorship|spousal|parent sponsorship'),
-        ('PR_REFUGEE', r'refugee|asylum|protected person'),
-        ('INADMISSIBILITY', r'inadmissib|criminality|medical inadmissib|security inadmissib'),
-        ('MISREP', r'misrep|misrepresentation|\ba40\b'),
-        ('ENFORCEMENT', r'enforcement|removal order|detention|admissibility hearing'),
-    ]
-    for tag, pattern in rules:
-        if re.search(pattern, c):
+    for tag, pattern in INSTRUMENT_RULES:
+        if pattern.search(c):
             return tag
-
-    defaults = {
-        'ENF': 'ENFORCEMENT',
-        'OINP': 'PR_ECON',
-        'BC_PNP': 'PR_ECON',
-        'AAIP': 'PR_ECON',
-        'NOC2021': 'WORK',
-        'LICO_MNI': 'PR_FAMILY',
-    }
-    return defaults.get(doc_family, 'WORK')
+    return INSTRUMENT_DEFAULTS.get(doc_family, 'WORK')
 
 
 def _extract_section_id(text: str) -> str | None:
@@ -207,24 +206,80 @@ def _detect_table_type(combined: str) -> str | None:
     return None
 
 
-def build_canonical_metadata(
+# Doc-family and instrument rules run over "<chunk fields> <first 1000 chars of the
+# document>". A rule match that starts in the chunk fields can only reach a short way
+# into the document (the longest literal is under 64 chars; `.*` stops at the first
+# newline), so per chunk we scan the chunk fields plus this boundary window and take
+# matches found in the document head alone from the cached context.
+_BOUNDARY_WINDOW = 64
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _boundary_window(doc_head: str) -> str:
+    newline = doc_head.find('\n')
+    end = max(_BOUNDARY_WINDOW, newline if newline >= 0 else len(doc_head))
+    # Cut at a non-word character so trailing \b assertions behave as in the full text.
+    while end < len(doc_head) and _WORD_CHAR.match(doc_head[end]):
+        end += 1
+    return doc_head[:end]
+
+
+@dataclass(frozen=True)
+class DocumentMetadataContext:
+    """Document-wide metadata inputs, computed once per file."""
+    file_title: str
+    manual_code: str
+    boundary: str
+    doc_family_hits: tuple[bool, ...]
+    instrument_hits: tuple[bool, ...]
+    effective_date: str | None
+
+
+def build_document_context(*, file_title: str, manual_code: str, full_text: str) -> DocumentMetadataContext:
+    doc_head = full_text[:1000].lower()
+    m = manual_code.lower()
+    return DocumentMetadataContext(
+        file_title=file_title,
+        manual_code=manual_code,
+        boundary=_boundary_window(doc_head),
+        doc_family_hits=tuple(
+            bool((code_prefix and m.startswith(code_prefix)) or pattern.search(doc_head))
+            for _doc_family, pattern, code_prefix in DOC_FAMILY_RULES
+        ),
+        instrument_hits=tuple(bool(pattern.search(doc_head)) for _tag, pattern in INSTRUMENT_RULES),
+        effective_date=_extract_effective_date_from_text(full_text),
+    )
+
+
+@lru_cache(maxsize=8)
+def _cached_document_context(file_title: str, manual_code: str, full_text: str) -> DocumentMetadataContext:
+    return build_document_context(file_title=file_title, manual_code=manual_code, full_text=full_text)
+
+
+def _first_rule(rules: list[tuple], doc_hits: tuple[bool, ...], probe: str) -> str | None:
+    for rule, doc_hit in zip(rules, doc_hits):
+        if doc_hit or rule[1].search(probe):
+            return rule[0]
+    return None
+
+
+def build_chunk_metadata(
+    context: DocumentMetadataContext,
     *,
-    file_title: str,
-    manual_code: str,
     section_heading: str,
     heading_path: list[str] | None,
     chunk_text: str,
-    full_text: str,
 ) -> dict[str, Any]:
     heading = '/'.join(heading_path or [])
-    combined = ' | '.join([file_title, manual_code, section_heading, heading, chunk_text[:200]])
+    combined = ' | '.join([context.file_title, context.manual_code, section_heading, heading, chunk_text[:200]])
+    probe = f'{combined.lower()} {context.boundary}'
 
-    doc_family = _detect_doc_family(f'{combined} {full_text[:1000]}', manual_code)
+    doc_family = _first_rule(DOC_FAMILY_RULES, context.doc_family_hits, probe) or 'PDI'
     authority_level = _authority_from_doc_family(doc_family)
     jurisdiction = _detect_jurisdiction(doc_family)
-    instrument = _detect_instrument(f'{combined} {full_text[:1000]}', doc_family)
+    instrument = _first_rule(INSTRUMENT_RULES, context.instrument_hits, probe) or INSTRUMENT_DEFAULTS.get(doc_family, 'WORK')
 
-    effective_date = _extract_effective_date_from_text(full_text)
+    effective_date = context.effective_date
     section_id = _extract_section_id(chunk_text)
     program_stream = _detect_program_stream(combined)
     noc_code = _extract_noc_code(chunk_text)
@@ -251,3 +306,21 @@ def build_canonical_metadata(
         out['table_type'] = table_type
 
     return out
+
+
+def build_canonical_metadata(
+    *,
+    file_title: str,
+    manual_code: str,
+    section_heading: str,
+    heading_path: list[str] | None,
+    chunk_text: str,
+    full_text: str,
+) -> dict[str, Any]:
+    context = _cached_document_context(file_title, manual_code, full_text)
+    return build_chunk_metadata(
+        context,
+        section_heading=section_heading,
+        heading_path=heading_path,
+        chunk_text=chunk_text,
+    )
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
 from typing import Any
+import multiprocessing
 import re
 
 
@@ -8,12 +11,25 @@ TOC_DOT_LEADER_RE = re.compile(r'^(?P<body>.*?)(?:\.{3,}\s*|\s{2,})(?P<page>\d{1
 DOTS_ONLY_RE = re.compile(r'^\.*\s*$')
 MULTI_DOT_RE = re.compile(r'\.{3,}')
 DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+DIGITS_RE = re.compile(r'\d+')
+WHITESPACE_RE = re.compile(r'\s+')
+HYPHEN_BREAK_RE = re.compile(r'(\w)-\n(\w)')
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+MULTI_SPACE_RE = re.compile(r' {2,}')
+HAS_LETTER_RE = re.compile(r'[A-Za-z]')
+
+# Documents with at least this many pages are normalized in worker processes
+# when normalize_document() is given workers > 1.
+PARALLEL_MIN_PAGES = 200
+
+# Canonical forms of a page's top and bottom non-empty lines as (line index, canonical).
+PageEdges = tuple[list[tuple[int, str]], list[tuple[int, str]]]
 
 
 def _canonical_line(line: str) -> str:
     text = line.strip().lower()
-    text = re.sub(r'\d+', '#', text)
-    text = re.sub(r'\s+', ' ', text)
+    text = DIGITS_RE.sub('#', text)
+    text = WHITESPACE_RE.sub(' ', text)
     return text
 
 
@@ -26,99 +42,173 @@ def _top_bottom_nonempty(lines: list[str], window: int = 4) -> tuple[list[tuple[
     return top, bottom
 
 
-def _collect_repeated_patterns(pages: list[dict[str, Any]], ratio: float = 0.55) -> tuple[set[str], set[str]]:
+def _page_edges(lines: list[str], window: int = 4) -> PageEdges:
+    top, bottom = _top_bottom_nonempty(lines, window=window)
+    canonical: dict[int, str] = {}
+    for idx, ln in top + bottom:
+        if idx not in canonical:
+            canonical[idx] = _canonical_line(ln)
+    return (
+        [(idx, canonical[idx]) for idx, _ln in top],
+        [(idx, canonical[idx]) for idx, _ln in bottom],
+    )
+
+
+def _count_repeated(edges: list[PageEdges], page_count: int, ratio: float = 0.55) -> tuple[set[str], set[str]]:
     header_counter = Counter()
     footer_counter = Counter()
 
-    for p in pages:
-        lines = p.get('text', '').splitlines()
-        top, bottom = _top_bottom_nonempty(lines, window=4)
-
-        for _idx, ln in top:
-            header_counter[_canonical_line(ln)] += 1
-        for _idx, ln in bottom:
-            footer_counter[_canonical_line(ln)] += 1
+    for top, bottom in edges:
+        for _idx, canonical in top:
+            header_counter[canonical] += 1
+        for _idx, canonical in bottom:
+            footer_counter[canonical] += 1
 
-    threshold = max(3, int(len(pages) * ratio))
+    threshold = max(3, int(page_count * ratio))
     repeated_headers = {k for k, v in header_counter.items() if v >= threshold}
     repeated_footers = {k for k, v in footer_counter.items() if v >= threshold}
     return repeated_headers, repeated_footers
 
 
+def _collect_repeated_patterns(pages: list[dict[str, Any]], ratio: float = 0.55) -> tuple[set[str], set[str]]:
+    edges = [_page_edges(p.get('text', '').splitlines()) for p in pages]
+    return _count_repeated(edges, len(pages), ratio)
+
+
 def _clean_toc_line(line: str) -> str:
     stripped = line.strip()
     if not stripped:
         return ''
-    if DOTS_ONLY_RE.match(stripped):
+    # The regexes below only apply to lines starting with a dot, ending in a page
+    # number or containing a dot run; most body lines skip them entirely.
+    if stripped[0] == '.' and DOTS_ONLY_RE.match(stripped):
         return ''
 
     # Remove dotted leaders and trailing page number in TOC-like entries.
-    match = TOC_DOT_LEADER_RE.match(stripped)
-    if match and re.search(r'[A-Za-z]', match.group('body') or ''):
-        return match.group('body').rstrip()
+    if stripped[-1].isdigit():
+        match = TOC_DOT_LEADER_RE.match(stripped)
+        if match and HAS_LETTER_RE.search(match.group('body') or ''):
+            return match.group('body').rstrip()
 
     # Fallback: collapse long dot runs to a single separator token.
+    if '...' not in stripped:
+        return stripped
     return MULTI_DOT_RE.sub(' ', stripped).strip()
 
 
-def _remove_repeated_artifacts(text: str, repeated_headers: set[str], repeated_footers: set[str]) -> str:
+def _remove_repeated_artifacts(
+    text: str,
+    repeated_headers: set[str],
+    repeated_footers: set[str],
+    edges: PageEdges | None = None,
+) -> str:
     lines = text.splitlines()
     if not lines:
         return text
 
-    top, bottom = _top_bottom_nonempty(lines, window=4)
-    drop_idxs = set()
-
-    for idx, ln in top:
-        canonical = _canonical_line(ln)
-        if canonical in repeated_headers:
-            drop_idxs.add(idx)
-    for idx, ln in bottom:
-        canonical = _canonical_line(ln)
-        if canonical in repeated_footers:
-            drop_idxs.add(idx)
+    top, bottom = edges if edges is not None else _page_edges(lines)
+    drop_idxs = {idx for idx, canonical in top if canonical in repeated_headers}
+    drop_idxs.update(idx for idx, canonical in bottom if canonical in repeated_footers)
 
     kept = []
     for idx, ln in enumerate(lines):
         if idx in drop_idxs:
             continue
         cleaned = _clean_toc_line(ln)
+        # Isolated date/footer lines commonly remain after header removal.
+        if cleaned and DATE_RE.match(cleaned):
+            continue
         if cleaned or ln.strip() == '':
             kept.append(cleaned)
 
     out = '\n'.join(kept)
-
-    # Remove isolated date/footer lines that commonly remain.
-    out_lines = []
-    for ln in out.splitlines():
-        if DATE_RE.match(ln.strip()):
-            continue
-        out_lines.append(ln)
-    out = '\n'.join(out_lines)
-
-    out = re.sub(r'(\w)-\n(\w)', r'\1\2', out)
-    out = re.sub(r'\n{3,}', '\n\n', out)
-    out = re.sub(r' {2,}', ' ', out)
+    out = HYPHEN_BREAK_RE.sub(r'\1\2', out)
+    out = BLANK_LINES_RE.sub('\n\n', out)
+    out = MULTI_SPACE_RE.sub(' ', out)
     return out.strip()
 
 
-def normalize_document(extracted: dict[str, Any]) -> dict[str, Any]:
+def _edges_for_texts(texts: list[str]) -> list[PageEdges]:
+    return [_page_edges(text.splitlines()) for text in texts]
+
+
+def _clean_texts(
+    texts: list[str],
+    edges: list[PageEdges],
+    repeated_headers: set[str],
+    repeated_footers: set[str],
+) -> list[str]:
+    return [
+        _remove_repeated_artifacts(text, repeated_headers, repeated_footers, page_edges)
+        for text, page_edges in zip(texts, edges)
+    ]
+
+
+def _split_even(items: list, parts: int) -> list[list]:
+    size = max(1, -(-len(items) // parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def normalize_pool(workers: int) -> ProcessPoolExecutor | None:
+    """
+    Worker pool to pass to every normalize_document() call of a run, or None
+    when workers <= 1. Workers are spawned rather than forked, since ingest
+    normalizes from a stage thread while other stages are running.
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _normalize_texts(texts: list[str], workers: int, pool: Executor | None = None) -> tuple[list[str], set[str], set[str]]:
+    if workers <= 1 or len(texts) < PARALLEL_MIN_PAGES:
+        edges = _edges_for_texts(texts)
+        repeated_headers, repeated_footers = _count_repeated(edges, len(texts))
+        return _clean_texts(texts, edges, repeated_headers, repeated_footers), repeated_headers, repeated_footers
+
+    # Pattern counting needs every page, so it stays a barrier between the two
+    # passes; canonical forms computed in the first pass are shipped to the second.
+    text_parts = _split_even(texts, workers * 4)
+    with nullcontext(pool) if pool is not None else normalize_pool(workers) as executor:
+        edge_parts = list(executor.map(_edges_for_texts, text_parts))
+        edges = [e for part in edge_parts for e in part]
+        repeated_headers, repeated_footers = _count_repeated(edges, len(texts))
+        cleaned_parts = executor.map(
+            _clean_texts,
+            text_parts,
+            edge_parts,
+            [repeated_headers] * len(text_parts),
+            [repeated_footers] * len(text_parts),
+        )
+        cleaned = [txt for part in cleaned_parts for txt in part]
+    return cleaned, repeated_headers, repeated_footers
+
+
+def normalize_document(extracted: dict[str, Any], workers: int = 1, pool: Executor | None = None) -> dict[str, Any]:
+    """`pool` (see normalize_pool) is used instead of starting one for this document."""
     pages = extracted.get('pages', [])
-    repeated_headers, repeated_footers = _collect_repeated_patterns(pages)
+    cleaned, repeated_headers, repeated_footers = _normalize_texts(
+        [p.get('text', '') for p in pages],
+        workers,
+        pool,
+    )
 
     norm_pages = []
     all_text_parts = []
-    for p in pages:
-        txt = _remove_repeated_artifacts(p.get('text', ''), repeated_headers, repeated_footers)
+    offset = 0
+    for p, txt in zip(pages, cleaned):
         rec = {
             'page_number': p.get('page_number'),
             'text': txt,
             'char_count': len(txt),
+            # Offset of this page's text within full_text (pages are joined by a blank line).
+            'char_start': offset,
             'figures': p.get('figures', []),
         }
         norm_pages.append(rec)
         if txt:
             all_text_parts.append(txt)
+            offset += len(txt) + 2
 
     full_text = '\n\n'.join(all_text_parts).strip()
     return {
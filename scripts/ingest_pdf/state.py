@@ -1,29 +1,102 @@
 #!/usr/bin/env python3
-import json
+"""
+PDF ingest state: `{'files': {...}, 'runs': [...]}` kept as a JSON snapshot plus
+an append-only journal (see ingest_common/journal.py). The snapshot keeps the
+layout the state file always had, so an existing state JSON is picked up as-is.
+"""
+import sys
 from pathlib import Path
 from typing import Any
 
+COMMON_DIR = Path(__file__).resolve().parents[1] / 'ingest_common'
+if str(COMMON_DIR) not in sys.path:
+    sys.path.append(str(COMMON_DIR))
+
+from journal import COMPACT_EVERY, JournaledState, journal_path, load_journaled, write_snapshot
+from merkle import ChecksumTree
+
+SECTIONS = {'files': dict, 'runs': list}
+# Outcomes that leave the namespace as the last sync left it.
+NAMESPACE_UNCHANGED_STATUSES = ('dry_run', 'failed')
+
 
 def load_state(path: str) -> dict[str, Any]:
-    p = Path(path)
-    if not p.exists():
-        return {'files': {}, 'runs': []}
-    try:
-        return json.loads(p.read_text(encoding='utf-8'))
-    except Exception:
-        return {'files': {}, 'runs': []}
+    return load_journaled(path, SECTIONS)
 
 
 def save_state(path: str, state: dict[str, Any]) -> None:
-    p = Path(path)
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding='utf-8')
+    write_snapshot(path, state)
+    journal = journal_path(path)
+    if journal.exists():
+        journal.unlink()
 
 
-def mark_file(state: dict[str, Any], rel_path: str, content_hash: str, status: str, chunks: int, error: str | None = None) -> None:
-    state.setdefault('files', {})[rel_path] = {
+def _file_record(
+    content_hash: str,
+    status: str,
+    chunks: int,
+    error: str | None,
+    namespace: str | None = None,
+    chunk_hashes: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    record = {
         'content_hash': content_hash,
         'status': status,
         'chunks': chunks,
         'error': error,
     }
+    if chunk_hashes is not None:
+        # What this run left in `namespace`, used by `--sync tracked` next time.
+        record['namespace'] = namespace
+        record['chunk_hashes'] = chunk_hashes
+    return record
+
+
+def tracked_chunk_hashes(record: dict[str, Any] | None, namespace: str) -> dict[str, str] | None:
+    """The chunk ids/hashes a file record says are in `namespace`, or None if unknown."""
+    if not record or record.get('namespace') != namespace or record.get('chunk_hashes') is None:
+        return None
+    return record['chunk_hashes']
+
+
+def checksum_tree(files: dict[str, Any], namespace: str) -> ChecksumTree:
+    """Checksum tree over the chunks the state records as synced into `namespace`."""
+    tree = ChecksumTree(namespace)
+    for record in files.values():
+        for chunk_id, chunk_hash in (tracked_chunk_hashes(record, namespace) or {}).items():
+            tree.add(chunk_id, chunk_hash)
+    return tree
+
+
+def mark_file(state: dict[str, Any], rel_path: str, content_hash: str, status: str, chunks: int, error: str | None = None) -> None:
+    state.setdefault('files', {})[rel_path] = _file_record(content_hash, status, chunks, error)
+
+
+class StateStore(JournaledState):
+    """Journaled ingest state: one fsynced line per file update or run summary."""
+
+    def __init__(self, path: str, compact_every: int = COMPACT_EVERY) -> None:
+        super().__init__(path, SECTIONS, compact_every=compact_every)
+
+    @property
+    def files(self) -> dict[str, Any]:
+        return self.state['files']
+
+    def mark_file(
+        self,
+        rel_path: str,
+        content_hash: str,
+        status: str,
+        chunks: int,
+        error: str | None = None,
+        namespace: str | None = None,
+        chunk_hashes: dict[str, str] | None = None,
+    ) -> None:
+        if chunk_hashes is None and status in NAMESPACE_UNCHANGED_STATUSES:
+            # Keep what the last sync wrote, for the next tracked sync and the checksum tree.
+            previous = self.files.get(rel_path) or {}
+            namespace, chunk_hashes = previous.get('namespace'), previous.get('chunk_hashes')
+        self.set('files', rel_path, _file_record(content_hash, status, chunks, error, namespace, chunk_hashes))
+
+    def add_run(self, run_summary: dict[str, Any]) -> None:
+        self.append('runs', run_summary)
@@ -49,6 +49,31 @@ def _apply_heading_stack(stack: list[str], level: int, heading: str) -> list[str
     return truncated
 
 
+def _paragraphs_with_offsets(page_text: str, page_start: int | None) -> list[tuple[str, int | None]]:
+    """Split a page into paragraphs, keeping each paragraph's offset in full_text."""
+    out = []
+    pos = 0
+    for raw in page_text.split('\n\n'):
+        part = raw.strip()
+        if part:
+            lead = len(raw) - len(raw.lstrip())
+            out.append((part, page_start + pos + lead if page_start is not None else None))
+        pos += len(raw) + 2
+    return out
+
+
+def _section_spans(parts: list[str], offsets: list[int | None]) -> list[list[int]] | None:
+    """Map each paragraph's offset in the joined section text to its offset in full_text."""
+    if any(o is None for o in offsets):
+        return None
+    spans = []
+    section_offset = 0
+    for part, full_offset in zip(parts, offsets):
+        spans.append([section_offset, full_offset])
+        section_offset += len(part) + 2
+    return spans
+
+
 def build_sections(normalized: dict[str, Any]) -> list[dict[str, Any]]:
     """
     Section detection with heading hierarchy.
@@ -66,29 +91,34 @@ def build_sections(normalized: dict[str, Any]) -> list[dict[str, Any]]:
         'page_start': pages[0]['page_number'],
         'page_end': pages[0]['page_number'],
         'text_parts': [],
+        'offsets': [],
     }
 
     def flush_current():
         text = '\n\n'.join(current['text_parts']).strip()
         if not text:
             return
-        sections.append({
+        section = {
             'heading': current['heading'],
             'heading_path': current['heading_path'],
             'page_start': current['page_start'],
             'page_end': current['page_end'],
             'text': text,
-        })
+        }
+        spans = _section_spans(current['text_parts'], current['offsets'])
+        if spans:
+            section['spans'] = spans
+        sections.append(section)
 
     for p in pages:
         page_number = p.get('page_number', 1)
         page_text = p.get('text', '')
-        paragraphs = [part.strip() for part in page_text.split('\n\n') if part.strip()]
+        paragraphs = _paragraphs_with_offsets(page_text, p.get('char_start'))
 
         if not paragraphs:
             continue
 
-        for para in paragraphs:
+        for para, offset in paragraphs:
             first_line = para.splitlines()[0].strip()
             heading = _parse_heading(first_line)
             if heading:
@@ -101,9 +131,11 @@ def build_sections(normalized: dict[str, Any]) -> list[dict[str, Any]]:
                     'page_start': page_number,
                     'page_end': page_number,
                     'text_parts': [para],
+                    'offsets': [offset],
                 }
             else:
                 current['text_parts'].append(para)
+                current['offsets'].append(offset)
                 current['page_end'] = page_number
 
     flush_current()
@@ -115,6 +147,7 @@ def build_sections(normalized: dict[str, Any]) -> list[dict[str, Any]]:
             'page_start': pages[0].get('page_number', 1),
             'page_end': pages[-1].get('page_number', 1),
             'text': normalized.get('full_text', ''),
+            'spans': [[0, 0]],
         }]
 
     return sections
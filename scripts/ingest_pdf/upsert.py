@@ -1,13 +1,26 @@
 #!/usr/bin/env python3
-import json
+import sys
+from pathlib import Path
 from typing import Any
 
 from pinecone import Pinecone
 
+COMMON_DIR = Path(__file__).resolve().parents[1] / 'ingest_common'
+if str(COMMON_DIR) not in sys.path:
+    sys.path.append(str(COMMON_DIR))
+
+from batching import DEFAULT_MAX_BATCH_BYTES, pack_batches, send_batches
+
 
 def init_index() -> Any:
     import os
 
+    from memory_index import memory_index_from_env
+
+    memory_index = memory_index_from_env()
+    if memory_index is not None:
+        return memory_index
+
     api_key = os.getenv('PINECONE_API_KEY')
     if not api_key:
         raise RuntimeError('PINECONE_API_KEY not set')
@@ -57,24 +70,13 @@ def filter_existing_vectors(index: Any, namespace: str, vectors: list[dict], fet
     return [v for v in vectors if v.get('id') not in existing_ids]
 
 
-def _calculate_batch_size(vectors: list[dict], max_bytes: int = 1800000) -> int:
-    if not vectors:
-        return 0
-    total_size = sum(len(json.dumps(v)) for v in vectors)
-    avg_size = total_size / len(vectors)
-    return max(1, int(max_bytes / avg_size))
-
-
-def upsert_batches(index: Any, namespace: str, vectors: list[dict], target_batch_size: int = 100) -> int:
-    total_upserted = 0
-    i = 0
-    while i < len(vectors):
-        remaining = vectors[i:]
-        batch_size = min(target_batch_size, len(remaining))
-        byte_limited = _calculate_batch_size(remaining[:batch_size])
-        take = min(batch_size, byte_limited)
-        batch = remaining[:take]
-        index.upsert(vectors=batch, namespace=namespace)
-        total_upserted += len(batch)
-        i += take
-    return total_upserted
+def upsert_batches(
+    index: Any,
+    namespace: str,
+    vectors: list[dict],
+    target_batch_size: int = 100,
+    max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_workers: int = 1,
+) -> int:
+    batches = pack_batches(vectors, max_count=target_batch_size, max_bytes=max_bytes)
+    return send_batches(index, namespace, batches, max_workers=max_workers)
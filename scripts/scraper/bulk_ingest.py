@@ -2,37 +2,40 @@
 """
 Bulk ingestion script for scraping multiple Canada.ca pages.
 Uses Jina AI Reader API with content selection for clean markdown extraction.
+Requests are paced by a token bucket sized to the Jina quota (JINA_RPM) and
+shared by a small worker pool.
 """
 
 import os
-import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
-from scrape import scrape_canada_ca, extract_filename_from_url
+from scrape import JINA_RPM, TokenBucket, scrape_canada_ca, extract_filename_from_url
 
 # Configuration
 DATA_DIR = "data"
-RATE_LIMIT_DELAY = 2  # Seconds between requests (Jina free tier rate limit)
+WORKERS = 4  # Concurrent Jina requests; the token bucket sets the actual rate
+RETRY_ROUNDS = 2  # Passes over the retry queue after the first pass
 
-def ensure_data_dir():
-    """Ensure the data directory exists."""
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+def ensure_data_dir(output_dir: str = DATA_DIR):
+    """Ensure the output directory exists."""
+    os.makedirs(output_dir, exist_ok=True)
 
-def scrape_single_page(url: str, output_dir: str = DATA_DIR) -> bool:
+def scrape_single_page(url: str, output_dir: str = DATA_DIR, limiter: Optional[TokenBucket] = None) -> bool:
     """
     Scrape a single page and save to file.
     
     Args:
         url: The URL to scrape
         output_dir: Directory to save the file
+        limiter: Token bucket every Jina request (retries included) takes a token from
     
     Returns:
         True if successful, False otherwise
     """
     print(f"Scraping: {url}")
     
-    content = scrape_canada_ca(url)
+    content = scrape_canada_ca(url, throttle=limiter)
     
     if content:
         filename = extract_filename_from_url(url)
@@ -47,38 +50,58 @@ def scrape_single_page(url: str, output_dir: str = DATA_DIR) -> bool:
         print(f"  ✗ Failed to scrape")
         return False
 
-def bulk_scrape(urls: List[str], output_dir: str = DATA_DIR, delay: float = RATE_LIMIT_DELAY):
+def bulk_scrape(
+    urls: List[str],
+    output_dir: str = DATA_DIR,
+    rpm: float = JINA_RPM,
+    workers: int = WORKERS,
+    retry_rounds: int = RETRY_ROUNDS,
+):
     """
-    Scrape multiple URLs with rate limiting.
+    Scrape multiple URLs on a worker pool, rate limited by a token bucket.
+    
+    URLs whose output file already exists are skipped. URLs that fail go to a
+    retry queue that is worked through again after the pass (up to
+    `retry_rounds` times); only those still failing are reported.
     
     Args:
         urls: List of URLs to scrape
         output_dir: Directory to save files
-        delay: Seconds to wait between requests
+        rpm: Jina requests per minute to stay within
+        workers: Number of concurrent workers
+        retry_rounds: Passes over the retry queue
     """
-    ensure_data_dir()
+    ensure_data_dir(output_dir)
+    limiter = TokenBucket.per_minute(rpm)
     
     print(f"\nStarting bulk scrape of {len(urls)} URLs")
     print(f"Output directory: {output_dir}")
-    print(f"Rate limit delay: {delay}s")
+    print(f"Rate limit: {rpm:g} requests/minute, {workers} workers")
     print("="*80)
     
-    success_count = 0
-    fail_count = 0
-    failed_urls = []
-    
-    for i, url in enumerate(urls, 1):
-        print(f"\n[{i}/{len(urls)}]", end=" ")
-        
-        if scrape_single_page(url, output_dir):
-            success_count += 1
+    pending = []
+    skipped_count = 0
+    for url in dict.fromkeys(urls):
+        if os.path.exists(os.path.join(output_dir, extract_filename_from_url(url))):
+            skipped_count += 1
         else:
-            fail_count += 1
-            failed_urls.append(url)
-        
-        # Rate limiting - sleep between requests (except for the last one)
-        if i < len(urls):
-            time.sleep(delay)
+            pending.append(url)
+    if skipped_count:
+        print(f"Skipping {skipped_count} URLs already saved")
+    
+    success_count = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for round_number in range(max(0, retry_rounds) + 1):
+            if not pending:
+                break
+            if round_number:
+                print(f"\nRetry round {round_number}: {len(pending)} URLs")
+            results = list(pool.map(lambda url: scrape_single_page(url, output_dir, limiter), pending))
+            retry_queue = [url for url, ok in zip(pending, results) if not ok]
+            success_count += len(pending) - len(retry_queue)
+            pending = retry_queue
+    failed_urls = pending
+    fail_count = len(failed_urls)
     
     # Summary
     print("\n" + "="*80)
@@ -86,6 +109,7 @@ def bulk_scrape(urls: List[str], output_dir: str = DATA_DIR, delay: float = RATE
     print("="*80)
     print(f"Total URLs: {len(urls)}")
     print(f"Successful: {success_count}")
+    print(f"Skipped (already saved): {skipped_count}")
     print(f"Failed: {fail_count}")
     
     if failed_urls:
@@ -118,7 +142,7 @@ def scrape_from_hub(hub_url: str, link_pattern: Optional[str] = None):
         return
     
     # Save links for reference
-    ensure_data_dir()
+    ensure_data_dir(DATA_DIR)
     links_path = os.path.join(DATA_DIR, "extracted_links.json")
     with open(links_path, "w") as f:
         json.dump(links, f, indent=2)
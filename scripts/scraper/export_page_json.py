@@ -11,11 +11,14 @@ from typing import Any
 
 import frontmatter
 
-from url_utils import build_source_id, canonicalize_url
+from url_policy import UrlPolicy
+from url_utils import build_source_id
 
 
 HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
 LINK_RE = re.compile(r"\[[^\]]+\]\((https?://[^)\s]+)\)", re.IGNORECASE)
+# Pages repeat the same navigation links; canonicalize each distinct one once.
+URL_POLICY = UrlPolicy()
 
 
 def iso_now() -> str:
@@ -97,7 +100,7 @@ def parse_links(markdown_text: str) -> list[str]:
     links = []
     seen = set()
     for url in LINK_RE.findall(markdown_text):
-        canonical = canonicalize_url(url) or url
+        canonical = URL_POLICY.canonicalize(url) or url
         if canonical in seen:
             continue
         seen.add(canonical)
@@ -130,7 +133,7 @@ def build_page_json(md_path: Path, repo_root: Path) -> dict[str, Any]:
 
     source_url_raw = metadata.get("url") or metadata.get("fetched_url") or ""
     source_url = str(source_url_raw).strip()
-    canonical_url = canonicalize_url(source_url) or source_url
+    canonical_url = URL_POLICY.canonicalize(source_url) or source_url
     source_id = build_source_id(canonical_url if canonical_url else str(md_path))
     title = str(metadata.get("title") or md_path.stem).strip()
     language = infer_language(canonical_url)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed crawl frontier for scrape.py.
+
+Holds what `_crawl_state.json`, `manifest.json` and `failed_urls.json` used to
+be rewritten in full for: the visited set, the FIFO queue (with depth and
+parent), failures, manifest records (append-only, indexed by URL), the
+conditional-GET validators per URL, the near-duplicate fingerprints of
+saved pages and the index of raw responses kept in the response cache (see
+response_cache.py). Every change is a single-row statement, so
+committing a page costs O(1) however large the crawl is; `checkpoint` commits
+the open transaction, which SQLite applies atomically, so a crawl killed
+mid-run resumes from its last checkpoint rather than from a half-written file.
+
+`export_json` writes the three JSON files in their existing layout; the
+crawler does so once at the end of a run. Run this module on an output
+directory to export by hand:
+
+    python frontier.py ircc_data_clean
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+FRONTIER_FILE = "_crawl_frontier.sqlite"
+STATE_FILE = "_crawl_state.json"
+MANIFEST_FILE = "manifest.json"
+FAILED_FILE = "failed_urls.json"
+STATE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS queue (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    depth INTEGER NOT NULL,
+    parent_url TEXT
+);
+CREATE TABLE IF NOT EXISTS failures (seq INTEGER PRIMARY KEY AUTOINCREMENT, record TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pages (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, record TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url);
+CREATE TABLE IF NOT EXISTS validators (url TEXT PRIMARY KEY, entry TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS fingerprints (url TEXT PRIMARY KEY, simhash TEXT NOT NULL, file TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS responses (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_url ON responses (url, fetched_at);
+"""
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def write_json(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as handle:
+        handle.write(json.dumps(payload, indent=2, ensure_ascii=False))
+        handle.flush()
+        os.fsync(handle.fileno())
+    tmp.replace(path)
+
+
+def load_json(path: Path, default: Any) -> Any:
+    if not path.exists():
+        return default
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return default
+
+
+class CrawlFrontier:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    # --- meta ---
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value: Any) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    @property
+    def is_new(self) -> bool:
+        return self.get_meta("created_at") is None
+
+    def start(self, manifest_header: dict[str, Any], resume: bool) -> None:
+        """
+        Begin a run. Without `resume` the visited set, queue and failures are
+        cleared; manifest records and validators always carry over.
+        """
+        if not resume:
+            self.conn.execute("DELETE FROM visited")
+            self.conn.execute("DELETE FROM queue")
+            self.conn.execute("DELETE FROM failures")
+            self.set_meta("created_at", utc_now_iso())
+        elif self.is_new:
+            self.set_meta("created_at", utc_now_iso())
+        if self.get_meta("manifest") is None:
+            self.set_meta("manifest", manifest_header)
+        self.checkpoint()
+
+    # --- reads ---
+
+    def visited(self) -> set[str]:
+        return {row[0] for row in self.conn.execute("SELECT url FROM visited")}
+
+    def queue(self) -> list[dict[str, Any]]:
+        rows = self.conn.execute("SELECT url, depth, parent_url FROM queue ORDER BY seq")
+        return [{"url": url, "depth": depth, "parent_url": parent_url} for url, depth, parent_url in rows]
+
+    def failures(self) -> list[dict[str, Any]]:
+        return [json.loads(row[0]) for row in self.conn.execute("SELECT record FROM failures ORDER BY seq")]
+
+    def pages(self) -> Iterator[dict[str, Any]]:
+        for row in self.conn.execute("SELECT record FROM pages ORDER BY seq"):
+            yield json.loads(row[0])
+
+    def pages_for(self, url: str) -> list[dict[str, Any]]:
+        rows = self.conn.execute("SELECT record FROM pages WHERE url = ? ORDER BY seq", (url,))
+        return [json.loads(row[0]) for row in rows]
+
+    def validators(self) -> dict[str, dict[str, Any]]:
+        return {url: json.loads(entry) for url, entry in self.conn.execute("SELECT url, entry FROM validators")}
+
+    def fingerprints(self) -> dict[str, tuple[int, str]]:
+        """`{url: (simhash, file)}` for pages in the near-duplicate index."""
+        rows = self.conn.execute("SELECT url, simhash, file FROM fingerprints")
+        return {url: (int(value, 16), file) for url, value, file in rows}
+
+    def latest_responses(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """`{url: {kind: entry}}` for each URL's most recent fetch that stored a response."""
+        latest: dict[str, dict[str, dict[str, Any]]] = {}
+        fetched: dict[str, str] = {}
+        for url, fetched_at, kind, entry in self.conn.execute(
+            "SELECT url, fetched_at, kind, entry FROM responses ORDER BY seq"
+        ):
+            if fetched.get(url) != fetched_at:
+                fetched[url] = fetched_at
+                latest[url] = {}
+            latest[url][kind] = json.loads(entry)
+        return latest
+
+    # --- incremental writes (committed by the next checkpoint) ---
+
+    def mark_visited(self, url: str) -> None:
+        self.conn.execute("INSERT OR IGNORE INTO visited (url) VALUES (?)", (url,))
+
+    def enqueue(self, item: dict[str, Any]) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO queue (url, depth, parent_url) VALUES (?, ?, ?)",
+            (item["url"], int(item.get("depth", 0)), item.get("parent_url")),
+        )
+
+    def dequeue(self, url: str) -> None:
+        self.conn.execute("DELETE FROM queue WHERE url = ?", (url,))
+
+    def add_failure(self, record: dict[str, Any]) -> None:
+        self.conn.execute("INSERT INTO failures (record) VALUES (?)", (json.dumps(record, ensure_ascii=False),))
+
+    def add_page(self, record: dict[str, Any]) -> None:
+        self.conn.execute(
+            "INSERT INTO pages (url, record) VALUES (?, ?)",
+            (record.get("url"), json.dumps(record, ensure_ascii=False)),
+        )
+
+    def set_validators(self, url: str, entry: dict[str, Any] | None) -> None:
+        if entry is None:
+            self.conn.execute("DELETE FROM validators WHERE url = ?", (url,))
+        else:
+            self.conn.execute("INSERT OR REPLACE INTO validators (url, entry) VALUES (?, ?)", (url, json.dumps(entry)))
+
+    def set_fingerprint(self, url: str, simhash: int | None, file: str | None = None) -> None:
+        if simhash is None:
+            self.conn.execute("DELETE FROM fingerprints WHERE url = ?", (url,))
+        else:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (url, simhash, file) VALUES (?, ?, ?)",
+                (url, f"{simhash:016x}", file),
+            )
+
+    def add_response(self, url: str, entry: dict[str, Any]) -> None:
+        self.conn.execute(
+            "INSERT INTO responses (url, fetched_at, kind, entry) VALUES (?, ?, ?, ?)",
+            (url, entry["fetched_at"], entry["kind"], json.dumps(entry, ensure_ascii=False)),
+        )
+
+    def checkpoint(self) -> None:
+        self.conn.commit()
+
+    def __enter__(self) -> "CrawlFrontier":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        # Leaving with an error (including a KeyboardInterrupt) drops whatever
+        # was written since the last checkpoint, as a kill would.
+        if exc_type is None:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    # --- JSON interop ---
+
+    def import_json(self, state: dict[str, Any], manifest: dict[str, Any] | None) -> None:
+        """Adopt a crawl whose state so far lives in the JSON files."""
+        self.set_meta("created_at", state.get("created_at") or utc_now_iso())
+        self.conn.executemany("INSERT OR IGNORE INTO visited (url) VALUES (?)", ((url,) for url in state.get("visited", [])))
+        for item in state.get("queue", []):
+            if item.get("url"):
+                self.enqueue(item)
+        for record in state.get("failed", []):
+            self.add_failure(record)
+        for url, entry in (state.get("validators") or {}).items():
+            self.set_validators(url, entry)
+        if manifest:
+            self.set_meta("manifest", {key: value for key, value in manifest.items() if key != "pages"})
+            for record in manifest.get("pages", []):
+                self.add_page(record)
+        self.checkpoint()
+
+    def export_json(self, output_dir: str | Path) -> None:
+        """Write `_crawl_state.json`, `manifest.json` and `failed_urls.json` as currently recorded."""
+        output_dir = Path(output_dir)
+        now = utc_now_iso()
+        failed = self.failures()
+        write_json(
+            output_dir / STATE_FILE,
+            {
+                "version": STATE_VERSION,
+                "created_at": self.get_meta("created_at", now),
+                "updated_at": now,
+                "visited": sorted(self.visited()),
+                "queue": self.queue(),
+                "failed": failed,
+                "validators": self.validators(),
+            },
+        )
+        manifest = dict(self.get_meta("manifest", {}))
+        manifest["updated_at"] = now
+        manifest["pages"] = list(self.pages())
+        write_json(output_dir / MANIFEST_FILE, manifest)
+        write_json(output_dir / FAILED_FILE, failed)
+
+
+def open_frontier(output_dir: str | Path) -> CrawlFrontier:
+    """The frontier of `output_dir`, seeded from its JSON files on first use."""
+    output_dir = Path(output_dir)
+    frontier = CrawlFrontier(output_dir / FRONTIER_FILE)
+    legacy = (output_dir / STATE_FILE).exists() or (output_dir / MANIFEST_FILE).exists()
+    if frontier.is_new and legacy:
+        frontier.import_json(load_json(output_dir / STATE_FILE, {}), load_json(output_dir / MANIFEST_FILE, None))
+    return frontier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a crawl frontier to the crawler's JSON files.")
+    parser.add_argument("output_dir", help="Crawl output directory containing _crawl_frontier.sqlite.")
+    args = parser.parse_args()
+    output_dir = Path(args.output_dir)
+    if not (output_dir / FRONTIER_FILE).exists():
+        raise SystemExit(f"No {FRONTIER_FILE} in {output_dir}")
+    frontier = CrawlFrontier(output_dir / FRONTIER_FILE)
+    try:
+        frontier.export_json(output_dir)
+    finally:
+        frontier.close()
+    print(f"Exported {STATE_FILE}, {MANIFEST_FILE} and {FAILED_FILE} to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
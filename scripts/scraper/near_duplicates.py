@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+SimHash near-duplicate detection for crawled markdown.
+
+A page's fingerprint is the 64-bit SimHash of its word shingles
+(`SHINGLE_WORDS` consecutive lowercased words). Pages that differ only in a
+"Date modified" line, a breadcrumb or a navigation block share almost all of
+their shingles, so their fingerprints are a few bits apart. The index splits
+fingerprints into `max_distance + 1` blocks; by pigeonhole, two fingerprints
+within `max_distance` bits agree on at least one whole block, so a lookup only
+compares against pages sharing a block instead of every page crawled.
+
+Report on a crawl output directory (what was recorded and how many saved pages
+would pair up at other distances, for tuning `--near-dup-max-distance`; a crawl
+made without the index has its saved files fingerprinted from disk):
+
+    python near_duplicates.py ircc_data_clean --max-distance 3
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+from frontier import FRONTIER_FILE, MANIFEST_FILE, CrawlFrontier
+
+SIMHASH_BITS = 64
+SHINGLE_WORDS = 3
+DEFAULT_MAX_DISTANCE = 3
+DEFAULT_MIN_WORDS = 50
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set[str]:
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def simhash(features: Iterable[str]) -> int:
+    counts = [0] * SIMHASH_BITS
+    total = 0
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        total += 1
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += (value >> bit) & 1
+    fingerprint = 0
+    for bit, ones in enumerate(counts):
+        if ones * 2 > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def text_fingerprint(text: str, min_words: int = DEFAULT_MIN_WORDS) -> int | None:
+    """SimHash of `text`, or None when it is too short to fingerprint reliably."""
+    if len(WORD_RE.findall(text)) < min_words:
+        return None
+    return simhash(shingles(text))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def similarity(distance: int) -> float:
+    return round(1.0 - distance / SIMHASH_BITS, 4)
+
+
+def strip_frontmatter(text: str) -> str:
+    if text.startswith("---\n"):
+        end = text.find("\n---\n", 4)
+        if end != -1:
+            return text[end + 5:]
+    return text
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> None:
+        self.max_distance = max(0, min(int(max_distance), SIMHASH_BITS - 1))
+        blocks = self.max_distance + 1
+        width, extra = divmod(SIMHASH_BITS, blocks)
+        self._blocks: list[tuple[int, int]] = []
+        shift = 0
+        for i in range(blocks):
+            size = width + (1 if i < extra else 0)
+            self._blocks.append((shift, (1 << size) - 1))
+            shift += size
+        self._tables: list[dict[int, set[str]]] = [{} for _ in self._blocks]
+        self.entries: dict[str, tuple[int, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _keys(self, fingerprint: int) -> list[int]:
+        return [(fingerprint >> shift) & mask for shift, mask in self._blocks]
+
+    def add(self, url: str, fingerprint: int, file: str) -> None:
+        self.remove(url)
+        self.entries[url] = (fingerprint, file)
+        for table, key in zip(self._tables, self._keys(fingerprint)):
+            table.setdefault(key, set()).add(url)
+
+    def remove(self, url: str) -> None:
+        entry = self.entries.pop(url, None)
+        if entry is None:
+            return
+        for table, key in zip(self._tables, self._keys(entry[0])):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(url)
+                if not bucket:
+                    del table[key]
+
+    def neighbours(self, fingerprint: int, exclude_url: str | None = None) -> list[tuple[int, str]]:
+        """`(distance, url)` of indexed pages within `max_distance` bits, closest first."""
+        candidates: set[str] = set()
+        for table, key in zip(self._tables, self._keys(fingerprint)):
+            candidates.update(table.get(key, ()))
+        candidates.discard(exclude_url)
+        found = [(hamming(fingerprint, self.entries[url][0]), url) for url in candidates]
+        return sorted(item for item in found if item[0] <= self.max_distance)
+
+    def query(self, fingerprint: int, exclude_url: str | None = None) -> dict[str, Any] | None:
+        """Closest indexed page within `max_distance` bits (ties broken by URL), or None."""
+        found = self.neighbours(fingerprint, exclude_url)
+        if not found:
+            return None
+        distance, url = found[0]
+        return {"url": url, "file": self.entries[url][1], "distance": distance, "similarity": similarity(distance)}
+
+
+def near_duplicate_report(
+    fingerprints: dict[str, tuple[int, str]],
+    pages: Iterable[dict[str, Any]],
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+) -> dict[str, Any]:
+    """
+    Near-duplicates recorded by the crawl (latest record per URL), grouped by
+    the file they point at, and how many pairs of indexed pages are within
+    each distance up to `max_distance`.
+    """
+    latest: dict[str, dict[str, Any]] = {}
+    for page in pages:
+        if page.get("url"):
+            latest[page["url"]] = page
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for url, page in sorted(latest.items()):
+        if page.get("status") == "near_duplicate":
+            groups.setdefault(page.get("file") or "", []).append(
+                {"url": url, "near_duplicate_of": page.get("near_duplicate_of"), "distance": page.get("near_duplicate_distance")}
+            )
+
+    index = NearDuplicateIndex(max_distance)
+    pair_distances: Counter = Counter()
+    for url in sorted(fingerprints):
+        fingerprint, file = fingerprints[url]
+        for distance, _ in index.neighbours(fingerprint):
+            pair_distances[distance] += 1
+        index.add(url, fingerprint, file)
+
+    return {
+        "indexed_pages": len(fingerprints),
+        "max_distance": index.max_distance,
+        "recorded_near_duplicates": sum(len(items) for items in groups.values()),
+        "groups": [{"file": file, "duplicates": items} for file, items in sorted(groups.items())],
+        "indexed_pairs_by_distance": {str(d): pair_distances[d] for d in range(index.max_distance + 1)},
+    }
+
+
+def saved_page_fingerprints(
+    output_dir: Path,
+    pages: Iterable[dict[str, Any]],
+    min_words: int = DEFAULT_MIN_WORDS,
+) -> dict[str, tuple[int, str]]:
+    """Fingerprints of the latest saved file per URL, read from disk."""
+    saved: dict[str, str] = {}
+    for page in pages:
+        if page.get("url") and page.get("status") == "saved" and page.get("file"):
+            saved[page["url"]] = page["file"]
+    fingerprints: dict[str, tuple[int, str]] = {}
+    for url, file in saved.items():
+        path = output_dir / file
+        if path.exists():
+            fingerprint = text_fingerprint(strip_frontmatter(path.read_text(encoding="utf-8")), min_words)
+            if fingerprint is not None:
+                fingerprints[url] = (fingerprint, file)
+    return fingerprints
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Near-duplicate report for a crawl output directory.")
+    parser.add_argument("output_dir", help="Crawl output directory (_crawl_frontier.sqlite or manifest.json).")
+    parser.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE, help="Hamming distance (bits) to report pairs up to.")
+    parser.add_argument("--min-words", type=int, default=DEFAULT_MIN_WORDS, help="Minimum words for saved files fingerprinted from disk.")
+    args = parser.parse_args()
+    output_dir = Path(args.output_dir)
+    if (output_dir / FRONTIER_FILE).exists():
+        frontier = CrawlFrontier(output_dir / FRONTIER_FILE)
+        try:
+            pages = list(frontier.pages())
+            fingerprints = frontier.fingerprints()
+        finally:
+            frontier.close()
+    elif (output_dir / MANIFEST_FILE).exists():
+        pages = json.loads((output_dir / MANIFEST_FILE).read_text(encoding="utf-8")).get("pages", [])
+        fingerprints = {}
+    else:
+        raise SystemExit(f"No {FRONTIER_FILE} or {MANIFEST_FILE} in {output_dir}")
+    if not fingerprints:
+        # Crawled without --dedupe-near-duplicates: fingerprint the saved files.
+        fingerprints = saved_page_fingerprints(output_dir, pages, max(1, args.min_words))
+    print(json.dumps(near_duplicate_report(fingerprints, pages, args.max_distance), indent=2))
+
+
+if __name__ == "__main__":
+    main()
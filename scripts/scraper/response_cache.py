@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store of raw responses fetched by scrape.py.
+
+Bodies are gzip-compressed under `_response_cache/objects/<aa>/<sha256>.gz`,
+named by the SHA-256 of the uncompressed body, so a page fetched again with
+the same bytes costs no extra space. The header half of each record (requested
+canonical URL, fetch time, final URL, status, headers, encoding and body hash)
+goes into the crawl frontier's `responses` table, committed with the page it
+belongs to; together they hold what a WARC response record would.
+
+`scrape.py --reextract-from-cache` replays the latest cached fetch of every
+page through the current extractors without touching the network. Show what
+is cached:
+
+    python response_cache.py ircc_data_clean
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from frontier import FRONTIER_FILE, CrawlFrontier
+
+CACHE_DIR = "_response_cache"
+COMPRESS_LEVEL = 6
+
+
+class ResponseCache:
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects / sha256[:2] / f"{sha256}.gz"
+
+    def put_body(self, body: bytes) -> str:
+        """Store `body` once under its SHA-256 and return the hash. Safe across threads."""
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = self.object_path(sha256)
+        if path.exists():
+            return sha256
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0))
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return sha256
+
+    def store(self, kind: str, response: Any, fetched_at: str) -> dict[str, Any]:
+        """
+        Store a `requests`-style response's body and return its index entry.
+        `kind` is "html" for the page itself or "jina" for the Reader fallback.
+        """
+        body = response.content or b""
+        return {
+            "kind": kind,
+            "fetched_at": fetched_at,
+            "request_url": getattr(response.request, "url", None) if getattr(response, "request", None) else None,
+            "final_url": response.url,
+            "status_code": response.status_code,
+            "headers": {str(key): str(value) for key, value in response.headers.items()},
+            "encoding": response.encoding or getattr(response, "apparent_encoding", None) or "utf-8",
+            "sha256": self.put_body(body),
+            "size": len(body),
+        }
+
+    def read_body(self, entry: dict[str, Any]) -> bytes:
+        return gzip.decompress(self.object_path(entry["sha256"]).read_bytes())
+
+    def read_text(self, entry: dict[str, Any]) -> str:
+        return self.read_body(entry).decode(entry.get("encoding") or "utf-8", errors="replace")
+
+
+def cache_summary(cache: ResponseCache, frontier: CrawlFrontier) -> dict[str, Any]:
+    latest = frontier.latest_responses()
+    kinds: Counter = Counter()
+    hashes: set[str] = set()
+    raw_bytes = 0
+    for entries in latest.values():
+        for kind, entry in entries.items():
+            kinds[kind] += 1
+            hashes.add(entry["sha256"])
+            raw_bytes += int(entry.get("size") or 0)
+    stored = sum(path.stat().st_size for path in cache.objects.glob("*/*.gz")) if cache.objects.exists() else 0
+    return {
+        "cached_pages": len(latest),
+        "latest_responses_by_kind": dict(sorted(kinds.items())),
+        "distinct_bodies": len(hashes),
+        "latest_raw_bytes": raw_bytes,
+        "stored_compressed_bytes": stored,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize the raw-response cache of a crawl output directory.")
+    parser.add_argument("output_dir", help="Crawl output directory containing _crawl_frontier.sqlite and _response_cache/.")
+    args = parser.parse_args()
+    output_dir = Path(args.output_dir)
+    if not (output_dir / FRONTIER_FILE).exists():
+        raise SystemExit(f"No {FRONTIER_FILE} in {output_dir}")
+    frontier = CrawlFrontier(output_dir / FRONTIER_FILE)
+    try:
+        summary = cache_summary(ResponseCache(output_dir / CACHE_DIR), frontier)
+    finally:
+        frontier.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
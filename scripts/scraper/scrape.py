@@ -6,8 +6,9 @@ Features:
 - strict host/path filtering
 - canonical URL dedupe (fragments, tracking params, query ordering)
 - recursive BFS crawl with max depth/page guards
+- optional concurrent fetching with per-host politeness (concurrency cap + request spacing)
 - resilient HTTP retries with exponential backoff + jitter
-- checkpoint state for resume
+- checkpoint state for resume (SQLite frontier, exported to JSON at the end of a run)
 - manifest + failed URL logs
 - markdown files with YAML frontmatter metadata
 """
@@ -20,17 +21,24 @@ import json
 import os
 import random
 import re
+import threading
 import time
 from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 from urllib.parse import urlsplit
 
 import requests
 from bs4 import BeautifulSoup
+from requests.structures import CaseInsensitiveDict
 
-from url_utils import canonicalize_url as canonicalize_shared
+from frontier import FAILED_FILE, FRONTIER_FILE, MANIFEST_FILE, STATE_FILE, open_frontier
+from near_duplicates import DEFAULT_MAX_DISTANCE, DEFAULT_MIN_WORDS, NearDuplicateIndex, strip_frontmatter, text_fingerprint
+from response_cache import CACHE_DIR, ResponseCache
+from url_policy import UrlPolicy, canonicalize_absolute, is_ingestion_target
 
 try:
     from curl_cffi import requests as curl_requests
@@ -40,6 +48,16 @@ except Exception:
     curl_requests = None
     HAS_CURL_CFFI = False
 
+try:
+    import lxml  # noqa: F401
+
+    HAS_LXML = True
+except Exception:
+    HAS_LXML = False
+
+# Tree builder for analyze_html; the single-purpose extractors keep html.parser.
+HTML_PARSER = "lxml" if HAS_LXML else "html.parser"
+
 # --- Defaults ---
 TOC_URL = (
     "https://www.canada.ca/en/immigration-refugees-citizenship/corporate/"
@@ -53,11 +71,10 @@ ALLOW_PATH_PREFIX = (
 DEFAULT_OUTPUT_DIR = "ircc_data_clean"
 DEFAULT_INPUT_LINKS_MD = "input_links.md"
 
-STATE_FILE = "_crawl_state.json"
-MANIFEST_FILE = "manifest.json"
-FAILED_FILE = "failed_urls.json"
-
 JINA_API_KEY = os.getenv("JINA_API_KEY", "").strip()
+# Jina Reader requests per minute: 20 without a key; with one the quota depends on
+# the plan, so 200 is a conservative default. Set JINA_RPM to match your plan.
+JINA_RPM = float(os.getenv("JINA_RPM", "").strip() or (200 if JINA_API_KEY else 20))
 
 BLOCKED_CONTENT_PATTERNS = [
     r"enable javascript",
@@ -78,22 +95,6 @@ def normalize_whitespace(value: str) -> str:
     return re.sub(r"\s+", " ", str(value or "")).strip()
 
 
-def save_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
-    tmp.replace(path)
-
-
-def load_json(path: Path, default: Any) -> Any:
-    if not path.exists():
-        return default
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        return default
-
-
 def parse_retry_after_seconds(value: Optional[str]) -> Optional[float]:
     if not value:
         return None
@@ -116,8 +117,13 @@ def parse_retry_after_seconds(value: Optional[str]) -> Optional[float]:
         return None
 
 
+# Canonicalization goes through the shared LRU cache; crawls build their own
+# policy (with its allow-list) for allow decisions.
+URL_POLICY = UrlPolicy()
+
+
 def canonicalize_url(raw_url: str, base_url: Optional[str] = None) -> Optional[str]:
-    return canonicalize_shared(raw_url, base_url=base_url)
+    return URL_POLICY.canonicalize(raw_url, base_url)
 
 
 def is_valid_ingestion_target(url: str) -> bool:
@@ -127,56 +133,12 @@ def is_valid_ingestion_target(url: str) -> bool:
     2) Keep visa country list exception (visit/visas.asp)
     3) Drop generic /services/ pages except transit/without-visa
     """
-    canonical = canonicalize_url(url) or ""
-    if not canonical:
-        return False
-
-    split = urlsplit(canonical)
-    host = (split.hostname or "").lower()
-    path = (split.path or "").lower()
-    whole = canonical.lower()
-
-    # Restrict to expected canada.ca hosts
-    if host not in {"www.canada.ca", "canada.ca", "ircc.canada.ca"}:
-        return False
-
-    if "/corporate/publications-manuals/operational-bulletins-manuals/" in whole:
-        return True
-
-    if "visit/visas.asp" in whole:
-        return True
-
-    if "/services/" in whole:
-        if "transit/without-visa" in whole:
-            return True
-        return False
-
-    # Everything else is excluded by default.
-    return False
+    return is_ingestion_target(canonicalize_url(url) or "")
 
 
 def url_is_allowed(url: str, allow_domains: Set[str], allow_path_prefixes: Sequence[str]) -> bool:
-    try:
-        split = urlsplit(url)
-    except Exception:
-        return False
-
-    host = (split.hostname or "").lower()
-    if allow_domains and host not in allow_domains:
-        return False
-
-    if split.path.lower().endswith(".pdf"):
-        return False
-
-    # Primary policy gate.
-    if is_valid_ingestion_target(url):
-        return True
-
-    # Optional additional allow prefixes (for custom runs).
-    if allow_path_prefixes and any(split.path.startswith(prefix) for prefix in allow_path_prefixes):
-        return True
-
-    return False
+    """One-off check; crawls keep a `UrlPolicy` so decisions are compiled and cached once."""
+    return UrlPolicy(allow_domains, allow_path_prefixes, memoize=False).is_allowed(url)
 
 
 def parse_urls_from_markdown(text: str) -> List[str]:
@@ -228,6 +190,76 @@ def make_session() -> requests.Session:
     return session
 
 
+class HostThrottle:
+    """
+    Per-host politeness shared by crawl workers: at most `per_host` requests in
+    flight to one host and at least `min_interval` seconds between the starts of
+    consecutive requests to it. A start is claimed under the lock only once it
+    is due, so waiting workers are released one interval apart rather than all
+    at once, and one that wakes late pushes the next start back with it.
+    """
+
+    def __init__(self, per_host: int = 1, min_interval: float = 0.0) -> None:
+        self.per_host = max(1, int(per_host))
+        self.min_interval = max(0.0, float(min_interval))
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = (urlsplit(url).hostname or "").lower()
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    start = self._next_start.get(host, now)
+                    if start <= now:
+                        self._next_start[host] = now + self.min_interval
+                        break
+                time.sleep(start - now)
+            yield
+
+
+class TokenBucket:
+    """
+    Request-rate limiter shared by worker threads: `rate` tokens per second
+    accrue up to `capacity`, and every request start takes one. Tokens are
+    reserved under the lock (the count may go negative), so waiting workers
+    start one token interval apart. `slot` matches `HostThrottle.slot`, so a
+    bucket can be passed wherever a request takes a `throttle`, and retries
+    spend tokens like first attempts.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = max(1e-6, float(rate))
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: float = 1.0) -> "TokenBucket":
+        return cls(rate=requests_per_minute / 60.0, capacity=burst)
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        self.acquire()
+        yield
+
+
 def request_with_backoff(
     session: requests.Session,
     method: str,
@@ -238,23 +270,33 @@ def request_with_backoff(
     retries: int = 3,
     backoff_base: float = 1.5,
     retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+    throttle: Optional[HostThrottle] = None,
 ) -> Any:
     last_exc: Optional[Exception] = None
     retry_statuses = set(retry_statuses)
 
     for attempt in range(retries + 1):
         try:
-            if HAS_CURL_CFFI and curl_requests is not None:
-                try:
-                    response = curl_requests.request(
-                        method=method.upper(),
-                        url=url,
-                        headers=headers,
-                        timeout=timeout,
-                        allow_redirects=True,
-                        impersonate="chrome",
-                    )
-                except Exception:
+            with throttle.slot(url) if throttle is not None else nullcontext():
+                if HAS_CURL_CFFI and curl_requests is not None:
+                    try:
+                        response = curl_requests.request(
+                            method=method.upper(),
+                            url=url,
+                            headers=headers,
+                            timeout=timeout,
+                            allow_redirects=True,
+                            impersonate="chrome",
+                        )
+                    except Exception:
+                        response = session.request(
+                            method=method.upper(),
+                            url=url,
+                            headers=headers,
+                            timeout=timeout,
+                            allow_redirects=True,
+                        )
+                else:
                     response = session.request(
                         method=method.upper(),
                         url=url,
@@ -262,14 +304,6 @@ def request_with_backoff(
                         timeout=timeout,
                         allow_redirects=True,
                     )
-            else:
-                response = session.request(
-                    method=method.upper(),
-                    url=url,
-                    headers=headers,
-                    timeout=timeout,
-                    allow_redirects=True,
-                )
         except Exception as exc:
             last_exc = exc
             if attempt >= retries:
@@ -292,6 +326,35 @@ def request_with_backoff(
     raise RuntimeError("Request failed for unknown reason")
 
 
+class NotModified(Exception):
+    """A conditional GET was answered with 304: the saved copy is still current."""
+
+    def __init__(self, url: str, validators: Dict[str, str]) -> None:
+        super().__init__(f"not modified: {url}")
+        self.url = url
+        self.validators = validators
+
+
+def response_validators(headers: Any) -> Dict[str, str]:
+    validators: Dict[str, str] = {}
+    etag = (headers.get("ETag") or "").strip()
+    last_modified = (headers.get("Last-Modified") or "").strip()
+    if etag:
+        validators["etag"] = etag
+    if last_modified:
+        validators["last_modified"] = last_modified
+    return validators
+
+
+def conditional_headers(validators: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
 def fetch_page_html(
     session: requests.Session,
     url: str,
@@ -299,7 +362,19 @@ def fetch_page_html(
     timeout: float,
     retries: int,
     backoff_base: float,
-) -> Tuple[str, str, str]:
+    throttle: Optional[HostThrottle] = None,
+    validators: Optional[Dict[str, Any]] = None,
+    on_response: Optional[Callable[[Any], None]] = None,
+) -> Tuple[str, str, str, Dict[str, str]]:
+    """
+    GET `url` as HTML: `(text, final url, content type, validators)`. With
+    `validators` from an earlier fetch the request is conditional and a 304
+    raises `NotModified`. `on_response` is handed the successful response.
+    """
+    headers = {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    }
+    headers.update(conditional_headers(validators))
     response = request_with_backoff(
         session,
         "GET",
@@ -307,15 +382,18 @@ def fetch_page_html(
         timeout=timeout,
         retries=retries,
         backoff_base=backoff_base,
-        headers={
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        },
+        throttle=throttle,
+        headers=headers,
     )
+    if response.status_code == 304 and validators:
+        raise NotModified(response.url, response_validators(response.headers))
     if response.status_code != 200:
         raise RuntimeError(f"HTML fetch failed ({response.status_code})")
+    if on_response is not None:
+        on_response(response)
 
     content_type = response.headers.get("Content-Type", "").strip()
-    return response.text, response.url, content_type
+    return response.text, response.url, content_type, response_validators(response.headers)
 
 
 def scrape_with_jina(
@@ -329,6 +407,8 @@ def scrape_with_jina(
     timeout: float = 30.0,
     retries: int = 3,
     backoff_base: float = 1.5,
+    throttle: Optional[HostThrottle] = None,
+    on_response: Optional[Callable[[Any], None]] = None,
 ) -> str:
     jina_url = f"https://r.jina.ai/{url}"
     headers: Dict[str, str] = {
@@ -355,6 +435,7 @@ def scrape_with_jina(
         retries=retries,
         backoff_base=backoff_base,
         retry_statuses=(429, 500, 502, 503, 504),
+        throttle=throttle,
     )
     if response.status_code == 401 and "Authorization" in headers:
         retry_headers = dict(headers)
@@ -368,9 +449,12 @@ def scrape_with_jina(
             retries=retries,
             backoff_base=backoff_base,
             retry_statuses=(429, 500, 502, 503, 504),
+            throttle=throttle,
         )
     if response.status_code != 200:
         raise RuntimeError(f"Jina scrape failed ({response.status_code})")
+    if on_response is not None:
+        on_response(response)
     return response.text
 
 
@@ -384,8 +468,7 @@ def is_pdf_content_type(content_type: str) -> bool:
     return "application/pdf" in lower
 
 
-def extract_title_from_html(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
+def title_from_soup(soup: BeautifulSoup) -> str:
     h1 = soup.find("h1")
     if h1:
         title = normalize_whitespace(h1.get_text(" ", strip=True))
@@ -399,8 +482,7 @@ def extract_title_from_html(html: str) -> str:
     return "Untitled"
 
 
-def extract_links_from_html(html: str, base_url: str) -> List[str]:
-    soup = BeautifulSoup(html, "html.parser")
+def links_from_soup(soup: BeautifulSoup, base_url: str) -> List[str]:
     container = soup.find(id="wb-cont") or soup.find("main") or soup
 
     links: List[str] = []
@@ -416,11 +498,11 @@ def extract_links_from_html(html: str, base_url: str) -> List[str]:
     return links
 
 
-def extract_markdown_from_html(html: str) -> str:
+def markdown_from_soup(soup: BeautifulSoup) -> str:
     """
     Primary local extractor that converts page content into markdown-like text.
+    Removes script/style/navigation elements from the tree as it goes.
     """
-    soup = BeautifulSoup(html, "html.parser")
     container = soup.find(id="wb-cont") or soup.find("main") or soup.body or soup
 
     for junk in container.select("script, style, noscript, nav, header, footer"):
@@ -462,6 +544,109 @@ def extract_markdown_from_html(html: str) -> str:
     return "\n\n".join(lines)
 
 
+def extract_title_from_html(html: str) -> str:
+    return title_from_soup(BeautifulSoup(html, "html.parser"))
+
+
+def extract_links_from_html(html: str, base_url: str) -> List[str]:
+    return links_from_soup(BeautifulSoup(html, "html.parser"), base_url)
+
+
+def extract_markdown_from_html(html: str) -> str:
+    return markdown_from_soup(BeautifulSoup(html, "html.parser"))
+
+
+def analyze_html(html: str, base_url: str, *, with_links: bool = True, parser: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Title, outgoing links and markdown from a single parse of `html` (lxml when
+    installed). Same extraction rules as the extract_*_from_html helpers, which
+    each parse the page again with html.parser.
+    """
+    soup = BeautifulSoup(html, parser or HTML_PARSER)
+    title = title_from_soup(soup)
+    # Links are read before markdown extraction strips nav/header/footer.
+    links = links_from_soup(soup, base_url) if with_links else []
+    return {"title": title, "links": links, "markdown": markdown_from_soup(soup)}
+
+
+def benchmark_extraction(paths: Sequence[Path], repeat: int = 5) -> Dict[str, Any]:
+    """Best-of-`repeat` seconds to extract `paths`: three html.parser passes vs analyze_html."""
+    pages = [(path.read_text(encoding="utf-8"), path.resolve().as_uri()) for path in paths]
+
+    def separate() -> List[str]:
+        out = []
+        for html, base_url in pages:
+            extract_title_from_html(html)
+            extract_links_from_html(html, base_url)
+            out.append(extract_markdown_from_html(html))
+        return out
+
+    candidates = {"separate_parses": separate}
+    for parser in dict.fromkeys([HTML_PARSER, "html.parser"]):
+        candidates[f"single_parse_{parser}"] = lambda parser=parser: [
+            analyze_html(html, base_url, parser=parser)["markdown"] for html, base_url in pages
+        ]
+
+    reference = separate()
+    report: Dict[str, Any] = {"pages": len(pages), "bytes": sum(len(html) for html, _ in pages)}
+    for name, run in candidates.items():
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            markdown = run()
+            best = min(best, time.perf_counter() - started)
+        report[f"{name}_seconds"] = round(best, 4)
+        report[f"{name}_markdown_matches"] = markdown == reference
+    return report
+
+
+def benchmark_url_policy(
+    paths: Sequence[Path],
+    repeat: int = 5,
+    allow_domains: Iterable[str] = ("www.canada.ca",),
+    allow_path_prefixes: Sequence[str] = (ALLOW_PATH_PREFIX,),
+) -> Dict[str, Any]:
+    """
+    Best-of-`repeat` seconds to canonicalize and allow-check every link in the
+    markdown `paths` (repeats included, as a crawl sees them): uncached vs
+    `UrlPolicy`. Each timed run starts from a cold cache.
+    """
+    md_link_pattern = re.compile(r"\[[^\]]+\]\((https?://[^)\s]+)\)", re.IGNORECASE)
+    bare_url_pattern = re.compile(r"https?://[^\s<>)\]\"']+", re.IGNORECASE)
+    links: List[str] = []
+    for path in paths:
+        text = path.read_text(encoding="utf-8")
+        links.extend(md_link_pattern.findall(text))
+        links.extend(bare_url_pattern.findall(text))
+
+    def run(memoize: bool) -> List[Tuple[Optional[str], bool]]:
+        canonicalize_absolute.cache_clear()
+        policy = UrlPolicy(allow_domains, allow_path_prefixes, memoize=memoize)
+        out = []
+        for link in links:
+            canonical = policy.canonicalize(link)
+            out.append((canonical, bool(canonical) and policy.is_allowed(canonical)))
+        return out
+
+    reference = run(memoize=False)
+    report: Dict[str, Any] = {
+        "files": len(paths),
+        "links": len(links),
+        "distinct_links": len(set(links)),
+        "allowed": sum(1 for _, allowed in reference if allowed),
+    }
+    for name, memoize in (("uncached", False), ("url_policy", True)):
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            results = run(memoize)
+            best = min(best, time.perf_counter() - started)
+        report[f"{name}_seconds"] = round(best, 4)
+        report[f"{name}_links_per_second"] = round(len(links) / best) if best else None
+        report[f"{name}_matches"] = results == reference
+    return report
+
+
 def derive_title_from_url(url: str) -> str:
     slug = make_slug(url)
     return slug.replace("-", " ").strip().title() or "Untitled"
@@ -537,9 +722,201 @@ def build_frontmatter(
     )
 
 
-def append_manifest_record(manifest: Dict[str, Any], record: Dict[str, Any]) -> None:
-    manifest.setdefault("pages", []).append(record)
-    manifest["updated_at"] = utc_now_iso()
+def page_manifest_record(page: Dict[str, Any], item: Dict[str, Any], status: str, **fields: Any) -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        "url": page["final_url"],
+        "original_url": page["requested_url"],
+        "canonical_url": page["canonical_url"],
+        "final_url": page["final_url"],
+        "fetched_url": page["fetched_url"],
+        "content_type": page["content_type"] or None,
+        "title": page["title"],
+        "depth": int(item.get("depth", 0)),
+        "parent_url": item.get("parent_url"),
+        "status": status,
+    }
+    record.update(fields)
+    record["timestamp"] = utc_now_iso()
+    return record
+
+
+def fetch_and_extract_page(
+    session: requests.Session,
+    item: Dict[str, Any],
+    *,
+    allow_domains: Set[str],
+    allow_path_prefixes: Sequence[str],
+    max_depth: int,
+    timeout: float,
+    retries: int,
+    backoff_base: float,
+    target_selector: str,
+    exclude_selectors: Sequence[str],
+    wait_for_selector: Optional[str],
+    with_generated_alt: bool,
+    throttle: Optional[HostThrottle] = None,
+    validators: Optional[Dict[str, Any]] = None,
+    near_dup_min_words: Optional[int] = None,
+    cache: Optional[ResponseCache] = None,
+    replay: Optional[Dict[str, Dict[str, Any]]] = None,
+    policy: Optional[UrlPolicy] = None,
+) -> Dict[str, Any]:
+    """
+    Network half of one crawl step: fetch the page (Jina fallback included) and
+    extract its title, markdown and outgoing links. Reads no crawl state, so it
+    can run on a worker thread; `crawl_recursive` commits the result.
+
+    `status` is "not_modified" (conditional GET answered 304 for the page's
+    `validators`), "out_of_scope", "pdf_asset"/"non_html_asset",
+    "scrape_failed" or "extracted". With `near_dup_min_words`, an extracted
+    page also carries its SimHash `fingerprint` (None below that many words).
+
+    With a `cache`, the HTML and Jina responses used are stored in it and their
+    index entries returned in `responses`. Given `replay` (the `{kind: entry}`
+    of the page's latest cached fetch) the responses are read from the cache
+    instead and nothing goes over the network; a page with nothing cached is
+    "not_cached".
+    """
+    requested_url = item["url"]
+    depth = int(item.get("depth", 0))
+    canonical_url = canonicalize_url(requested_url) or requested_url
+    page: Dict[str, Any] = {
+        "requested_url": requested_url,
+        "canonical_url": canonical_url,
+        "fetched_url": requested_url,
+        "final_url": canonical_url,
+        "content_type": "",
+        "title": None,
+        "markdown": "",
+        "links": [],
+        "extractor_used": "",
+        "fallback_reason": "",
+        "fetch_warning": None,
+        "scrape_warning": None,
+        "error": None,
+        "validators": {},
+        "fingerprint": None,
+        "responses": [],
+    }
+    if replay is not None and not replay:
+        page["status"] = "not_cached"
+        return page
+    fetched_at = utc_now_iso()
+
+    def keep(kind: str) -> Optional[Callable[[Any], None]]:
+        if cache is None or replay is not None:
+            return None
+
+        def on_response(response: Any) -> None:
+            if kind == "html" and not is_html_content_type(response.headers.get("Content-Type", "")):
+                return
+            page["responses"].append(cache.store(kind, response, fetched_at))
+
+        return on_response
+
+    def html_response() -> Tuple[str, str, str, Dict[str, str]]:
+        if replay is None:
+            return fetch_page_html(
+                session,
+                requested_url,
+                timeout=timeout,
+                retries=retries,
+                backoff_base=backoff_base,
+                throttle=throttle,
+                validators=validators,
+                on_response=keep("html"),
+            )
+        entry = replay.get("html")
+        if entry is None or cache is None:
+            raise RuntimeError("HTML response not cached")
+        headers = CaseInsensitiveDict(entry.get("headers") or {})
+        return cache.read_text(entry), entry["final_url"], headers.get("Content-Type", "").strip(), response_validators(headers)
+
+    def jina_markdown(target_url: str) -> str:
+        if replay is None:
+            return scrape_with_jina(session, target_url, **jina_options, on_response=keep("jina"))
+        entry = replay.get("jina")
+        if entry is None or cache is None:
+            raise RuntimeError("Jina response not cached")
+        return cache.read_text(entry)
+
+    jina_options = {
+        "target_selector": target_selector,
+        "exclude_selectors": exclude_selectors,
+        "wait_for_selector": wait_for_selector,
+        "with_generated_alt": with_generated_alt,
+        "timeout": timeout,
+        "retries": retries,
+        "backoff_base": backoff_base,
+        "throttle": throttle,
+    }
+
+    html: Optional[str] = None
+    try:
+        html, page["fetched_url"], page["content_type"], page["validators"] = html_response()
+    except NotModified as exc:
+        page["fetched_url"] = exc.url
+        page["final_url"] = canonicalize_url(exc.url) or canonical_url
+        page["validators"] = exc.validators
+        page["status"] = "not_modified"
+        return page
+    except Exception as exc:
+        page["fetch_warning"] = str(exc)
+        print(f"  ! HTML fetch fallback via Jina: {exc}")
+
+    url = canonicalize_url(page["fetched_url"]) or canonical_url
+    page["final_url"] = url
+    if policy is None:
+        policy = UrlPolicy(allow_domains, allow_path_prefixes)
+    if not policy.is_allowed(url):
+        page["status"] = "out_of_scope"
+        return page
+
+    content_type = page["content_type"]
+    if html is not None and not is_html_content_type(content_type):
+        page["status"] = "pdf_asset" if is_pdf_content_type(content_type) or url.lower().endswith(".pdf") else "non_html_asset"
+        page["title"] = derive_title_from_url(url)
+        return page
+
+    if html is not None:
+        analysis = analyze_html(html, page["fetched_url"], with_links=depth < max_depth)
+        page["title"] = analysis["title"]
+        page["links"] = analysis["links"]
+        markdown = analysis["markdown"]
+        local_quality_issue = looks_like_block_page(markdown)
+        if local_quality_issue:
+            page["fallback_reason"] = f"html_quality:{local_quality_issue}"
+            try:
+                markdown = jina_markdown(url)
+                page["extractor_used"] = "jina_reader"
+            except Exception as exc:
+                page["scrape_warning"] = f"jina_failed: {exc}"
+                page["extractor_used"] = "html_local"
+                page["fallback_reason"] = f"{page['fallback_reason']};jina_failed"
+                print(f"  ! Jina fallback failed, using local HTML extractor: {exc}")
+        else:
+            page["extractor_used"] = "html_local"
+    else:
+        page["title"] = derive_title_from_url(url)
+        fetch_warning = page["fetch_warning"]
+        page["fallback_reason"] = f"html_fetch_failed:{fetch_warning or 'unknown'}"
+        try:
+            markdown = jina_markdown(url)
+            page["extractor_used"] = "jina_reader"
+        except Exception as exc:
+            page["status"] = "scrape_failed"
+            page["extractor_used"] = "jina_reader"
+            page["error"] = f"{exc}; html_fetch={fetch_warning}" if fetch_warning else str(exc)
+            return page
+        # If direct HTML fetch failed, recurse by extracting URLs from markdown output.
+        if depth < max_depth:
+            page["links"] = parse_urls_from_markdown(markdown)
+
+    page["markdown"] = markdown
+    page["status"] = "extracted"
+    if near_dup_min_words is not None:
+        page["fingerprint"] = text_fingerprint(markdown, near_dup_min_words)
+    return page
 
 
 def crawl_recursive(
@@ -562,44 +939,77 @@ def crawl_recursive(
     reject_low_quality: bool,
     dedupe_content_hash: bool,
     save_every: int = 10,
+    concurrency: int = 1,
+    per_host_concurrency: int = 1,
+    conditional_get: bool = True,
+    dedupe_near_duplicates: bool = False,
+    near_dup_max_distance: int = DEFAULT_MAX_DISTANCE,
+    near_dup_min_words: int = DEFAULT_MIN_WORDS,
+    response_cache: bool = True,
+    reextract_from_cache: bool = False,
 ) -> Dict[str, Any]:
+    """
+    BFS crawl from `seed_urls`.
+
+    Up to `concurrency` pages are fetched and extracted on worker threads, with
+    at most `per_host_concurrency` requests in flight per host and request
+    starts to one host spaced `delay_seconds` apart. Results are committed on
+    the calling thread in the order their queue items were taken, so the visit
+    order, depths, manifest and `max_pages` accounting are the same as a
+    sequential crawl; only the pages in flight at a checkpoint are re-queued
+    when a run is resumed.
+
+    With `conditional_get`, the ETag/Last-Modified of every saved page is kept
+    in the crawl state (surviving `resume=False`) and sent back on later runs.
+    A 304 reuses the saved file and manifest record and the outgoing links
+    stored with the validators; such pages are counted as `pages_unchanged`,
+    not towards `max_pages`.
+
+    With `dedupe_near_duplicates`, saved pages of at least `near_dup_min_words`
+    words are indexed by SimHash (see near_duplicates.py). A page within
+    `near_dup_max_distance` bits of an indexed page at another URL is not
+    written; its record has status "near_duplicate" and points at that page's
+    file. The index is stored in the frontier and carried across runs.
+
+    Crawl state lives in the output directory's SQLite frontier (see
+    frontier.py): each page is an O(1) update, committed atomically every
+    `save_every` pages, and the JSON state, manifest and failure files are
+    exported from it when the run ends.
+
+    With `response_cache`, the raw HTML and Jina responses behind each page are
+    kept in `_response_cache/` (see response_cache.py). `reextract_from_cache`
+    runs the crawl against that cache instead of the network: every page is
+    rebuilt from its latest cached fetch with the current extraction rules
+    (markdown files rewritten where they change, new manifest records
+    appended), and pages never cached are logged as "not_cached". Pass
+    `resume=False` so the BFS starts again from the seeds.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
-    state_path = output_dir / STATE_FILE
-    manifest_path = output_dir / MANIFEST_FILE
-    failed_path = output_dir / FAILED_FILE
-
-    if resume and state_path.exists():
-        state = load_json(state_path, {})
-    else:
-        state = {
-            "version": 1,
-            "created_at": utc_now_iso(),
-            "visited": [],
-            "queue": [],
-            "failed": [],
-        }
-
-    manifest = load_json(
-        manifest_path,
+    frontier = open_frontier(output_dir)
+    frontier.start(
         {
             "created_at": utc_now_iso(),
-            "updated_at": utc_now_iso(),
             "seed_urls": list(seed_urls),
             "allow_domains": sorted(list(allow_domains)),
             "allow_path_prefixes": list(allow_path_prefixes),
-            "pages": [],
         },
+        resume=resume,
     )
+    policy = UrlPolicy(allow_domains, allow_path_prefixes)
 
-    visited: Set[str] = set(state.get("visited", []))
-    queue_data: List[Dict[str, Any]] = state.get("queue", [])
-    queue: Deque[Dict[str, Any]] = deque(queue_data)
-    queued_set: Set[str] = {item.get("url", "") for item in queue_data if item.get("url")}
-    failed: List[Dict[str, Any]] = list(state.get("failed", []))
+    visited: Set[str] = frontier.visited()
+    queue: Deque[Dict[str, Any]] = deque(frontier.queue())
+    queued_set: Set[str] = {item["url"] for item in queue}
+    failed_count = len(frontier.failures())
+    # Validators per requested canonical URL; kept across fresh (non-resumed)
+    # runs, which are the re-crawls conditional GETs are for.
+    validators: Dict[str, Dict[str, Any]] = frontier.validators()
 
     known_urls: Set[str] = set()
     known_hashes: Dict[str, str] = {}
-    for page in manifest.get("pages", []):
+    # Latest manifest record with a file on disk, per page URL.
+    saved_records: Dict[str, Dict[str, Any]] = {}
+    for page in frontier.pages():
         url = page.get("url")
         if isinstance(url, str) and url:
             known_urls.add(url)
@@ -607,361 +1017,363 @@ def crawl_recursive(
         filename = page.get("file")
         if isinstance(content_hash, str) and content_hash and isinstance(filename, str) and filename:
             known_hashes[content_hash] = filename
+            if isinstance(url, str) and url:
+                saved_records[url] = page
+
+    near_index: Optional[NearDuplicateIndex] = None
+    if dedupe_near_duplicates:
+        near_index = NearDuplicateIndex(near_dup_max_distance)
+        for url, (fingerprint, filename) in frontier.fingerprints().items():
+            near_index.add(url, fingerprint, filename)
+        # Pages saved before the index existed are fingerprinted from disk, in
+        # the order they were first saved; one that is already a near-duplicate
+        # of an indexed page is left out, as a crawl with the index would have.
+        for url, record in saved_records.items():
+            file_path = output_dir / record["file"]
+            if record.get("status") != "saved" or url in near_index.entries or not file_path.exists():
+                continue
+            fingerprint = text_fingerprint(strip_frontmatter(file_path.read_text(encoding="utf-8")), near_dup_min_words)
+            if fingerprint is not None and near_index.query(fingerprint, exclude_url=url) is None:
+                near_index.add(url, fingerprint, record["file"])
+                frontier.set_fingerprint(url, fingerprint, record["file"])
+        frontier.checkpoint()
 
     for seed in seed_urls:
         canonical = canonicalize_url(seed)
         if not canonical:
             continue
-        if not url_is_allowed(canonical, allow_domains, allow_path_prefixes):
+        if not policy.is_allowed(canonical):
             continue
         if canonical in visited or canonical in queued_set:
             continue
         queue.append({"url": canonical, "depth": 0, "parent_url": None})
         queued_set.add(canonical)
+        frontier.enqueue(queue[-1])
+
+    cache = ResponseCache(output_dir / CACHE_DIR) if response_cache or reextract_from_cache else None
+    cached_responses = frontier.latest_responses() if reextract_from_cache else None
+    if reextract_from_cache:
+        # Nothing goes over the network, so there is nothing to be polite to or revalidate.
+        conditional_get = False
+        delay_seconds = 0.0
+    throttle = HostThrottle(per_host=per_host_concurrency, min_interval=delay_seconds)
+    local = threading.local()
+
+    def fetch(item: Dict[str, Any], cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not hasattr(local, "session"):
+            local.session = make_session()
+        return fetch_and_extract_page(
+            local.session,
+            item,
+            allow_domains=allow_domains,
+            allow_path_prefixes=allow_path_prefixes,
+            max_depth=max_depth,
+            timeout=timeout,
+            retries=retries,
+            backoff_base=backoff_base,
+            target_selector=target_selector,
+            exclude_selectors=exclude_selectors,
+            wait_for_selector=wait_for_selector,
+            with_generated_alt=with_generated_alt,
+            throttle=throttle,
+            validators=cached,
+            near_dup_min_words=near_dup_min_words if near_index is not None else None,
+            cache=cache,
+            replay=cached_responses.get(item["url"], {}) if cached_responses is not None else None,
+            policy=policy,
+        )
 
-    session = make_session()
-    pages_attempted = 0
-    pages_saved = 0
-    pages_skipped = 0
-
-    while queue and pages_attempted < max_pages:
-        item = queue.popleft()
-        url = item.get("url")
-        depth = int(item.get("depth", 0))
-        parent_url = item.get("parent_url")
-        queued_set.discard(url)
-
-        if not url:
-            continue
-        if url in visited:
-            continue
-        if not url_is_allowed(url, allow_domains, allow_path_prefixes):
-            pages_skipped += 1
-            continue
-        if depth > max_depth:
-            pages_skipped += 1
-            continue
+    def reusable_validators(url: str, depth: int) -> Optional[Dict[str, Any]]:
+        """Validators to revalidate `url` with, if a 304 could be served from disk."""
+        entry = validators.get(url)
+        if not conditional_get or not entry:
+            return None
+        record = saved_records.get(entry.get("url") or url)
+        if not record or not (output_dir / record["file"]).exists():
+            return None
+        if depth < max_depth and entry.get("links") is None:
+            # Saved at the depth limit without its links; fetch it to recurse.
+            return None
+        return entry
+
+    def remember_page(item: Dict[str, Any], url: str, page: Dict[str, Any], record: Dict[str, Any]) -> None:
+        saved_records[url] = record
+        if page["validators"]:
+            validators[item["url"]] = {
+                **page["validators"],
+                "url": url,
+                "links": page["links"] if int(item.get("depth", 0)) < max_depth else None,
+                "updated_at": utc_now_iso(),
+            }
+        else:
+            validators.pop(item["url"], None)
+        frontier.set_validators(item["url"], validators.get(item["url"]))
 
-        pages_attempted += 1
-        visited.add(url)
-        print(f"[{pages_attempted}/{max_pages}] Fetching (depth={depth}): {url}")
+    def add_failure(record: Dict[str, Any]) -> None:
+        nonlocal failed_count
+        frontier.add_failure(record)
+        failed_count += 1
 
-        requested_url = url
-        canonical_url = canonicalize_url(requested_url) or requested_url
+    # Items handed to workers, in the order they were taken off the queue.
+    in_flight: Deque[Tuple[Dict[str, Any], Future]] = deque()
+    in_flight_urls: Set[str] = set()
+    # In-flight URLs an earlier page redirected to; a sequential crawl would
+    # have found them visited and never fetched them.
+    superseded: Set[str] = set()
 
-        html: Optional[str] = None
-        fetched_url = requested_url
-        content_type = ""
-        fetch_warning: Optional[str] = None
-        try:
-            html, fetched_url, content_type = fetch_page_html(
-                session,
-                url,
-                timeout=timeout,
-                retries=retries,
-                backoff_base=backoff_base,
-            )
-        except Exception as exc:
-            fetch_warning = str(exc)
-            print(f"  ! HTML fetch fallback via Jina: {fetch_warning}")
-
-        final_url = canonicalize_url(fetched_url) or canonical_url
-        if not url_is_allowed(final_url, allow_domains, allow_path_prefixes):
-            pages_skipped += 1
-            append_manifest_record(
-                manifest,
-                {
-                    "url": final_url,
-                    "original_url": requested_url,
-                    "canonical_url": canonical_url,
-                    "final_url": final_url,
-                    "fetched_url": fetched_url,
-                    "content_type": content_type or None,
-                    "title": None,
-                    "depth": depth,
-                    "parent_url": parent_url,
-                    "status": "out_of_scope",
-                    "file": None,
-                    "content_hash": None,
-                    "timestamp": utc_now_iso(),
-                },
-            )
-            continue
-        if final_url != url and final_url in visited:
-            pages_skipped += 1
-            continue
-        if final_url != url:
-            visited.add(final_url)
-            url = final_url
-
-        if html is not None and not is_html_content_type(content_type):
-            pages_skipped += 1
-            asset_status = "pdf_asset" if is_pdf_content_type(content_type) or final_url.lower().endswith(".pdf") else "non_html_asset"
-            append_manifest_record(
-                manifest,
-                {
-                    "url": url,
-                    "original_url": requested_url,
-                    "canonical_url": canonical_url,
-                    "final_url": final_url,
-                    "fetched_url": fetched_url,
-                    "content_type": content_type or None,
-                    "title": derive_title_from_url(url),
-                    "depth": depth,
-                    "parent_url": parent_url,
-                    "status": asset_status,
-                    "file": None,
-                    "content_hash": None,
-                    "timestamp": utc_now_iso(),
-                },
-            )
-            continue
+    pages_attempted = 0
+    pages_saved = 0
+    pages_skipped = 0
+    pages_unchanged = 0
+    pages_near_duplicate = 0
 
-        if depth < max_depth and html is not None:
-            links = extract_links_from_html(html, fetched_url)
-            for link in links:
-                if not url_is_allowed(link, allow_domains, allow_path_prefixes):
+    def enqueue_links(links: Sequence[str], depth: int, parent_url: str) -> None:
+        for link in links:
+            if not policy.is_allowed(link):
+                continue
+            if link in visited or link in queued_set:
+                continue
+            queue.append({"url": link, "depth": depth + 1, "parent_url": parent_url})
+            queued_set.add(link)
+            frontier.enqueue(queue[-1])
+
+    with frontier, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        while True:
+            while queue and len(in_flight) < max(1, concurrency) and pages_attempted + len(in_flight) < max_pages:
+                item = queue.popleft()
+                url = item.get("url")
+                depth = int(item.get("depth", 0))
+                queued_set.discard(url)
+
+                if not url:
                     continue
-                if link in visited or link in queued_set:
+                if url in visited:
+                    frontier.dequeue(url)
                     continue
-                queue.append({"url": link, "depth": depth + 1, "parent_url": url})
-                queued_set.add(link)
-
-        title = extract_title_from_html(html) if html is not None else derive_title_from_url(url)
-        extractor_used = ""
-        fallback_reason = ""
-        scrape_warning: Optional[str] = None
-        markdown = ""
-        if html is not None:
-            markdown = extract_markdown_from_html(html)
-            local_quality_issue = looks_like_block_page(markdown)
-            if local_quality_issue:
-                fallback_reason = f"html_quality:{local_quality_issue}"
-                try:
-                    markdown = scrape_with_jina(
-                        session,
-                        url,
-                        target_selector=target_selector,
-                        exclude_selectors=exclude_selectors,
-                        wait_for_selector=wait_for_selector,
-                        with_generated_alt=with_generated_alt,
-                        timeout=timeout,
-                        retries=retries,
-                        backoff_base=backoff_base,
-                    )
-                    extractor_used = "jina_reader"
-                except Exception as exc:
-                    scrape_warning = f"jina_failed: {exc}"
-                    extractor_used = "html_local"
-                    fallback_reason = f"{fallback_reason};jina_failed"
-                    print(f"  ! Jina fallback failed, using local HTML extractor: {exc}")
-            else:
-                extractor_used = "html_local"
-        else:
-            fallback_reason = f"html_fetch_failed:{fetch_warning or 'unknown'}"
-            try:
-                markdown = scrape_with_jina(
-                    session,
-                    url,
-                    target_selector=target_selector,
-                    exclude_selectors=exclude_selectors,
-                    wait_for_selector=wait_for_selector,
-                    with_generated_alt=with_generated_alt,
-                    timeout=timeout,
-                    retries=retries,
-                    backoff_base=backoff_base,
-                )
-                extractor_used = "jina_reader"
-            except Exception as exc:
-                combined_error = f"{exc}; html_fetch={fetch_warning}" if fetch_warning else str(exc)
-                error_entry = {
-                    "url": url,
-                    "depth": depth,
-                    "parent_url": parent_url,
-                    "stage": "scrape_jina",
-                    "error": combined_error,
-                    "timestamp": utc_now_iso(),
-                }
-                failed.append(error_entry)
-                append_manifest_record(
-                    manifest,
-                    {
-                        "url": url,
-                        "original_url": requested_url,
-                        "canonical_url": canonical_url,
-                        "final_url": final_url,
-                        "fetched_url": fetched_url,
-                        "content_type": content_type or None,
-                        "title": title,
-                        "depth": depth,
-                        "parent_url": parent_url,
-                        "status": "scrape_failed",
-                        "extractor_used": "jina_reader",
-                        "fallback_reason": fallback_reason,
-                        "file": None,
-                        "content_hash": None,
-                        "error": combined_error,
-                        "timestamp": utc_now_iso(),
-                    },
-                )
-                continue
-
-        # If direct HTML fetch failed, recurse by extracting URLs from markdown output.
-        if depth < max_depth and html is None:
-            links = parse_urls_from_markdown(markdown)
-            for link in links:
-                if not url_is_allowed(link, allow_domains, allow_path_prefixes):
+                if not policy.is_allowed(url):
+                    frontier.dequeue(url)
+                    pages_skipped += 1
                     continue
-                if link in visited or link in queued_set:
+                if depth > max_depth:
+                    frontier.dequeue(url)
+                    pages_skipped += 1
                     continue
-                queue.append({"url": link, "depth": depth + 1, "parent_url": url})
-                queued_set.add(link)
-
-        quality_issue = looks_like_block_page(markdown)
-        if reject_low_quality and quality_issue:
-            pages_skipped += 1
-            failed.append(
-                {
-                    "url": url,
-                    "depth": depth,
-                    "parent_url": parent_url,
-                    "stage": "quality_check",
-                    "error": quality_issue,
-                    "timestamp": utc_now_iso(),
-                }
-            )
-            append_manifest_record(
-                manifest,
-                {
-                    "url": url,
-                    "original_url": requested_url,
-                    "canonical_url": canonical_url,
-                    "final_url": final_url,
-                    "fetched_url": fetched_url,
-                    "content_type": content_type or None,
-                    "title": title,
-                    "depth": depth,
-                    "parent_url": parent_url,
-                    "status": "quality_rejected",
-                    "extractor_used": extractor_used,
-                    "fallback_reason": fallback_reason or None,
-                    "file": None,
-                    "content_hash": None,
-                    "error": quality_issue,
-                    "timestamp": utc_now_iso(),
-                },
-            )
-            continue
 
-        content_hash = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
-        if dedupe_content_hash and content_hash in known_hashes:
-            pages_skipped += 1
-            existing_file = known_hashes[content_hash]
-            append_manifest_record(
-                manifest,
-                {
-                    "url": url,
-                    "original_url": requested_url,
-                    "canonical_url": canonical_url,
-                    "final_url": final_url,
-                    "fetched_url": fetched_url,
-                    "content_type": content_type or None,
-                    "title": title,
-                    "depth": depth,
-                    "parent_url": parent_url,
-                    "status": "duplicate_content",
-                    "extractor_used": extractor_used,
-                    "fallback_reason": fallback_reason or None,
-                    "file": existing_file,
-                    "content_hash": content_hash,
-                    "timestamp": utc_now_iso(),
-                },
-            )
-        else:
-            filename = extract_filename_from_url(url)
-            file_path = output_dir / filename
-            frontmatter = build_frontmatter(
-                url=url,
-                original_url=requested_url,
-                canonical_url=canonical_url,
-                final_url=final_url,
-                fetched_url=fetched_url,
-                title=title,
-                parent_url=parent_url,
-                depth=depth,
-                content_type=content_type,
-                extractor_used=extractor_used,
-                fallback_reason=fallback_reason,
-                content_hash=content_hash,
-            )
+                # Stays queued in the frontier until its result is committed.
+                visited.add(url)
+                in_flight_urls.add(url)
+                in_flight.append((item, pool.submit(fetch, item, reusable_validators(url, depth))))
+                print(f"[{pages_attempted + len(in_flight)}/{max_pages}] Fetching (depth={depth}): {url}")
 
-            if not file_path.exists():
-                file_path.write_text(frontmatter + markdown, encoding="utf-8")
-            known_hashes[content_hash] = filename
-            known_urls.add(url)
-            pages_saved += 1
-
-            append_manifest_record(
-                manifest,
-                {
-                    "url": url,
-                    "original_url": requested_url,
-                    "canonical_url": canonical_url,
-                    "final_url": final_url,
-                    "fetched_url": fetched_url,
-                    "content_type": content_type or None,
-                    "title": title,
-                    "depth": depth,
-                    "parent_url": parent_url,
-                    "status": "saved",
-                    "extractor_used": extractor_used,
-                    "fallback_reason": fallback_reason or None,
-                    "file": filename,
-                    "content_hash": content_hash,
-                    "fetch_warning": fetch_warning,
-                    "scrape_warning": scrape_warning,
-                    "timestamp": utc_now_iso(),
-                },
-            )
-
-        if delay_seconds > 0:
-            time.sleep(delay_seconds)
+            if not in_flight:
+                break
 
-        if pages_attempted % max(1, save_every) == 0:
-            state_payload = {
-                "version": 1,
-                "created_at": state.get("created_at", utc_now_iso()),
-                "updated_at": utc_now_iso(),
-                "visited": sorted(list(visited)),
-                "queue": list(queue),
-                "failed": failed,
-            }
-            save_json(state_path, state_payload)
-            save_json(manifest_path, manifest)
-            save_json(failed_path, failed)
-
-    state_payload = {
-        "version": 1,
-        "created_at": state.get("created_at", utc_now_iso()),
-        "updated_at": utc_now_iso(),
-        "visited": sorted(list(visited)),
-        "queue": list(queue),
-        "failed": failed,
-    }
-    save_json(state_path, state_payload)
-    save_json(manifest_path, manifest)
-    save_json(failed_path, failed)
+            item, future = in_flight.popleft()
+            page = future.result()
+            in_flight_urls.discard(item["url"])
+            if item["url"] in superseded:
+                superseded.discard(item["url"])
+                continue
+            frontier.dequeue(item["url"])
+            frontier.mark_visited(item["url"])
+            for entry in page["responses"]:
+                frontier.add_response(item["url"], entry)
+
+            depth = int(item.get("depth", 0))
+            parent_url = item.get("parent_url")
+            url = item["url"]
+            final_url = page["final_url"]
+            status = page["status"]
+            if status == "not_modified":
+                pages_unchanged += 1
+            else:
+                pages_attempted += 1
+
+            if status == "out_of_scope":
+                pages_skipped += 1
+                frontier.add_page(page_manifest_record(page, item, "out_of_scope", file=None, content_hash=None))
+            elif status == "not_cached":
+                pages_skipped += 1
+                frontier.add_page(page_manifest_record(page, item, "not_cached", file=None, content_hash=None))
+            elif final_url != url and final_url in visited and final_url not in in_flight_urls:
+                pages_skipped += 1
+            else:
+                if final_url != url:
+                    if final_url in in_flight_urls:
+                        superseded.add(final_url)
+                        frontier.dequeue(final_url)
+                    visited.add(final_url)
+                    frontier.mark_visited(final_url)
+                    url = final_url
+
+                if status == "not_modified":
+                    entry = validators[item["url"]]
+                    if depth < max_depth:
+                        enqueue_links(entry.get("links") or [], depth, url)
+                    record = dict(saved_records[entry.get("url") or url])
+                    record.update(depth=depth, parent_url=parent_url, status="unchanged", timestamp=utc_now_iso())
+                    frontier.add_page(record)
+                    entry.update(page["validators"], updated_at=utc_now_iso())
+                    frontier.set_validators(item["url"], entry)
+                elif status in ("pdf_asset", "non_html_asset"):
+                    pages_skipped += 1
+                    frontier.add_page(page_manifest_record(page, item, status, file=None, content_hash=None))
+                elif status == "scrape_failed":
+                    add_failure(
+                        {
+                            "url": url,
+                            "depth": depth,
+                            "parent_url": parent_url,
+                            "stage": "scrape_jina",
+                            "error": page["error"],
+                            "timestamp": utc_now_iso(),
+                        }
+                    )
+                    frontier.add_page(
+                        page_manifest_record(
+                            page,
+                            item,
+                            "scrape_failed",
+                            extractor_used=page["extractor_used"],
+                            fallback_reason=page["fallback_reason"],
+                            file=None,
+                            content_hash=None,
+                            error=page["error"],
+                        )
+                    )
+                else:
+                    enqueue_links(page["links"], depth, url)
+                    markdown = page["markdown"]
+                    title = page["title"]
+                    extractor_used = page["extractor_used"]
+                    fallback_reason = page["fallback_reason"]
+
+                    quality_issue = looks_like_block_page(markdown)
+                    content_hash = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+                    near = None
+                    if near_index is not None and page["fingerprint"] is not None:
+                        near = near_index.query(page["fingerprint"], exclude_url=url)
+                    if reject_low_quality and quality_issue:
+                        pages_skipped += 1
+                        add_failure(
+                            {
+                                "url": url,
+                                "depth": depth,
+                                "parent_url": parent_url,
+                                "stage": "quality_check",
+                                "error": quality_issue,
+                                "timestamp": utc_now_iso(),
+                            }
+                        )
+                        frontier.add_page(
+                            page_manifest_record(
+                                page,
+                                item,
+                                "quality_rejected",
+                                extractor_used=extractor_used,
+                                fallback_reason=fallback_reason or None,
+                                file=None,
+                                content_hash=None,
+                                error=quality_issue,
+                            )
+                        )
+                    elif dedupe_content_hash and content_hash in known_hashes:
+                        pages_skipped += 1
+                        record = page_manifest_record(
+                            page,
+                            item,
+                            "duplicate_content",
+                            extractor_used=extractor_used,
+                            fallback_reason=fallback_reason or None,
+                            file=known_hashes[content_hash],
+                            content_hash=content_hash,
+                        )
+                        frontier.add_page(record)
+                        remember_page(item, url, page, record)
+                    elif near is not None:
+                        pages_skipped += 1
+                        pages_near_duplicate += 1
+                        record = page_manifest_record(
+                            page,
+                            item,
+                            "near_duplicate",
+                            extractor_used=extractor_used,
+                            fallback_reason=fallback_reason or None,
+                            file=near["file"],
+                            content_hash=content_hash,
+                            near_duplicate_of=near["url"],
+                            near_duplicate_distance=near["distance"],
+                            near_duplicate_similarity=near["similarity"],
+                        )
+                        frontier.add_page(record)
+                        remember_page(item, url, page, record)
+                        # Its own earlier copy no longer stands for the page.
+                        if url in near_index.entries:
+                            near_index.remove(url)
+                            frontier.set_fingerprint(url, None)
+                    else:
+                        filename = extract_filename_from_url(url)
+                        file_path = output_dir / filename
+                        frontmatter = build_frontmatter(
+                            url=url,
+                            original_url=page["requested_url"],
+                            canonical_url=page["canonical_url"],
+                            final_url=final_url,
+                            fetched_url=page["fetched_url"],
+                            title=title,
+                            parent_url=parent_url,
+                            depth=depth,
+                            content_type=page["content_type"],
+                            extractor_used=extractor_used,
+                            fallback_reason=fallback_reason,
+                            content_hash=content_hash,
+                        )
+
+                        previous = saved_records.get(url)
+                        stale = bool(previous) and previous.get("file") == filename and previous.get("content_hash") != content_hash
+                        if stale or not file_path.exists():
+                            file_path.write_text(frontmatter + markdown, encoding="utf-8")
+                        known_hashes[content_hash] = filename
+                        known_urls.add(url)
+                        pages_saved += 1
+                        if near_index is not None and page["fingerprint"] is not None:
+                            near_index.add(url, page["fingerprint"], filename)
+                            frontier.set_fingerprint(url, page["fingerprint"], filename)
+
+                        record = page_manifest_record(
+                            page,
+                            item,
+                            "saved",
+                            extractor_used=extractor_used,
+                            fallback_reason=fallback_reason or None,
+                            file=filename,
+                            content_hash=content_hash,
+                            fetch_warning=page["fetch_warning"],
+                            scrape_warning=page["scrape_warning"],
+                        )
+                        frontier.add_page(record)
+                        remember_page(item, url, page, record)
+
+            if (pages_attempted + pages_unchanged) % max(1, save_every) == 0:
+                frontier.checkpoint()
+
+    frontier.export_json(output_dir)
+    frontier.close()
 
     return {
         "status": "ok",
         "seed_count": len(seed_urls),
         "seed_sample": list(seed_urls)[:10],
         "output_dir": str(output_dir),
+        "concurrency": max(1, concurrency),
         "pages_attempted": pages_attempted,
         "pages_saved": pages_saved,
         "pages_skipped": pages_skipped,
+        "pages_unchanged": pages_unchanged,
+        "pages_near_duplicate": pages_near_duplicate,
+        "reextracted_from_cache": reextract_from_cache,
         "queue_remaining": len(queue),
-        "failed_count": len(failed),
+        "failed_count": failed_count,
     }
 
 
@@ -971,6 +1383,7 @@ def scrape_canada_ca(
     target_selector: Optional[str] = "main",
     exclude_selectors: Optional[List[str]] = None,
     wait_for_selector: Optional[str] = None,
+    throttle: Optional[Any] = None,
 ) -> Optional[str]:
     session = make_session()
     try:
@@ -980,6 +1393,7 @@ def scrape_canada_ca(
             target_selector=target_selector or "main",
             exclude_selectors=exclude_selectors or [],
             wait_for_selector=wait_for_selector,
+            throttle=throttle,
         )
     except Exception as exc:
         print(f"Failed to scrape {url}: {exc}")
@@ -1015,7 +1429,24 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--max-depth", type=int, default=2, help="Maximum crawl depth from seed URLs.")
     parser.add_argument("--max-pages", type=int, default=250, help="Maximum pages attempted per run.")
-    parser.add_argument("--delay-seconds", type=float, default=1.5, help="Delay between successful page scrapes.")
+    parser.add_argument(
+        "--delay-seconds",
+        type=float,
+        default=1.5,
+        help="Minimum spacing between the starts of requests to the same host.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Pages fetched/extracted in parallel (default: 1, sequential).",
+    )
+    parser.add_argument(
+        "--per-host-concurrency",
+        type=int,
+        default=2,
+        help="Maximum requests in flight to one host when --concurrency > 1.",
+    )
     parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout in seconds.")
     parser.add_argument("--retries", type=int, default=3, help="Retries for transient fetch/scrape failures.")
     parser.add_argument("--backoff-base", type=float, default=1.5, help="Exponential backoff base.")
@@ -1034,11 +1465,72 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip saving pages whose markdown content hash already exists (disabled by default).",
     )
+    parser.add_argument(
+        "--dedupe-near-duplicates",
+        action="store_true",
+        help="Skip saving pages whose SimHash is within --near-dup-max-distance bits of a saved page (disabled by default).",
+    )
+    parser.add_argument(
+        "--near-dup-max-distance",
+        type=int,
+        default=DEFAULT_MAX_DISTANCE,
+        help="Hamming distance (of 64 bits) at or below which two pages count as near-duplicates.",
+    )
+    parser.add_argument(
+        "--near-dup-min-words",
+        type=int,
+        default=DEFAULT_MIN_WORDS,
+        help="Pages with fewer words are neither indexed nor checked for near-duplicates.",
+    )
+    parser.add_argument(
+        "--no-conditional-get",
+        action="store_true",
+        help="Always re-download pages instead of revalidating them with their stored ETag/Last-Modified.",
+    )
+    parser.add_argument(
+        "--no-response-cache",
+        action="store_true",
+        help="Do not keep raw HTML/Jina responses in <output-dir>/_response_cache/.",
+    )
+    parser.add_argument(
+        "--reextract-from-cache",
+        action="store_true",
+        help="Rebuild markdown and the manifest from the response cache with the current extractors (no network; implies --no-resume).",
+    )
+    parser.add_argument(
+        "--benchmark-url-policy",
+        nargs="+",
+        metavar="MD",
+        default=None,
+        help="Time link canonicalization and allow checks on saved pages (e.g. ircc_data_clean/*.md) and exit.",
+    )
+    parser.add_argument(
+        "--benchmark-extraction",
+        nargs="+",
+        metavar="HTML",
+        default=None,
+        help="Time HTML extraction on saved pages (e.g. fixtures/html/*.html) and exit.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
+    if args.benchmark_url_policy:
+        print(
+            json.dumps(
+                benchmark_url_policy(
+                    [Path(path) for path in args.benchmark_url_policy],
+                    allow_domains=args.allow_domain,
+                    allow_path_prefixes=args.allow_path_prefix,
+                ),
+                indent=2,
+            )
+        )
+        return
+    if args.benchmark_extraction:
+        print(json.dumps(benchmark_extraction([Path(path) for path in args.benchmark_extraction]), indent=2))
+        return
 
     seed_urls: List[str] = []
     if not args.no_input_links_md:
@@ -1073,9 +1565,17 @@ def main() -> None:
         exclude_selectors=exclude_selectors,
         wait_for_selector=args.wait_for_selector,
         with_generated_alt=not args.no_generated_alt,
-        resume=not args.no_resume,
+        resume=not args.no_resume and not args.reextract_from_cache,
         reject_low_quality=args.reject_low_quality,
         dedupe_content_hash=args.dedupe_content_hash,
+        concurrency=max(1, args.concurrency),
+        per_host_concurrency=max(1, args.per_host_concurrency),
+        conditional_get=not args.no_conditional_get,
+        dedupe_near_duplicates=args.dedupe_near_duplicates,
+        near_dup_max_distance=max(0, args.near_dup_max_distance),
+        near_dup_min_words=max(1, args.near_dup_min_words),
+        response_cache=not args.no_response_cache,
+        reextract_from_cache=args.reextract_from_cache,
     )
     print(json.dumps(result, indent=2))
 
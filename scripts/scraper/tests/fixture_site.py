@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Small local site for crawler tests, served by a threading HTTP server on an
+ephemeral port. Pages carry an ETag and Last-Modified and answer conditional
+GETs with 304; `touch` changes a page's body (and so its validators). Tests
+can serve their own pages by passing `site` and `render_page`, and crawl it
+with `crawl`.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from scrape import crawl_recursive
+
+FILLER = (
+    "This section explains how officers assess applications under the program, "
+    "which documents are required, and how decisions are recorded in the file. "
+) * 3
+
+# path -> outgoing links; /old.html redirects to /a2.html, which is also linked directly.
+SITE = {
+    "/index.html": ["/a1.html", "/old.html", "/a2.html", "/a3.html"],
+    "/a1.html": ["/b1.html", "/b2.html", "/index.html"],
+    "/a2.html": ["/b2.html", "/b3.html"],
+    "/a3.html": ["/b4.html", "/b5.html"],
+    "/b1.html": ["/c1.html"],
+    "/b2.html": [],
+    "/b3.html": ["/c2.html"],
+    "/b4.html": [],
+    "/b5.html": [],
+    "/c1.html": [],
+    "/c2.html": [],
+}
+REDIRECTS = {"/old.html": "/a2.html"}
+
+
+def render(path: str, version: int = 0) -> bytes:
+    links = "".join(f'<li><a href="{link}">{link}</a></li>' for link in SITE[path])
+    revision = f"<p>Revision {version}.</p>" if version else ""
+    return (
+        f"<html><head><title>Page {path}</title></head><body><main>"
+        f"<h1>Page {path}</h1><p>{FILLER}</p>{revision}<ul>{links}</ul>"
+        "</main></body></html>"
+    ).encode("utf-8")
+
+
+class FixtureSite:
+    def __init__(
+        self,
+        response_delay: float = 0.02,
+        site: Optional[Dict[str, List[str]]] = None,
+        render_page: Callable[[str, int], bytes] = render,
+    ) -> None:
+        pages = SITE if site is None else site
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.starts: List[float] = []
+        self.requests: List[str] = []
+        self.not_modified: List[str] = []
+        self.versions: Dict[str, int] = {}
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                with site.lock:
+                    site.starts.append(time.monotonic())
+                    site.requests.append(self.path)
+                    site.active += 1
+                    site.max_active = max(site.max_active, site.active)
+                try:
+                    time.sleep(response_delay)
+                    if self.path in REDIRECTS:
+                        self.send_response(301)
+                        self.send_header("Location", REDIRECTS[self.path])
+                        self.end_headers()
+                        return
+                    if self.path not in pages:
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    version = site.versions.get(self.path, 0)
+                    body = render_page(self.path, version)
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                    last_modified = f"Mon, 0{1 + version % 9} Jan 2024 00:00:00 GMT"
+                    if self.headers.get("If-None-Match") == etag or (
+                        not self.headers.get("If-None-Match") and self.headers.get("If-Modified-Since") == last_modified
+                    ):
+                        with site.lock:
+                            site.not_modified.append(self.path)
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", last_modified)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with site.lock:
+                        site.active -= 1
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def touch(self, path: str) -> None:
+        self.versions[path] = self.versions.get(path, 0) + 1
+
+    def url(self, path: str) -> str:
+        return f"{self.base}{path}"
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def crawl(site: FixtureSite, output_dir: Path, **overrides: Any) -> Dict[str, Any]:
+    """Crawl `site` from /index.html into `output_dir` with `crawl_recursive`, output silenced."""
+    options: Dict[str, Any] = dict(
+        seed_urls=[site.url("/index.html")],
+        output_dir=output_dir,
+        allow_domains={"127.0.0.1"},
+        allow_path_prefixes=["/"],
+        max_depth=2,
+        max_pages=100,
+        delay_seconds=0.0,
+        timeout=5.0,
+        retries=0,
+        backoff_base=1.1,
+        target_selector="main",
+        exclude_selectors=[],
+        wait_for_selector=None,
+        with_generated_alt=False,
+        resume=False,
+        reject_low_quality=False,
+        dedupe_content_hash=False,
+    )
+    options.update(overrides)
+    with redirect_stdout(io.StringIO()):
+        return crawl_recursive(**options)
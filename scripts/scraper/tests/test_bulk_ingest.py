@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import bulk_ingest
+from scrape import TokenBucket, extract_filename_from_url
+
+BASE = "https://www.canada.ca/en/immigration-refugees-citizenship/corporate/publications-manuals/operational-bulletins-manuals"
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_workers_share_the_rate(self) -> None:
+        bucket = TokenBucket(rate=50.0, capacity=1.0)
+        starts: List[float] = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            for _ in range(5):
+                with bucket.slot("https://r.jina.ai/x"):
+                    with lock:
+                        starts.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        began = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # One token up front, then 50 per second: 19 waits of 20 ms.
+        self.assertGreaterEqual(max(starts) - began, 19 / 50.0 - 0.01)
+        gaps = [b - a for a, b in zip(sorted(starts), sorted(starts)[1:])]
+        self.assertGreaterEqual(min(gaps), 0.01)
+
+    def test_capacity_allows_a_burst(self) -> None:
+        bucket = TokenBucket.per_minute(60.0, burst=3)
+        began = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - began, 0.1)
+
+
+class BulkScrapeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = self.tmp.name
+        self.urls = [f"{BASE}/page-{i}.html" for i in range(6)]
+        self.calls: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def fake_scrape(self, url: str, throttle: Optional[Any] = None, **_: Any) -> Optional[str]:
+        with throttle.slot(url):
+            with self.lock:
+                self.calls[url] = self.calls.get(url, 0) + 1
+                attempt = self.calls[url]
+        if url.endswith("page-4.html"):
+            return None  # always fails
+        if url.endswith("page-3.html") and attempt == 1:
+            return None  # fails once, then succeeds from the retry queue
+        return f"# {url}\n"
+
+    def run_bulk(self, **kwargs: Any) -> None:
+        with mock.patch.object(bulk_ingest, "scrape_canada_ca", self.fake_scrape), redirect_stdout(io.StringIO()):
+            bulk_ingest.bulk_scrape(self.urls, output_dir=self.output_dir, rpm=6000, workers=3, **kwargs)
+
+    def test_retries_failures_and_skips_saved_pages(self) -> None:
+        existing = Path(self.output_dir) / extract_filename_from_url(self.urls[0])
+        existing.write_text("already here", encoding="utf-8")
+
+        self.run_bulk(retry_rounds=2)
+        self.assertNotIn(self.urls[0], self.calls)
+        self.assertEqual(existing.read_text(encoding="utf-8"), "already here")
+        self.assertEqual(self.calls[self.urls[3]], 2)
+        self.assertEqual(self.calls[self.urls[4]], 3)
+        for url in self.urls[1:4] + self.urls[5:]:
+            self.assertTrue((Path(self.output_dir) / extract_filename_from_url(url)).exists())
+        failed = json.loads((Path(self.output_dir) / "failed_urls.json").read_text(encoding="utf-8"))
+        self.assertEqual(failed, [self.urls[4]])
+
+        # A second run only goes back for the page that is still missing.
+        self.calls.clear()
+        self.run_bulk(retry_rounds=0)
+        self.assertEqual(self.calls, {self.urls[4]: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from frontier import load_json
+from scrape import MANIFEST_FILE, STATE_FILE
+
+from fixture_site import FixtureSite, crawl
+
+
+class ConditionalGetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.site = FixtureSite(response_delay=0.0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp.name) / "crawl"
+
+    def tearDown(self) -> None:
+        self.site.close()
+        self.tmp.cleanup()
+
+    def crawl(self, **overrides: Any) -> Dict[str, Any]:
+        self.site.not_modified.clear()
+        return crawl(self.site, self.output_dir, concurrency=2, per_host_concurrency=2, **overrides)
+
+    def manifest_pages(self) -> List[Dict[str, Any]]:
+        return load_json(self.output_dir / MANIFEST_FILE, {})["pages"]
+
+    def test_recrawl_revalidates_unchanged_pages(self) -> None:
+        first = self.crawl()
+        self.assertEqual(first["pages_saved"], 9)
+        saved = {page["url"]: page for page in self.manifest_pages()}
+        files = {path.name: path.read_text(encoding="utf-8") for path in self.output_dir.glob("*.md")}
+        validators = load_json(self.output_dir / STATE_FILE, {})["validators"]
+        self.assertTrue(all(entry.get("etag") for entry in validators.values()))
+
+        second = self.crawl()
+        self.assertEqual(second["pages_attempted"], 0)
+        self.assertEqual(second["pages_unchanged"], 9)
+        self.assertEqual(len(self.site.not_modified), 9)
+        rerun = self.manifest_pages()[len(saved):]
+        self.assertEqual({page["status"] for page in rerun}, {"unchanged"})
+        # Same pages at the same depths, pointing at the files already on disk.
+        self.assertEqual(
+            [(page["url"], page["depth"], page["file"]) for page in rerun],
+            [(page["url"], page["depth"], page["file"]) for page in saved.values()],
+        )
+        self.assertEqual({path.name: path.read_text(encoding="utf-8") for path in self.output_dir.glob("*.md")}, files)
+
+    def test_changed_page_is_refetched_and_unchanged_pages_do_not_count(self) -> None:
+        self.crawl()
+        self.site.touch("/b3.html")
+
+        # BFS reaches b3 after six unchanged pages; fetching it uses up the budget.
+        result = self.crawl(max_pages=1)
+        self.assertEqual(result["pages_attempted"], 1)
+        self.assertEqual(result["pages_unchanged"], 6)
+        self.assertEqual(result["queue_remaining"], 2)
+
+        rest = self.crawl(max_pages=1, resume=True)
+        self.assertEqual(rest["pages_attempted"], 0)
+        self.assertEqual(rest["pages_unchanged"], 2)
+        self.assertEqual(rest["queue_remaining"], 0)
+        changed = [page for page in self.manifest_pages() if page["status"] == "saved" and page["url"].endswith("/b3.html")]
+        self.assertEqual(len(changed), 2)
+        self.assertNotEqual(changed[0]["content_hash"], changed[1]["content_hash"])
+        self.assertIn("Revision 1.", (self.output_dir / changed[1]["file"]).read_text(encoding="utf-8"))
+
+    def test_conditional_get_can_be_disabled(self) -> None:
+        self.crawl()
+        result = self.crawl(conditional_get=False)
+        self.assertEqual(result["pages_attempted"], 9)
+        self.assertEqual(result["pages_unchanged"], 0)
+        self.assertEqual(self.site.not_modified, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from frontier import load_json
+from scrape import MANIFEST_FILE, STATE_FILE, HostThrottle
+
+from fixture_site import FixtureSite, crawl
+
+
+class CrawlConcurrencyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.site = FixtureSite()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.site.close()
+        self.tmp.cleanup()
+
+    def crawl(self, name: str, **overrides: Any) -> Dict[str, Any]:
+        return crawl(self.site, Path(self.tmp.name) / name, resume=True, **overrides)
+
+    def pages(self, name: str) -> List[tuple]:
+        manifest = load_json(Path(self.tmp.name) / name / MANIFEST_FILE, {})
+        base = self.site.base
+        return [
+            (page["url"].replace(base, ""), page["original_url"].replace(base, ""), page["depth"], page["status"])
+            for page in manifest["pages"]
+        ]
+
+    def test_concurrent_crawl_matches_sequential(self) -> None:
+        sequential = self.crawl("sequential")
+        concurrent = self.crawl("concurrent", concurrency=4, per_host_concurrency=2)
+
+        self.assertEqual(self.pages("concurrent"), self.pages("sequential"))
+        for key in ("pages_attempted", "pages_saved", "pages_skipped", "queue_remaining"):
+            self.assertEqual(concurrent[key], sequential[key])
+        # depth 2 stops before the c* pages; the redirect lands on a2 and a2 is not fetched twice.
+        self.assertEqual(sequential["pages_saved"], 9)
+        self.assertIn(("/a2.html", "/old.html", 1, "saved"), self.pages("concurrent"))
+        self.assertLessEqual(self.site.max_active, 2)
+
+    def test_max_pages_and_resume(self) -> None:
+        full = self.crawl("full")
+        first = self.crawl("resumed", concurrency=3, per_host_concurrency=3, max_pages=4)
+        self.assertEqual(first["pages_attempted"], 4)
+        state = load_json(Path(self.tmp.name) / "resumed" / STATE_FILE, {})
+        # old.html counts once and marks its redirect target visited too.
+        visited = {url.replace(self.site.base, "") for url in state["visited"]}
+        self.assertEqual(visited, {"/index.html", "/a1.html", "/old.html", "/a2.html", "/a3.html"})
+        self.assertTrue(state["queue"])
+
+        second = self.crawl("resumed", concurrency=3, per_host_concurrency=3)
+        self.assertEqual(first["pages_attempted"] + second["pages_attempted"], full["pages_attempted"])
+        self.assertEqual(second["queue_remaining"], 0)
+        self.assertEqual(sorted(self.pages("resumed")), sorted(self.pages("full")))
+
+    def test_requests_to_a_host_are_spaced(self) -> None:
+        seeds = [f"{self.site.base}/a1.html", f"{self.site.base}/a3.html"]
+        result = self.crawl("spaced", seed_urls=seeds, max_depth=1, concurrency=4, per_host_concurrency=4, delay_seconds=0.05)
+        self.assertEqual(result["pages_saved"], 7)
+        starts = sorted(self.site.starts)
+        self.assertEqual(len(starts), 7)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        self.assertGreaterEqual(min(gaps), 0.04)
+
+
+class HostThrottleTests(unittest.TestCase):
+    def test_caps_requests_in_flight_per_host(self) -> None:
+        throttle = HostThrottle(per_host=2, min_interval=0.0)
+        lock = threading.Lock()
+        active = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        def work(host: str) -> None:
+            with throttle.slot(f"https://{host}.example/page"):
+                with lock:
+                    active[host] += 1
+                    peak[host] = max(peak[host], active[host])
+                time.sleep(0.02)
+                with lock:
+                    active[host] -= 1
+
+        threads = [threading.Thread(target=work, args=(host,)) for host in "ab" * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak, {"a": 2, "b": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
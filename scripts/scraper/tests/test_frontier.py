@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Dict
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import scrape
+from frontier import FRONTIER_FILE, MANIFEST_FILE, STATE_FILE, CrawlFrontier, load_json, open_frontier, write_json
+
+from fixture_site import FixtureSite, crawl
+
+
+class CrawlFrontierTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_only_checkpointed_writes_survive(self) -> None:
+        frontier = CrawlFrontier(self.dir / FRONTIER_FILE)
+        frontier.start({"seed_urls": []}, resume=True)
+        frontier.enqueue({"url": "https://a/1", "depth": 0, "parent_url": None})
+        frontier.enqueue({"url": "https://a/2", "depth": 1, "parent_url": "https://a/1"})
+        frontier.dequeue("https://a/1")
+        frontier.mark_visited("https://a/1")
+        frontier.add_page({"url": "https://a/1", "status": "saved"})
+        frontier.checkpoint()
+        frontier.add_page({"url": "https://a/2", "status": "saved"})
+        frontier.mark_visited("https://a/2")
+        frontier.conn.close()  # killed before the next checkpoint
+
+        reopened = CrawlFrontier(self.dir / FRONTIER_FILE)
+        self.assertEqual(reopened.visited(), {"https://a/1"})
+        self.assertEqual(reopened.queue(), [{"url": "https://a/2", "depth": 1, "parent_url": "https://a/1"}])
+        self.assertEqual([page["url"] for page in reopened.pages()], ["https://a/1"])
+        self.assertEqual(reopened.pages_for("https://a/2"), [])
+        reopened.close()
+
+    def test_imports_and_exports_json_state(self) -> None:
+        state = {
+            "version": 1,
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "visited": ["https://a/2", "https://a/1"],
+            "queue": [{"url": "https://a/3", "depth": 1, "parent_url": "https://a/1"}],
+            "failed": [{"url": "https://a/2", "stage": "scrape_jina", "error": "boom"}],
+            "validators": {"https://a/1": {"etag": '"x"', "url": "https://a/1", "links": []}},
+        }
+        manifest = {"created_at": "2024-01-01T00:00:00+00:00", "seed_urls": ["https://a/1"], "pages": [{"url": "https://a/1", "status": "saved"}]}
+        write_json(self.dir / STATE_FILE, state)
+        write_json(self.dir / MANIFEST_FILE, manifest)
+
+        frontier = open_frontier(self.dir)
+        frontier.export_json(self.dir)
+        frontier.close()
+
+        exported = load_json(self.dir / STATE_FILE, {})
+        for key in ("created_at", "queue", "failed", "validators"):
+            self.assertEqual(exported[key], state[key])
+        self.assertEqual(exported["visited"], ["https://a/1", "https://a/2"])
+        exported_manifest = load_json(self.dir / MANIFEST_FILE, {})
+        self.assertEqual(exported_manifest["pages"], manifest["pages"])
+        self.assertEqual(exported_manifest["seed_urls"], manifest["seed_urls"])
+        self.assertEqual(load_json(self.dir / "failed_urls.json", []), state["failed"])
+
+        # Opening again does not import the JSON a second time.
+        frontier = open_frontier(self.dir)
+        self.assertEqual(len(list(frontier.pages())), 1)
+        frontier.close()
+
+
+class InterruptedCrawlTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.site = FixtureSite(response_delay=0.0)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.site.close()
+        self.tmp.cleanup()
+
+    def crawl(self, output_dir: Path, **overrides: Any) -> Dict[str, Any]:
+        return crawl(self.site, output_dir, resume=True, save_every=2, **overrides)
+
+    def test_killed_crawl_resumes_from_last_checkpoint(self) -> None:
+        full_dir = Path(self.tmp.name) / "full"
+        self.crawl(full_dir)
+        expected = [(page["url"], page["depth"], page["status"]) for page in load_json(full_dir / MANIFEST_FILE, {})["pages"]]
+
+        killed_dir = Path(self.tmp.name) / "killed"
+        real_fetch = scrape.fetch_and_extract_page
+        calls = {"n": 0}
+
+        def dying_fetch(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            calls["n"] += 1
+            if calls["n"] == 6:
+                raise KeyboardInterrupt
+            return real_fetch(*args, **kwargs)
+
+        with mock.patch.object(scrape, "fetch_and_extract_page", dying_fetch):
+            with self.assertRaises(KeyboardInterrupt):
+                self.crawl(killed_dir)
+
+        frontier = CrawlFrontier(killed_dir / FRONTIER_FILE)
+        self.assertEqual(len(list(frontier.pages())), 4)  # two checkpoints of two pages
+        frontier.close()
+
+        self.crawl(killed_dir)
+        resumed = [(page["url"], page["depth"], page["status"]) for page in load_json(killed_dir / MANIFEST_FILE, {})["pages"]]
+        self.assertEqual(resumed, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from frontier import FRONTIER_FILE, CrawlFrontier, load_json
+from near_duplicates import NearDuplicateIndex, hamming, near_duplicate_report, text_fingerprint
+from scrape import MANIFEST_FILE
+
+from fixture_site import FixtureSite, crawl
+
+VOCABULARY = (
+    "applicant officer permit visa study work family sponsor refugee claim document passport biometrics "
+    "interview decision review appeal eligibility admissibility medical criminal record fee payment portal "
+    "account letter employer offer province nominee citizenship residence travel border entry exit status"
+).split()
+
+
+def prose(seed: int, words: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+SITE = {"/index.html": ["/p1.html", "/p2.html", "/p3.html"], "/p1.html": [], "/p2.html": [], "/p3.html": []}
+BODIES = {
+    "/p1.html": f"<p>Date modified: 2024-01-05</p><p>{prose(1)}</p>",
+    "/p2.html": f"<p>Date modified: 2024-03-17</p><p>{prose(1)}</p>",
+    "/p3.html": f"<p>Date modified: 2024-01-05</p><p>{prose(2)}</p>",
+}
+
+
+def render_page(path: str, version: int = 0) -> bytes:
+    links = "".join(f'<li><a href="{link}">{link}</a></li>' for link in SITE[path])
+    return (
+        f"<html><head><title>Page {path}</title></head><body><main>"
+        f"<h1>Page {path}</h1>{BODIES.get(path, '')}<ul>{links}</ul>"
+        "</main></body></html>"
+    ).encode("utf-8")
+
+
+class NearDuplicateIndexTests(unittest.TestCase):
+    def test_fingerprint_distances(self) -> None:
+        base = prose(1)
+        self.assertEqual(hamming(text_fingerprint(base), text_fingerprint(base)), 0)
+        self.assertLessEqual(hamming(text_fingerprint(base), text_fingerprint("Date modified: 2024-03-17 " + base)), 3)
+        self.assertGreater(hamming(text_fingerprint(base), text_fingerprint(prose(2))), 10)
+        self.assertIsNone(text_fingerprint("too short to say anything", min_words=50))
+
+    def test_block_lookup_matches_linear_scan(self) -> None:
+        rng = random.Random(7)
+        index = NearDuplicateIndex(max_distance=3)
+        fingerprints: Dict[str, int] = {}
+        for i in range(200):
+            value = rng.getrandbits(64)
+            fingerprints[f"u{i}"] = value
+            # Near copies at 1..5 bits of a random earlier page.
+            if i % 4 == 0 and i:
+                source = fingerprints[f"u{rng.randrange(i)}"]
+                for bit in rng.sample(range(64), rng.randint(1, 5)):
+                    source ^= 1 << bit
+                fingerprints[f"u{i}"] = source
+            index.add(f"u{i}", fingerprints[f"u{i}"], f"f{i}.md")
+        for url, value in fingerprints.items():
+            expected = sorted(
+                (hamming(value, other), other_url)
+                for other_url, other in fingerprints.items()
+                if other_url != url and hamming(value, other) <= 3
+            )
+            self.assertEqual(index.neighbours(value, exclude_url=url), expected)
+
+    def test_query_excludes_url_and_remove_forgets_it(self) -> None:
+        index = NearDuplicateIndex(max_distance=2)
+        index.add("a", 0b1011, "a.md")
+        index.add("b", 0b1001, "b.md")
+        self.assertEqual(index.query(0b1011, exclude_url="a"), {"url": "b", "file": "b.md", "distance": 1, "similarity": 0.9844})
+        index.remove("b")
+        self.assertIsNone(index.query(0b1011, exclude_url="a"))
+        self.assertEqual(len(index), 1)
+
+
+class NearDuplicateCrawlTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.site = FixtureSite(response_delay=0.0, site=SITE, render_page=render_page)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp.name) / "crawl"
+
+    def tearDown(self) -> None:
+        self.site.close()
+        self.tmp.cleanup()
+
+    def crawl(self, **overrides: Any) -> Dict[str, Any]:
+        options: Dict[str, Any] = dict(max_depth=1, concurrency=2, per_host_concurrency=2, dedupe_near_duplicates=True)
+        options.update(overrides)
+        return crawl(self.site, self.output_dir, **options)
+
+    def latest_records(self) -> Dict[str, Dict[str, Any]]:
+        pages: List[Dict[str, Any]] = load_json(self.output_dir / MANIFEST_FILE, {})["pages"]
+        return {page["url"].rsplit("/", 1)[-1]: page for page in pages}
+
+    def test_near_duplicate_points_at_saved_page(self) -> None:
+        result = self.crawl()
+        self.assertEqual(result["pages_saved"], 3)
+        self.assertEqual(result["pages_near_duplicate"], 1)
+        records = self.latest_records()
+        p2 = records["p2.html"]
+        self.assertEqual(p2["status"], "near_duplicate")
+        self.assertEqual(p2["near_duplicate_of"], self.site.url("/p1.html"))
+        self.assertEqual(p2["file"], records["p1.html"]["file"])
+        self.assertLessEqual(p2["near_duplicate_distance"], 3)
+        self.assertEqual(records["p3.html"]["status"], "saved")
+        self.assertEqual(len(list(self.output_dir.glob("*p2*.md"))), 0)
+
+        frontier = CrawlFrontier(self.output_dir / FRONTIER_FILE)
+        fingerprints = frontier.fingerprints()
+        report = near_duplicate_report(fingerprints, frontier.pages(), max_distance=3)
+        frontier.close()
+        # The index page is too short to fingerprint.
+        self.assertEqual(sorted(url.rsplit("/", 1)[-1] for url in fingerprints), ["p1.html", "p3.html"])
+        self.assertEqual(report["recorded_near_duplicates"], 1)
+        self.assertEqual(report["groups"][0]["file"], records["p1.html"]["file"])
+        self.assertEqual(sum(report["indexed_pairs_by_distance"].values()), 0)
+
+    def test_recrawl_does_not_match_a_page_against_itself(self) -> None:
+        self.crawl()
+        result = self.crawl(conditional_get=False)
+        self.assertEqual(result["pages_saved"], 3)
+        self.assertEqual(result["pages_near_duplicate"], 1)
+        records = self.latest_records()
+        self.assertEqual(records["p1.html"]["status"], "saved")
+        self.assertEqual(records["p2.html"]["status"], "near_duplicate")
+
+    def test_index_is_backfilled_from_saved_files(self) -> None:
+        self.crawl(dedupe_near_duplicates=False)
+        self.assertEqual(self.latest_records()["p2.html"]["status"], "saved")
+        frontier = CrawlFrontier(self.output_dir / FRONTIER_FILE)
+        self.assertEqual(frontier.fingerprints(), {})
+        frontier.close()
+
+        # p2 is left out of the index built from disk, so the re-crawl keeps p1.
+        result = self.crawl(conditional_get=False)
+        self.assertEqual(result["pages_near_duplicate"], 1)
+        records = self.latest_records()
+        self.assertEqual(records["p1.html"]["status"], "saved")
+        self.assertEqual(records["p2.html"]["near_duplicate_of"], self.site.url("/p1.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
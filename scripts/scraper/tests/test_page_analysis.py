@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scrape import (
+    HTML_PARSER,
+    analyze_html,
+    extract_links_from_html,
+    extract_markdown_from_html,
+    extract_title_from_html,
+)
+
+FIXTURES = sorted((ROOT / "fixtures" / "html").glob("*.html"))
+BASE_URL = "https://www.canada.ca/en/immigration-refugees-citizenship/corporate/publications-manuals/operational-bulletins-manuals/temporary-residents/page.html"
+
+
+class AnalyzeHtmlParityTests(unittest.TestCase):
+    def test_fixtures_exist(self) -> None:
+        self.assertGreaterEqual(len(FIXTURES), 4)
+
+    def test_single_parse_matches_separate_extractors(self) -> None:
+        for path in FIXTURES:
+            html = path.read_text(encoding="utf-8")
+            for parser in dict.fromkeys([HTML_PARSER, "html.parser"]):
+                with self.subTest(page=path.name, parser=parser):
+                    analysis = analyze_html(html, BASE_URL, parser=parser)
+                    self.assertEqual(analysis["markdown"], extract_markdown_from_html(html))
+                    self.assertEqual(analysis["title"], extract_title_from_html(html))
+                    self.assertEqual(analysis["links"], extract_links_from_html(html, BASE_URL))
+
+    def test_links_include_navigation_that_markdown_drops(self) -> None:
+        html = (
+            "<html><head><title>Doc</title></head><body><main>"
+            '<nav><a href="/en/menu.html">Menu</a></nav>'
+            '<h1>Heading</h1><p>Body text with <a href="/en/next.html#part">a link</a>.</p>'
+            "</main></body></html>"
+        )
+        analysis = analyze_html(html, "https://www.canada.ca/en/start.html")
+        self.assertEqual(analysis["title"], "Heading")
+        self.assertEqual(analysis["links"], ["https://www.canada.ca/en/menu.html", "https://www.canada.ca/en/next.html"])
+        self.assertEqual(analysis["markdown"], "# Heading\n\nBody text with a link .")
+        self.assertEqual(analyze_html(html, "https://www.canada.ca/en/start.html", with_links=False)["links"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import scrape
+from frontier import FRONTIER_FILE, CrawlFrontier, load_json
+from response_cache import CACHE_DIR, ResponseCache
+from scrape import MANIFEST_FILE
+
+from fixture_site import FixtureSite, crawl
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_bodies_are_stored_once_by_hash(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(Path(tmp) / CACHE_DIR)
+            body = b"<html><body>" + b"repeated text " * 500 + b"</body></html>"
+            first = cache.put_body(body)
+            self.assertEqual(cache.put_body(body), first)
+            stored = list(cache.objects.glob("*/*.gz"))
+            self.assertEqual(stored, [cache.object_path(first)])
+            self.assertLess(stored[0].stat().st_size, len(body) // 10)
+            self.assertEqual(cache.read_body({"sha256": first}), body)
+
+
+class ReextractFromCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.site = FixtureSite(response_delay=0.0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp.name) / "crawl"
+
+    def tearDown(self) -> None:
+        self.site.close()
+        self.tmp.cleanup()
+
+    def crawl(self, **overrides: Any) -> Dict[str, Any]:
+        return crawl(self.site, self.output_dir, concurrency=2, per_host_concurrency=2, **overrides)
+
+    def manifest_pages(self) -> List[Dict[str, Any]]:
+        return load_json(self.output_dir / MANIFEST_FILE, {})["pages"]
+
+    def markdown_files(self) -> Dict[str, str]:
+        return {path.name: path.read_text(encoding="utf-8") for path in self.output_dir.glob("*.md")}
+
+    def test_reextract_rebuilds_pages_without_network(self) -> None:
+        self.crawl()
+        crawled = [(page["url"], page["depth"], page["status"], page.get("file")) for page in self.manifest_pages()]
+        files = self.markdown_files()
+        frontier = CrawlFrontier(self.output_dir / FRONTIER_FILE)
+        self.assertEqual(len(frontier.latest_responses()), 9)
+        frontier.close()
+        requests_made = len(self.site.requests)
+        for path in self.output_dir.glob("*.md"):
+            path.unlink()
+
+        result = self.crawl(reextract_from_cache=True)
+        self.assertEqual(len(self.site.requests), requests_made)
+        self.assertEqual(result["pages_saved"], 9)
+        rebuilt = self.manifest_pages()[len(crawled):]
+        self.assertEqual([(page["url"], page["depth"], page["status"], page.get("file")) for page in rebuilt], crawled)
+        self.assertEqual(self.markdown_files(), files)
+
+    def test_reextract_applies_current_extraction_rules(self) -> None:
+        self.crawl()
+        real_analyze = scrape.analyze_html
+
+        def revised_analyze(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            analysis = real_analyze(*args, **kwargs)
+            analysis["markdown"] += "\n\nRevised extractor."
+            return analysis
+
+        with mock.patch.object(scrape, "analyze_html", revised_analyze):
+            self.crawl(reextract_from_cache=True)
+        self.assertTrue(all(text.endswith("Revised extractor.") for text in self.markdown_files().values()))
+        saved = [page for page in self.manifest_pages() if page["status"] == "saved"]
+        self.assertEqual(len(saved), 18)
+        self.assertNotEqual(saved[0]["content_hash"], saved[9]["content_hash"])
+
+    def test_pages_without_cached_responses_are_not_cached(self) -> None:
+        self.crawl(response_cache=False)
+        self.assertFalse((self.output_dir / CACHE_DIR).exists())
+        result = self.crawl(reextract_from_cache=True)
+        self.assertEqual(result["pages_saved"], 0)
+        self.assertEqual(self.manifest_pages()[-1]["status"], "not_cached")
+
+
+if __name__ == "__main__":
+    unittest.main()
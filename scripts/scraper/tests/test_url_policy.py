@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scrape import ALLOW_PATH_PREFIX, benchmark_url_policy
+from url_policy import UrlPolicy, canonicalize_absolute
+from url_utils import canonicalize_url
+
+MANUALS = "https://www.canada.ca/en/immigration-refugees-citizenship/corporate/publications-manuals/operational-bulletins-manuals"
+LINKS = [
+    ("/en/immigration-refugees-citizenship/corporate/publications-manuals/operational-bulletins-manuals/a.html?utm_source=x", MANUALS + "/index.html"),
+    ("b.html#section", MANUALS + "/temporary-residents/index.html"),
+    ("https://example.com/out?url=https%3A%2F%2Fwww.canada.ca%2Fen%2Fimmigration-refugees-citizenship%2Fservices%2Fvisit-canada.html", None),
+    ("https://www.canada.ca/en/immigration-refugees-citizenship/services/visit-canada/transit/without-visa.html", None),
+    ("https://www.canada.ca/en/immigration-refugees-citizenship/services/visit-canada.html", None),
+    ("https://ircc.canada.ca/english/visit/visas.asp", None),
+    (MANUALS + "/forms/guide.pdf", None),
+    ("https://www.canada.ca/en/revenue-agency.html", None),
+    ("mailto:someone@example.com", MANUALS + "/index.html"),
+    ("  ", MANUALS + "/index.html"),
+]
+
+
+class UrlPolicyTests(unittest.TestCase):
+    def test_canonicalize_matches_url_utils(self) -> None:
+        policy = UrlPolicy()
+        for raw, base in LINKS:
+            with self.subTest(raw=raw, base=base):
+                self.assertEqual(policy.canonicalize(raw, base), canonicalize_url(raw, base_url=base))
+
+    def test_allow_decisions_match_uncached_policy(self) -> None:
+        for domains, prefixes in ((["www.canada.ca"], [ALLOW_PATH_PREFIX]), (["www.canada.ca", "ircc.canada.ca"], []), ([], ["/en/revenue"])):
+            cached = UrlPolicy(domains, prefixes)
+            uncached = UrlPolicy(domains, prefixes, memoize=False)
+            for raw, base in LINKS:
+                canonical = canonicalize_url(raw, base_url=base)
+                if canonical:
+                    with self.subTest(url=canonical, domains=domains, prefixes=prefixes):
+                        self.assertEqual(cached.is_allowed(canonical), uncached.is_allowed(canonical))
+
+    def test_policy_rules(self) -> None:
+        policy = UrlPolicy(["www.canada.ca", "ircc.canada.ca"], [])
+        self.assertTrue(policy.is_allowed(MANUALS + "/a.html"))
+        self.assertTrue(policy.is_allowed("https://ircc.canada.ca/english/visit/visas.asp"))
+        self.assertTrue(policy.is_allowed("https://www.canada.ca/en/immigration-refugees-citizenship/services/visit-canada/transit/without-visa.html"))
+        self.assertFalse(policy.is_allowed("https://www.canada.ca/en/immigration-refugees-citizenship/services/visit-canada.html"))
+        self.assertFalse(policy.is_allowed(MANUALS + "/forms/guide.pdf"))
+        self.assertFalse(UrlPolicy(["canada.ca"], []).is_allowed(MANUALS + "/a.html"))
+        self.assertTrue(UrlPolicy([], ["/en/revenue"]).is_allowed("https://www.canada.ca/en/revenue-agency.html"))
+
+    def test_repeated_links_hit_the_cache(self) -> None:
+        canonicalize_absolute.cache_clear()
+        policy = UrlPolicy(["www.canada.ca"], [ALLOW_PATH_PREFIX])
+
+        def check_all() -> None:
+            for raw, base in LINKS:
+                canonical = policy.canonicalize(raw, base)
+                if canonical:
+                    policy.is_allowed(canonical)
+
+        check_all()
+        first = policy.cache_info()
+        check_all()
+        check_all()
+        info = policy.cache_info()
+        self.assertEqual(info["canonical_misses"], first["canonical_misses"])
+        self.assertEqual(info["decision_misses"], first["decision_misses"])
+        self.assertEqual(info["decision_hits"] - first["decision_hits"], 2 * (first["decision_hits"] + first["decision_misses"]))
+        self.assertGreater(info["canonical_hits"], first["canonical_hits"])
+
+    def test_benchmark_reports_parity(self) -> None:
+        pages = sorted((ROOT / "ircc_data_clean").glob("*.md"))[:20]
+        report = benchmark_url_policy(pages, repeat=1)
+        self.assertGreater(report["links"], report["distinct_links"])
+        self.assertTrue(report["uncached_matches"])
+        self.assertTrue(report["url_policy_matches"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Memoized URL canonicalization and a precompiled crawl allow policy.
+
+`url_utils.canonicalize_url` probes every redirect-style query parameter
+(percent-decoding, base64) up to `MAX_UNWRAP_DEPTH` levels, and canada.ca pages
+repeat the same navigation links hundreds of times across a crawl. `UrlPolicy`
+resolves a link against its base once and canonicalizes the absolute URL
+through a process-wide LRU cache, so a repeated link costs a dictionary
+lookup; its allow decisions are cached the same way per policy. The allowed
+domains are a frozenset and the extra path prefixes a tuple checked in one
+`str.startswith` call.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable
+from urllib.parse import urljoin, urlsplit
+
+from url_utils import canonicalize_url
+
+CANONICAL_CACHE_SIZE = 65536
+DECISION_CACHE_SIZE = 65536
+
+INGESTION_HOSTS = frozenset({"www.canada.ca", "canada.ca", "ircc.canada.ca"})
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def canonicalize_absolute(url: str) -> str | None:
+    return canonicalize_url(url)
+
+
+def is_ingestion_target(canonical_url: str) -> bool:
+    """
+    User-defined ingestion policy, for an already canonical URL:
+    1) Keep all core manual pages under operational-bulletins-manuals
+    2) Keep visa country list exception (visit/visas.asp)
+    3) Drop generic /services/ pages except transit/without-visa
+    """
+    if not canonical_url:
+        return False
+    host = (urlsplit(canonical_url).hostname or "").lower()
+    # Restrict to expected canada.ca hosts
+    if host not in INGESTION_HOSTS:
+        return False
+
+    whole = canonical_url.lower()
+    if "/corporate/publications-manuals/operational-bulletins-manuals/" in whole:
+        return True
+    if "visit/visas.asp" in whole:
+        return True
+    if "/services/" in whole:
+        return "transit/without-visa" in whole
+    # Everything else is excluded by default.
+    return False
+
+
+class UrlPolicy:
+    def __init__(
+        self,
+        allow_domains: Iterable[str] = (),
+        allow_path_prefixes: Iterable[str] = (),
+        memoize: bool = True,
+    ) -> None:
+        """`memoize=False` gives the same answers without caching, as a baseline."""
+        self.allow_domains = frozenset(domain.strip().lower() for domain in allow_domains if domain and domain.strip())
+        self.allow_path_prefixes = tuple(prefix for prefix in allow_path_prefixes if prefix)
+        self.memoize = memoize
+        self._canonicalize_absolute = canonicalize_absolute if memoize else canonicalize_url
+        self.is_allowed = lru_cache(maxsize=DECISION_CACHE_SIZE)(self._is_allowed) if memoize else self._is_allowed
+
+    def canonicalize(self, raw_url: str, base_url: str | None = None) -> str | None:
+        """Same result as `url_utils.canonicalize_url(raw_url, base_url)`, memoized on the joined URL."""
+        if not raw_url:
+            return None
+        value = str(raw_url).strip()
+        if not value:
+            return None
+        return self._canonicalize_absolute(urljoin(base_url, value) if base_url else value)
+
+    def _is_allowed(self, url: str) -> bool:
+        try:
+            split = urlsplit(url)
+        except Exception:
+            return False
+
+        host = (split.hostname or "").lower()
+        if self.allow_domains and host not in self.allow_domains:
+            return False
+        if split.path.lower().endswith(".pdf"):
+            return False
+
+        # Primary policy gate.
+        if is_ingestion_target(self.canonicalize(url) or ""):
+            return True
+        # Optional additional allow prefixes (for custom runs).
+        return bool(self.allow_path_prefixes) and split.path.startswith(self.allow_path_prefixes)
+
+    def cache_info(self) -> dict[str, int]:
+        if not self.memoize:
+            return {}
+        canonical = canonicalize_absolute.cache_info()
+        decisions = self.is_allowed.cache_info()
+        return {
+            "canonical_hits": canonical.hits,
+            "canonical_misses": canonical.misses,
+            "decision_hits": decisions.hits,
+            "decision_misses": decisions.misses,
+        }